@@ -1,10 +1,16 @@
 import asyncio
 import asyncpg
+import json
 import os
 import random
+import struct
 from typing import Optional
 from dotenv import load_dotenv
 
+import numpy as np
+
+from MEMORY_SYSTEM.runtime.tracing import record_db_query
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -16,6 +22,45 @@ DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_NAME = os.getenv("DB_NAME")
 
+# Optional: orjson is several times faster than the stdlib for jsonb payloads
+try:
+    import orjson
+
+    def _json_dumps(value) -> str:
+        return orjson.dumps(
+            value,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        ).decode("utf-8")
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
+# the json / jsonb encoder, for values sent as text and cast in SQL
+json_dumps = _json_dumps
+
+
+# -------------------------------------------------
+# pgvector binary codec (numpy float32 in / out)
+# -------------------------------------------------
+# Wire format: int16 dim, int16 unused, dim x float4, all big-endian.
+_VECTOR_HEADER = struct.Struct(">HH")
+
+
+def _encode_vector(value) -> bytes:
+    # pgvector.Vector has no __len__/__iter__, so asyncpg treats it as a
+    # scalar: use it to wrap the elements of a vector[] parameter
+    if hasattr(value, "to_binary"):
+        return value.to_binary()
+    arr = np.asarray(value, dtype=">f4").reshape(-1)
+    return _VECTOR_HEADER.pack(arr.shape[0], 0) + arr.tobytes()
+
+
+def _decode_vector(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=">f4", offset=_VECTOR_HEADER.size).astype(np.float32)
+
+
 # from logger.logger_config import get_newsFetcher_#logger
 #logger = get_newsFetcher_#logger()
 
@@ -52,6 +97,47 @@ class DatabaseManager:
             #logger.warning("Pool health check failed: %s", e)
             return False
 
+    async def _init_connection(self, conn: asyncpg.Connection) -> None:
+        """
+        Runs once for every new pooled connection.
+
+        - json / jsonb: pass and receive dicts, no manual json.dumps/loads
+        - vector: binary protocol, numpy float32 in and out
+        """
+        for type_name in ("json", "jsonb"):
+            await conn.set_type_codec(
+                type_name,
+                encoder=_json_dumps,
+                decoder=_json_loads,
+                schema="pg_catalog",
+                format="text",
+            )
+
+        try:
+            await conn.set_type_codec(
+                "vector",
+                encoder=_encode_vector,
+                decoder=_decode_vector,
+                schema="public",
+                format="binary",
+            )
+        except ValueError:
+            # First boot: the extension does not exist yet. Schema setup
+            # creates it and calls refresh_type_codecs().
+            pass
+
+        # Per-query latency spans (asyncpg >= 0.29)
+        if hasattr(conn, "add_query_logger"):
+            conn.add_query_logger(record_db_query)
+
+    async def refresh_type_codecs(self) -> None:
+        """
+        Recycle pooled connections so _init_connection runs again
+        (e.g. after CREATE EXTENSION vector on a fresh database).
+        """
+        if self._db_pool is not None:
+            await self._db_pool.expire_connections()
+
     async def get_pool(self) -> asyncpg.pool.Pool:
         await self._ensure_env()
 
@@ -72,6 +158,7 @@ class DatabaseManager:
                     "max_size": 20,
                     "statement_cache_size": 1000,
                     "timeout": 10.0,
+                    "init": self._init_connection,
                 }
 
                 if ENVIRONMENT == "local_environment":
@@ -1,4 +1,3 @@
-import json
 from MEMORY_SYSTEM.database.connect.connect import db_manager
 
 
@@ -19,10 +18,8 @@ async def log_pattern_decision(
     try:
         pool = await db_manager.get_pool()
 
-        # ---- FIX 1: JSON-safe signal value ----
+        # ---- FIX 1: signal value goes through the jsonb codec ----
         signal_value = signal.get("value")
-        if signal_value is not None:
-            signal_value = json.dumps(signal.get("value"))
 
         # ---- FIX 2: confidence hardening ----
         confidence = decision.get("confidence")
@@ -31,20 +28,44 @@ async def log_pattern_decision(
         confidence = round(float(confidence), 2)
 
         async with pool.acquire() as conn:
+            # log row + signal_frequency rollup in one statement
             await conn.execute(
                 """
-                INSERT INTO agentic_memory_schema.pattern_logs (
+                WITH logged AS (
+                    INSERT INTO agentic_memory_schema.pattern_logs (
+                        user_id,
+                        signal_category,
+                        signal_field,
+                        signal_value,
+                        action,
+                        target,
+                        confidence,
+                        reason,
+                        created_at
+                    )
+                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, NOW())
+                    RETURNING user_id, signal_category, signal_field, signal_value, created_at
+                )
+                INSERT INTO agentic_memory_schema.signal_frequency AS f (
                     user_id,
                     signal_category,
                     signal_field,
-                    signal_value,
-                    action,
-                    target,
-                    confidence,
-                    reason,
-                    created_at
+                    value_hash,
+                    count,
+                    last_seen
                 )
-                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, NOW())
+                SELECT
+                    user_id,
+                    signal_category,
+                    signal_field,
+                    md5(COALESCE(signal_value::text, 'null')),
+                    1,
+                    created_at
+                FROM logged
+                ON CONFLICT (user_id, signal_category, signal_field, value_hash)
+                DO UPDATE SET
+                    count = f.count + 1,
+                    last_seen = GREATEST(f.last_seen, EXCLUDED.last_seen)
                 """,
                 user_id,
                 signal.get("category"),
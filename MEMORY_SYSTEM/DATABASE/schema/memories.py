@@ -1,4 +1,5 @@
 from MEMORY_SYSTEM.database.connect.connect import db_manager
+from MEMORY_SYSTEM.ltm.content_hash import content_hash
 
 
 async def ensure_memories_table_exists() -> None:
@@ -55,9 +56,14 @@ async def ensure_memories_table_exists() -> None:
                     -- ------------------------------------------
                     fact TEXT NOT NULL,
 
+                    -- normalized-text hash, exact-repeat key (ltm/content_hash.py)
+                    content_hash TEXT,
+
                     -- ------------------------------------------
                     -- SCORING / STABILITY (FACTUAL ONLY)
                     -- ------------------------------------------
+                    -- values at insert time; live values are in
+                    -- memory_signals (schema/memory_signals.py)
                     importance REAL CHECK (importance >= 0 AND importance <= 10),
 
                     frequency INTEGER NOT NULL DEFAULT 1,
@@ -120,6 +126,22 @@ async def ensure_memories_table_exists() -> None:
                 """
             )
 
+            # Exact vector scan for small users (ltm/search_strategy.py)
+            await conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_memories_user_kind_status
+                ON agentic_memory_schema.memories(user_id, memory_kind, status);
+                """
+            )
+
+            # Episodic retrieval: per user, unexpired, newest first
+            await conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_memories_episodic_user_expiry
+                ON agentic_memory_schema.memories(user_id, memory_kind, expires_at, created_at);
+                """
+            )
+
             # Episodic expiry scan
             await conn.execute(
                 """
@@ -129,27 +151,99 @@ async def ensure_memories_table_exists() -> None:
                 """
             )
 
-            # Factual retrieval
+            # Episodic upsert key: one row per (user, context_type, key).
+            # Collapse duplicates left by the old insert-per-turn writes
+            # (keep the newest) before the unique index can be built.
+            if await conn.fetchval(
+                "SELECT to_regclass('agentic_memory_schema.uq_memories_episodic_binding') IS NULL"
+            ):
+                await conn.execute(
+                    """
+                    DELETE FROM agentic_memory_schema.memories m
+                    USING agentic_memory_schema.memories newer
+                    WHERE m.memory_kind = 'episodic'
+                      AND newer.memory_kind = 'episodic'
+                      AND m.user_id = newer.user_id
+                      AND m.category = newer.category
+                      AND m.topic = newer.topic
+                      AND (m.created_at, m.memory_id) < (newer.created_at, newer.memory_id);
+                    """
+                )
+                await conn.execute(
+                    """
+                    CREATE UNIQUE INDEX IF NOT EXISTS uq_memories_episodic_binding
+                    ON agentic_memory_schema.memories(user_id, category, topic)
+                    WHERE memory_kind = 'episodic';
+                    """
+                )
+
+            # Exact-repeat key for factual writes (ltm/store_ltm.py).
+            # Backfill active factual rows (oldest row keeps the hash when
+            # the same text was stored twice) before the unique index.
             await conn.execute(
                 """
-                CREATE INDEX IF NOT EXISTS idx_memories_factual_confidence
-                ON agentic_memory_schema.memories(confidence_score DESC)
-                WHERE memory_kind = 'factual';
+                ALTER TABLE agentic_memory_schema.memories
+                ADD COLUMN IF NOT EXISTS content_hash TEXT;
                 """
             )
+            if await conn.fetchval(
+                "SELECT to_regclass('agentic_memory_schema.uq_memories_content_hash') IS NULL"
+            ):
+                rows = await conn.fetch(
+                    """
+                    SELECT memory_id, user_id, fact
+                    FROM agentic_memory_schema.memories
+                    WHERE memory_kind = 'factual'
+                      AND status = 'active'
+                      AND content_hash IS NULL
+                    ORDER BY created_at, memory_id
+                    """
+                )
+                seen = set()
+                ids, hashes = [], []
+                for r in rows:
+                    key = (r["user_id"], content_hash(r["fact"]))
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    ids.append(r["memory_id"])
+                    hashes.append(key[1])
+
+                await conn.execute(
+                    """
+                    UPDATE agentic_memory_schema.memories m
+                    SET content_hash = u.content_hash
+                    FROM unnest($1::uuid[], $2::text[]) AS u(memory_id, content_hash)
+                    WHERE m.memory_id = u.memory_id;
+                    """,
+                    ids,
+                    hashes,
+                )
+                await conn.execute(
+                    """
+                    CREATE UNIQUE INDEX IF NOT EXISTS uq_memories_content_hash
+                    ON agentic_memory_schema.memories(user_id, memory_kind, content_hash)
+                    WHERE status = 'active' AND content_hash IS NOT NULL;
+                    """
+                )
 
-            # Vector search (FACTUAL ONLY)
+            # Factual retrieval
             await conn.execute(
                 """
-                CREATE INDEX IF NOT EXISTS idx_memories_embedding
-                ON agentic_memory_schema.memories
-                USING ivfflat (embedding vector_cosine_ops)
-                WITH (lists = 100);
+                CREATE INDEX IF NOT EXISTS idx_memories_factual_confidence
+                ON agentic_memory_schema.memories(confidence_score DESC)
+                WHERE memory_kind = 'factual';
                 """
             )
 
+            # Vector search index (idx_memories_embedding) is owned by
+            # ltm/ann_index.py: built once there is data to size it for
+
             print("✅ unified factual + episodic memories table created successfully")
 
+        # connections opened before CREATE EXTENSION vector have no vector codec
+        await db_manager.refresh_type_codecs()
+
     except Exception as e:
         print(f"❌ memories initialization failed: {e}")
         raise
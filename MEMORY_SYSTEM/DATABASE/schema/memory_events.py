@@ -1,4 +1,9 @@
 from MEMORY_SYSTEM.database.connect.connect import db_manager
+from MEMORY_SYSTEM.ltm.event_partitions import (
+    ensure_partitions,
+    next_period,
+    period_start,
+)
 
 
 async def ensure_memory_events_table_exists() -> None:
@@ -9,46 +14,101 @@ async def ensure_memory_events_table_exists() -> None:
             await conn.execute("SET search_path TO public;")
             await conn.execute("CREATE SCHEMA IF NOT EXISTS agentic_memory_schema;")
 
-
-
-            # Memory event log (signals, reinforcement, consolidation trace)
-            await conn.execute(
+            relkind = await conn.fetchval(
                 """
-                CREATE TABLE IF NOT EXISTS agentic_memory_schema.memory_events (
-                    event_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-
-                    memory_id UUID NOT NULL
-                        REFERENCES agentic_memory_schema.memories(memory_id)
-                        ON DELETE CASCADE,
-
-                    event_type TEXT NOT NULL CHECK (event_type IN (
-                        'extracted',
-                        'reinforced',
-                        'retrieved',
-                        'merged',
-                        'conflicted',
-                        'deprecated'
-                    )),
-
-                    source TEXT NOT NULL,
-
-                    signal_strength REAL CHECK (signal_strength >= 0 AND signal_strength <= 1),
-
-                    raw_context TEXT,
-
-                    metadata JSONB NOT NULL DEFAULT '{}',
-
-                    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
-                );
+                SELECT c.relkind
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = 'agentic_memory_schema'
+                  AND c.relname = 'memory_events'
                 """
             )
 
-            await conn.execute(
-                "CREATE INDEX IF NOT EXISTS idx_memory_events_memory ON agentic_memory_schema.memory_events(memory_id);"
-            )
-            await conn.execute(
-                "CREATE INDEX IF NOT EXISTS idx_memory_events_type ON agentic_memory_schema.memory_events(event_type);"
-            )
+            async with conn.transaction():
+                if relkind == "r":
+                    # Pre-partitioning table: keep its rows as the first
+                    # partition (MINVALUE .. end of the current period);
+                    # retention drops it once that range has aged out.
+                    await conn.execute(
+                        """
+                        ALTER TABLE agentic_memory_schema.memory_events
+                        RENAME TO memory_events_legacy;
+
+                        ALTER TABLE agentic_memory_schema.memory_events_legacy
+                        DROP CONSTRAINT IF EXISTS memory_events_memory_id_fkey;
+
+                        ALTER TABLE agentic_memory_schema.memory_events_legacy
+                        DROP CONSTRAINT IF EXISTS memory_events_pkey;
+
+                        DROP INDEX IF EXISTS agentic_memory_schema.idx_memory_events_memory;
+                        DROP INDEX IF EXISTS agentic_memory_schema.idx_memory_events_type;
+                        """
+                    )
+
+                # Memory event log (signals, reinforcement, consolidation trace).
+                # Range-partitioned by created_at (ltm/event_partitions.py):
+                # retention drops whole partitions instead of deleting rows.
+                # No FK to memories: the audit log outlives the memory and a
+                # memory delete does not fan out into the log.
+                await conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS agentic_memory_schema.memory_events (
+                        event_id UUID NOT NULL DEFAULT gen_random_uuid(),
+
+                        memory_id UUID NOT NULL,
+
+                        event_type TEXT NOT NULL CHECK (event_type IN (
+                            'extracted',
+                            'reinforced',
+                            'retrieved',
+                            'merged',
+                            'conflicted',
+                            'deprecated'
+                        )),
+
+                        source TEXT NOT NULL,
+
+                        signal_strength REAL CHECK (signal_strength >= 0 AND signal_strength <= 1),
+
+                        raw_context TEXT,
+
+                        metadata JSONB NOT NULL DEFAULT '{}',
+
+                        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+
+                        PRIMARY KEY (event_id, created_at)
+                    ) PARTITION BY RANGE (created_at);
+                    """
+                )
+
+                if relkind == "r":
+                    boundary = next_period(period_start(
+                        await conn.fetchval("SELECT NOW()")
+                    ))
+                    await conn.execute(
+                        f"""
+                        ALTER TABLE agentic_memory_schema.memory_events
+                        ATTACH PARTITION agentic_memory_schema.memory_events_legacy
+                        FOR VALUES FROM (MINVALUE) TO ('{boundary.isoformat()}');
+                        """
+                    )
+
+                # created_at second: time-bounded lookups prune partitions
+                # and range-scan inside the remaining ones
+                await conn.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_memory_events_memory_time
+                    ON agentic_memory_schema.memory_events(memory_id, created_at);
+                    """
+                )
+                await conn.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_memory_events_type_time
+                    ON agentic_memory_schema.memory_events(event_type, created_at);
+                    """
+                )
+
+                await ensure_partitions(conn)
 
             print("✅ canonical memory_events table created successfully")
 
@@ -0,0 +1,79 @@
+from MEMORY_SYSTEM.database.connect.connect import db_manager
+
+
+async def ensure_memory_signals_table_exists() -> None:
+    try:
+        pool = await db_manager.get_pool()
+        async with pool.acquire() as conn:
+
+            await conn.execute("SET search_path TO public;")
+            await conn.execute("CREATE SCHEMA IF NOT EXISTS agentic_memory_schema;")
+
+            # Mutable signals of factual memories (reinforcement, access).
+            # Kept off the wide memories row (embedding, fact, metadata) so a
+            # reinforcement rewrites ~60 bytes instead of the whole row and
+            # never touches the ANN index. No index on the updated columns
+            # and a low fillfactor keep the updates HOT.
+            #
+            # memories.frequency / importance / last_updated are the values
+            # at insert time; reads take these (LEFT JOIN + COALESCE).
+            await conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS agentic_memory_schema.memory_signals (
+                    memory_id UUID PRIMARY KEY
+                        REFERENCES agentic_memory_schema.memories(memory_id)
+                        ON DELETE CASCADE,
+
+                    frequency INTEGER NOT NULL DEFAULT 1,
+
+                    importance REAL CHECK (importance >= 0 AND importance <= 10),
+
+                    last_updated TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+
+                    -- retrieval (ltm/access_tracker.py, write-behind)
+                    access_count INTEGER NOT NULL DEFAULT 0,
+                    last_accessed TIMESTAMPTZ
+                ) WITH (fillfactor = 70);
+                """
+            )
+            await conn.execute(
+                """
+                ALTER TABLE agentic_memory_schema.memory_signals
+                ADD COLUMN IF NOT EXISTS access_count INTEGER NOT NULL DEFAULT 0;
+                """
+            )
+
+            # copy the live values of memories that have no signals row
+            # yet; runs on every start, so rows inserted by instances
+            # still on the old code during a deploy are picked up too
+            await conn.execute(
+                """
+                INSERT INTO agentic_memory_schema.memory_signals (
+                    memory_id,
+                    frequency,
+                    importance,
+                    last_updated,
+                    last_accessed
+                )
+                SELECT
+                    m.memory_id,
+                    m.frequency,
+                    m.importance,
+                    m.last_updated,
+                    m.last_accessed
+                FROM agentic_memory_schema.memories m
+                WHERE m.memory_kind = 'factual'
+                  AND NOT EXISTS (
+                      SELECT 1
+                      FROM agentic_memory_schema.memory_signals s
+                      WHERE s.memory_id = m.memory_id
+                  )
+                ON CONFLICT (memory_id) DO NOTHING;
+                """
+            )
+
+            print("✅ memory_signals table created successfully")
+
+    except Exception as e:
+        print(f"❌ memory_signals initialization failed: {e}")
+        raise
@@ -1,5 +1,7 @@
 # MEMORY_SYSTEM/database/schema/pattern_logs.py
 
+import asyncpg
+
 from MEMORY_SYSTEM.database.connect.connect import db_manager
 
 
@@ -46,8 +48,148 @@ async def ensure_pattern_logs_table_exists() -> None:
                 """
             )
 
+            # Rollup of pattern_logs per (user, category, field, value):
+            # maintained by log_pattern_decision in the same statement as
+            # the log insert, read by cognition/signal_frequency.py.
+            # value_hash = md5(signal_value::text); jsonb text output is
+            # canonical (key order, whitespace), so equal values hash equal.
+            await conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS agentic_memory_schema.signal_frequency (
+                    user_id TEXT NOT NULL,
+                    signal_category TEXT NOT NULL,
+                    signal_field TEXT NOT NULL,
+                    value_hash TEXT NOT NULL,
+
+                    count BIGINT NOT NULL DEFAULT 0,
+                    last_seen TIMESTAMP WITHOUT TIME ZONE,
+
+                    PRIMARY KEY (user_id, signal_category, signal_field, value_hash)
+                ) WITH (fillfactor = 80);
+                """
+            )
+
+            # highest pattern_logs.id the rollup was reconciled up to
+            await conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS agentic_memory_schema.signal_frequency_reconciled (
+                    singleton BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (singleton),
+                    last_log_id BIGINT NOT NULL
+                );
+                """
+            )
+
+            # Recount of one signal group (reconcile below)
+            await conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_pattern_logs_user_signal
+                ON agentic_memory_schema.pattern_logs(user_id, signal_category, signal_field);
+                """
+            )
+
+            await _reconcile_signal_frequency(conn)
+
             print("✅ pattern_logs table ensured successfully")
 
     except Exception as e:
         print(f"❌ pattern_logs initialization failed: {e}")
         raise
+
+
+async def _reconcile_signal_frequency(conn) -> None:
+    """
+    Recount the signal_frequency groups touched by pattern_logs rows
+    above the last reconciled id.
+
+    Runs on every start: rows logged since the last reconcile may come
+    from instances without the rollup (rolling deploy). Counts are exact,
+    so repeating it is harmless.
+
+    The lock holds off log inserts (and with them rollup increments)
+    and other instances' reconciles until commit, so ids above the new
+    watermark are all written after it. It is only taken when there are
+    new rows, waits at most lock_timeout, and is held for one index
+    lookup per touched group; on timeout the next start catches up.
+    """
+    since = await conn.fetchval(
+        "SELECT last_log_id FROM agentic_memory_schema.signal_frequency_reconciled"
+    )
+    newest = await conn.fetchval(
+        "SELECT COALESCE(MAX(id), 0) FROM agentic_memory_schema.pattern_logs"
+    )
+    if since is not None and newest <= since:
+        return
+
+    try:
+        async with conn.transaction():
+            await conn.execute("SET LOCAL lock_timeout = '2s'")
+            await conn.execute(
+                "LOCK TABLE agentic_memory_schema.pattern_logs IN SHARE ROW EXCLUSIVE MODE"
+            )
+
+            since = await conn.fetchval(
+                "SELECT last_log_id FROM agentic_memory_schema.signal_frequency_reconciled"
+            )
+            last_log_id = await conn.fetchval(
+                "SELECT COALESCE(MAX(id), 0) FROM agentic_memory_schema.pattern_logs"
+            )
+            if since is not None and last_log_id <= since:
+                return
+
+            await conn.execute(
+                """
+                WITH touched AS (
+                    SELECT DISTINCT
+                        user_id,
+                        signal_category,
+                        signal_field,
+                        md5(COALESCE(signal_value::text, 'null')) AS value_hash
+                    FROM agentic_memory_schema.pattern_logs
+                    WHERE id > $1
+                )
+                INSERT INTO agentic_memory_schema.signal_frequency AS f (
+                    user_id,
+                    signal_category,
+                    signal_field,
+                    value_hash,
+                    count,
+                    last_seen
+                )
+                SELECT
+                    t.user_id,
+                    t.signal_category,
+                    t.signal_field,
+                    t.value_hash,
+                    c.count,
+                    c.last_seen
+                FROM touched t
+                CROSS JOIN LATERAL (
+                    -- idx_pattern_logs_user_signal
+                    SELECT COUNT(*) AS count, MAX(p.created_at) AS last_seen
+                    FROM agentic_memory_schema.pattern_logs p
+                    WHERE p.user_id = t.user_id
+                      AND p.signal_category = t.signal_category
+                      AND p.signal_field = t.signal_field
+                      AND md5(COALESCE(p.signal_value::text, 'null')) = t.value_hash
+                ) c
+                ON CONFLICT (user_id, signal_category, signal_field, value_hash)
+                DO UPDATE SET
+                    count = EXCLUDED.count,
+                    last_seen = EXCLUDED.last_seen
+                WHERE f.count IS DISTINCT FROM EXCLUDED.count
+                   OR f.last_seen IS DISTINCT FROM EXCLUDED.last_seen;
+                """,
+                since or 0,
+            )
+
+            await conn.execute(
+                """
+                INSERT INTO agentic_memory_schema.signal_frequency_reconciled (last_log_id)
+                VALUES ($1)
+                ON CONFLICT (singleton) DO UPDATE
+                SET last_log_id = EXCLUDED.last_log_id;
+                """,
+                last_log_id,
+            )
+    except asyncpg.exceptions.LockNotAvailableError:
+        print("⚠️ signal_frequency reconcile skipped (pattern_logs busy), next start retries")
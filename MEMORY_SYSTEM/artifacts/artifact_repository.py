@@ -4,7 +4,6 @@ import uuid
 
 from MEMORY_SYSTEM.database.connect.connect import db_manager
 from datetime import datetime, timezone
-import json  
 
 class ArtifactRepository:
     def __init__(self):
@@ -28,7 +27,7 @@ class ArtifactRepository:
                     VALUES ($1, $2, $3, $4, $5, $6, $7)
                     """,
                     artifact_id, artifact_type, summary, 
-                    json.dumps(metadata or {}),  # ← FIX: Convert dict to JSON string
+                    metadata or {},  # dict, encoded by the jsonb codec
                     content_ref, now, now
                 )
             
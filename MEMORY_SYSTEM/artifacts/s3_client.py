@@ -14,14 +14,20 @@ AWS_DEFAULT_REGION = os.getenv("AWS_DEFAULT_REGION", "ap-south-1")
 class ArtifactS3Client:
     def __init__(self, bucket: str):
         self.bucket = bucket
-
-        # Explicit credentials (same pattern as your reference)
-        self.s3 = boto3.client(
-            "s3",
-            aws_access_key_id=AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-            region_name=AWS_DEFAULT_REGION,
-        )
+        self._s3 = None
+
+    @property
+    def s3(self):
+        # Built on first use so importing the orchestrator stays cheap
+        if self._s3 is None:
+            # Explicit credentials (same pattern as your reference)
+            self._s3 = boto3.client(
+                "s3",
+                aws_access_key_id=AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+                region_name=AWS_DEFAULT_REGION,
+            )
+        return self._s3
 
     def _put_object_sync(
         self,
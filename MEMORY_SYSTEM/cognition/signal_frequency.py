@@ -1,14 +1,4 @@
-from MEMORY_SYSTEM.database.connect.connect import db_manager
-import json
-
-
-def _jsonify_value(value):
-    """
-    Ensure value is a JSON string for ::jsonb comparison.
-    """
-    if value is None:
-        return None
-    return json.dumps(value)
+from MEMORY_SYSTEM.database.connect.connect import db_manager, json_dumps
 
 
 async def enrich_signal_frequency(
@@ -21,40 +11,47 @@ async def enrich_signal_frequency(
     Frequency definition:
     - How many times this SAME signal (category + field + value)
       has appeared before for this user.
+
+    One lookup for all signals against the signal_frequency rollup
+    (maintained by log_pattern_decision), not a COUNT over pattern_logs.
     """
 
     if not signals:
         return signals
 
+    lookup = []
+    for signal in signals:
+        signal["frequency"] = 1
+        if signal.get("category") and signal.get("field") and signal.get("value") is not None:
+            lookup.append(signal)
+
+    if not lookup:
+        return signals
+
     pool = await db_manager.get_pool()
 
     async with pool.acquire() as conn:
-        for signal in signals:
-            category = signal.get("category")
-            field = signal.get("field")
-            value = signal.get("value")
-
-            if not category or not field or value is None:
-                signal["frequency"] = 1
-                continue
-
-            json_value = _jsonify_value(value)
-
-            row = await conn.fetchrow(
-                """
-                SELECT COUNT(*) AS cnt
-                FROM agentic_memory_schema.pattern_logs
-                WHERE user_id = $1
-                  AND signal_category = $2
-                  AND signal_field = $3
-                  AND signal_value = $4::jsonb
-                """,
-                user_id,
-                category,
-                field,
-                json_value,
-            )
-
-            signal["frequency"] = (row["cnt"] or 0) + 1
+        # values go as JSON text, encoded like the jsonb codec encodes
+        # the writer's signal_value, and are cast in SQL: the
+        # ::jsonb::text round trip gives the canonical form it hashed
+        rows = await conn.fetch(
+            """
+            SELECT q.i, f.count
+            FROM unnest($2::text[], $3::text[], $4::text[])
+                WITH ORDINALITY AS q(category, field, value, i)
+            JOIN agentic_memory_schema.signal_frequency f
+              ON f.user_id = $1
+             AND f.signal_category = q.category
+             AND f.signal_field = q.field
+             AND f.value_hash = md5(q.value::jsonb::text)
+            """,
+            user_id,
+            [s["category"] for s in lookup],
+            [s["field"] for s in lookup],
+            [json_dumps(s["value"]) for s in lookup],
+        )
+
+    for r in rows:
+        lookup[r["i"] - 1]["frequency"] = (r["count"] or 0) + 1
 
     return signals
@@ -1,4 +1,3 @@
-from pgvector.asyncpg import register_vector
 import asyncpg
 
 
@@ -17,9 +16,7 @@ async def consolidate_memories(
     """
 
     try:
-        # Ensure pgvector is registered
-        await register_vector(conn)
-
+        # vector codec is installed on every pooled connection (db_manager)
         # Use explicit transaction for safety
         async with conn.transaction():
 
@@ -1,5 +1,6 @@
 from MEMORY_SYSTEM.consolidation_and_canonicalization.consolidate_memories import consolidate_memories
 from MEMORY_SYSTEM.consolidation_and_canonicalization.topic_canonicalization import canonicalize_topics
+from MEMORY_SYSTEM.ltm.user_vector_cache import user_vector_cache
 
 
 async def run_full_consolidation(
@@ -14,17 +15,21 @@ async def run_full_consolidation(
     2. Level-2 topic canonicalization
     """
 
-    level1 = await consolidate_memories(
-        conn,
-        user_id=user_id,
-        similarity_threshold=similarity_threshold,
-        candidate_limit=candidate_limit,
-    )
+    try:
+        level1 = await consolidate_memories(
+            conn,
+            user_id=user_id,
+            similarity_threshold=similarity_threshold,
+            candidate_limit=candidate_limit,
+        )
 
-    level2 = await canonicalize_topics(
-        conn,
-        user_id=user_id,
-    )
+        level2 = await canonicalize_topics(
+            conn,
+            user_id=user_id,
+        )
+    finally:
+        # statuses / evidence changed: reload on next access
+        user_vector_cache.invalidate(user_id)
 
     return {
         "level_1": level1,
@@ -0,0 +1,162 @@
+# MEMORY_SYSTEM/context/context_assembly.py
+
+import asyncio
+import time
+import traceback
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Dict, Optional
+
+from MEMORY_SYSTEM.context.build_cognition_context import build_epistemic_system_prompt
+from MEMORY_SYSTEM.persona.persona_agent_flow import bring_user_persona
+from MEMORY_SYSTEM.ltm.retriever import retrieve_ltm_memories
+from MEMORY_SYSTEM.ltm.context_builder import build_ltm_context
+from MEMORY_SYSTEM.stm.stm_orchestrator import process_user_message
+from MEMORY_SYSTEM.runtime.tracing import span
+
+
+# =====================================================
+# Stage names (stable, used as keys in AssembledContext.stages)
+# =====================================================
+STAGE_INTENT = "intent"
+STAGE_EPISTEMIC = "epistemic"
+STAGE_PERSONA = "persona"
+STAGE_LTM = "ltm"
+
+
+@dataclass
+class StageResult:
+    name: str
+    value: Any = None
+    error: Optional[BaseException] = None
+    elapsed_ms: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class AssembledContext:
+    final_system_prompt: str
+    final_user_prompt: str
+    user_intent: Optional[dict]
+    episodic: Optional[list]
+    factual: Optional[list]
+    stages: Dict[str, StageResult] = field(default_factory=dict)
+
+
+async def _run_stage(name: str, awaitable: Awaitable) -> StageResult:
+    """
+    Await one stage and capture its value OR its error.
+    Never raises (except cancellation), so one failing stage
+    cannot tear down its siblings.
+    """
+    started = time.perf_counter()
+    try:
+        with span(f"context.{name}"):
+            value = await awaitable
+        return StageResult(
+            name=name,
+            value=value,
+            elapsed_ms=(time.perf_counter() - started) * 1000,
+        )
+    except Exception as e:
+        print(f"❌ [CONTEXT] Stage '{name}' failed: {e}")
+        traceback.print_exc()
+        return StageResult(
+            name=name,
+            error=e,
+            elapsed_ms=(time.perf_counter() - started) * 1000,
+        )
+
+
+async def assemble_context(
+    user_id: str,
+    system_prompt: str,
+    user_prompt: str,
+) -> AssembledContext:
+    """
+    Run every pre-generation stage concurrently and join them.
+
+    Stages (independent of each other):
+    - intent    : STM intent extraction + routing (LLM call)
+    - epistemic : epistemic rules wrapped around the system prompt
+    - persona   : persona context from DB
+    - ltm       : episodic + factual LTM retrieval
+
+    Join rules (same fallbacks as the sequential flow):
+    - epistemic OR persona failed -> raw system prompt
+    - ltm failed                  -> raw user prompt
+    - intent failed               -> error is re-raised to the caller
+
+    Wall-clock time is the slowest stage, not the sum.
+    """
+
+    stages = await asyncio.gather(
+        _run_stage(STAGE_INTENT, process_user_message(user_id, user_prompt)),
+        _run_stage(
+            STAGE_EPISTEMIC,
+            asyncio.to_thread(build_epistemic_system_prompt, system_prompt),
+        ),
+        _run_stage(STAGE_PERSONA, bring_user_persona(user_id)),
+        _run_stage(STAGE_LTM, retrieve_ltm_memories(user_id, user_prompt)),
+    )
+
+    # -------------------------------------------------
+    # JOIN POINT
+    # -------------------------------------------------
+    results = {s.name: s for s in stages}
+
+    intent = results[STAGE_INTENT]
+    epistemic = results[STAGE_EPISTEMIC]
+    persona = results[STAGE_PERSONA]
+    ltm = results[STAGE_LTM]
+
+    if epistemic.ok and persona.ok:
+        final_system_prompt = f"""
+            RULES:
+            {epistemic.value}
+
+            USER_PERSONA:
+            {persona.value}
+"""
+    else:
+        final_system_prompt = system_prompt
+
+    episodic = None
+    factual = None
+
+    if ltm.ok:
+        try:
+            episodic = ltm.value.get("episodic", None)
+            factual = ltm.value.get("factual", None)
+            ltm_context = build_ltm_context(factual)
+
+            final_user_prompt = f"""
+            {ltm_context}
+
+            User question:
+            {user_prompt}
+            """
+        except Exception:
+            traceback.print_exc()
+            final_user_prompt = user_prompt
+    else:
+        final_user_prompt = user_prompt
+
+    print(
+        "[CONTEXT] Stage timings (ms):",
+        {name: round(s.elapsed_ms, 1) for name, s in results.items()},
+    )
+
+    if not intent.ok:
+        raise intent.error
+
+    return AssembledContext(
+        final_system_prompt=final_system_prompt,
+        final_user_prompt=final_user_prompt,
+        user_intent=intent.value,
+        episodic=episodic,
+        factual=factual,
+        stages=results,
+    )
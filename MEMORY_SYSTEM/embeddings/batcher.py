@@ -0,0 +1,229 @@
+# MEMORY_SYSTEM/embeddings/batcher.py
+
+import asyncio
+import time
+import inspect
+import traceback
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batching front for an encode function.
+
+    Concurrent callers enqueue their texts; one worker task drains the
+    queue for up to `max_wait_ms` (or until `max_batch_size` texts are
+    collected), runs ONE encode per normalize flag, and hands every
+    caller back its own rows.
+
+    - `encode_fn` may be sync (run in the default executor) or async
+    - Up to `max_inflight` batches are encoded at once (e.g. one per
+      worker process); the default of 1 keeps encodes strictly serial
+    - Queue is bounded (`max_queue_depth`): producers wait when full
+    - Worker is bound to the running loop and restarted if the loop changes
+    - close() fails every request still queued or in flight, so no
+      caller waits forever during shutdown
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str], bool], np.ndarray],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        max_queue_depth: int = 1024,
+        max_inflight: int = 1,
+    ):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_queue_depth = max_queue_depth
+        self.max_inflight = max(1, max_inflight)
+        self._is_async = inspect.iscoroutinefunction(encode_fn)
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Optional[asyncio.Semaphore] = None
+        self._tasks: set = set()
+        # callers' futures not resolved yet (failed by close())
+        self._futures: set = set()
+
+        # counters (exposed through stats())
+        self._batches = 0
+        self._items = 0
+        self._texts = 0
+        self._last_batch_size = 0
+        self._max_seen_batch_size = 0
+        self._total_wait_ms = 0.0
+        self._total_encode_ms = 0.0
+
+    # -------------------------------------------------
+    # Worker lifecycle
+    # -------------------------------------------------
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and self._loop is loop and not self._worker.done():
+            return
+
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queue_depth)
+        self._inflight = asyncio.Semaphore(self.max_inflight)
+        self._worker = loop.create_task(self._run())
+
+    async def close(self) -> None:
+        tasks = list(self._tasks)
+        if self._worker is not None:
+            tasks.append(self._worker)
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+        # nothing reads the queue any more: fail what is still queued or
+        # in flight (producers waiting for room give up on their future)
+        if self._queue is not None:
+            while not self._queue.empty():
+                self._queue.get_nowait()
+        for future in list(self._futures):
+            if not future.done():
+                future.set_exception(RuntimeError("embedding batcher closed"))
+                future.exception()  # retrieved: the caller may be gone
+        self._futures.clear()
+
+        self._worker = None
+        self._queue = None
+        self._loop = None
+
+    # -------------------------------------------------
+    # Public API
+    # -------------------------------------------------
+    async def encode(self, texts: List[str], normalize: bool = True) -> np.ndarray:
+        """
+        Returns np.ndarray (len(texts), dim) float32.
+        """
+        self._ensure_worker()
+
+        future = self._loop.create_future()
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+
+        item = (texts, normalize, future, time.perf_counter())
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # backpressure: wait for room, or for close() to fail the future
+            put = self._loop.create_task(self._queue.put(item))
+            try:
+                await asyncio.wait({put, future}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                put.cancel()
+        return await future
+
+    def stats(self) -> dict:
+        batches = self._batches or 1
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "max_inflight": self.max_inflight,
+            "batches": self._batches,
+            "requests": self._items,
+            "texts": self._texts,
+            "last_batch_size": self._last_batch_size,
+            "largest_batch_size": self._max_seen_batch_size,
+            "avg_batch_size": round(self._texts / batches, 2),
+            "avg_queue_wait_ms": round(self._total_wait_ms / max(self._items, 1), 3),
+            "avg_encode_ms": round(self._total_encode_ms / batches, 3),
+        }
+
+    # -------------------------------------------------
+    # Batching loop
+    # -------------------------------------------------
+    async def _collect(self) -> List[Tuple]:
+        first = await self._queue.get()
+        batch = [first]
+        size = len(first[0])
+
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            size += len(item[0])
+
+        return batch
+
+    async def _encode_group(self, normalize: bool, items: List[Tuple]) -> None:
+        try:
+            flat: List[str] = []
+            for texts, _, _, _ in items:
+                flat.extend(texts)
+
+            now = time.perf_counter()
+            for _, _, _, enqueued in items:
+                self._total_wait_ms += (now - enqueued) * 1000
+
+            try:
+                started = time.perf_counter()
+                if self._is_async:
+                    rows = await self.encode_fn(flat, normalize)
+                else:
+                    rows = await asyncio.get_running_loop().run_in_executor(
+                        None, self.encode_fn, flat, normalize
+                    )
+                rows = np.asarray(rows, dtype=np.float32)
+                self._total_encode_ms += (time.perf_counter() - started) * 1000
+            except Exception as e:
+                traceback.print_exc()
+                for _, _, future, _ in items:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            offset = 0
+            for texts, _, future, _ in items:
+                n = len(texts)
+                if not future.done():
+                    future.set_result(rows[offset:offset + n])
+                offset += n
+
+            self._batches += 1
+            self._items += len(items)
+            self._texts += len(flat)
+            self._last_batch_size = len(flat)
+            self._max_seen_batch_size = max(self._max_seen_batch_size, len(flat))
+
+        finally:
+            self._inflight.release()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = await self._collect()
+
+            # one encode per normalize flag
+            groups = {}
+            for item in batch:
+                groups.setdefault(item[1], []).append(item)
+
+            for normalize, items in groups.items():
+                await self._inflight.acquire()
+                task = loop.create_task(self._encode_group(normalize, items))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+            for _ in batch:
+                self._queue.task_done()
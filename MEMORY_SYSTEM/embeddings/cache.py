@@ -0,0 +1,311 @@
+# MEMORY_SYSTEM/embeddings/cache.py
+
+import os
+import re
+import json
+import hashlib
+import threading
+import traceback
+from collections import OrderedDict
+from typing import IO, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Optional: POSIX only; without it the disk tier is not used
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DIGEST_SIZE = 16
+# dict slot + key bytes + ndarray header (rough, per entry)
+ENTRY_OVERHEAD_BYTES = 200
+META_FLUSH_EVERY = 256
+# worker-<n> subdirectories, one per process sharing a cache directory
+DISK_MAX_WORKERS = 64
+
+
+def cache_key(model_name: str, normalize: bool, text: str) -> bytes:
+    """
+    Content hash of (model name, normalize flag, text).
+    """
+    h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    h.update(model_name.encode("utf-8"))
+    h.update(b"\x00")
+    h.update(b"1" if normalize else b"0")
+    h.update(b"\x00")
+    h.update(text.encode("utf-8"))
+    return h.digest()
+
+
+def _claim_worker_dir(directory: str) -> Tuple[str, IO]:
+    """
+    Lock the first free worker-<n> subdirectory of `directory`.
+
+    The lock (flock on <dir>/.lock) is held for the life of the process,
+    so two processes never write the same files, and a restarted worker
+    picks up a directory (and its vectors) left by a previous one.
+    """
+    if fcntl is None:
+        raise RuntimeError("disk tier needs fcntl (POSIX)")
+
+    for n in range(DISK_MAX_WORKERS):
+        path = os.path.join(directory, f"worker-{n}")
+        os.makedirs(path, exist_ok=True)
+        fh = open(os.path.join(path, ".lock"), "a")
+        try:
+            fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            fh.close()
+            continue
+        return path, fh
+
+    raise RuntimeError(f"all {DISK_MAX_WORKERS} worker directories in {directory} are in use")
+
+
+class _DiskTier:
+    """
+    Fixed-capacity ring of float32 vectors in a memory-mapped file.
+
+    Files (per model, inside the claimed worker-<n> subdirectory of
+    `directory`):
+    - <model>.f32        : (capacity, dim) float32 vectors
+    - <model>.keys       : (capacity, 16) uint8 digests (all-zero = empty)
+    - <model>.meta.json  : model name, dim, capacity, next slot
+
+    A file written for another model / dim / capacity is discarded.
+    Opening scans the key file: blocking, keep it off the event loop.
+    """
+
+    def __init__(self, directory: str, model_name: str, dim: int, capacity: int):
+        self.model_name = model_name
+        self.dim = dim
+        self.capacity = capacity
+
+        os.makedirs(directory, exist_ok=True)
+        directory, self._lock_fh = _claim_worker_dir(directory)
+        self.directory = directory
+        stem = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.vectors_path = os.path.join(directory, f"{stem}.f32")
+        self.keys_path = os.path.join(directory, f"{stem}.keys")
+        self.meta_path = os.path.join(directory, f"{stem}.meta.json")
+
+        meta = self._read_meta()
+        fresh = not (
+            meta
+            and meta.get("model_name") == model_name
+            and meta.get("dim") == dim
+            and meta.get("capacity") == capacity
+            and os.path.exists(self.vectors_path)
+            and os.path.exists(self.keys_path)
+        )
+        mode = "w+" if fresh else "r+"
+
+        self.vectors = np.memmap(
+            self.vectors_path, dtype=np.float32, mode=mode, shape=(capacity, dim)
+        )
+        self.keys = np.memmap(
+            self.keys_path, dtype=np.uint8, mode=mode, shape=(capacity, DIGEST_SIZE)
+        )
+        self.next_slot = 0 if fresh else int(meta.get("next_slot", 0)) % capacity
+        self._puts_since_meta = 0
+
+        self.index: Dict[bytes, int] = {}
+        if not fresh:
+            keys = np.asarray(self.keys)
+            for slot in np.flatnonzero(keys.any(axis=1)).tolist():
+                self.index[keys[slot].tobytes()] = slot
+        else:
+            self._write_meta()
+
+    def _read_meta(self) -> Optional[dict]:
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except Exception:
+            return None
+
+    def _write_meta(self) -> None:
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(
+                {
+                    "model_name": self.model_name,
+                    "dim": self.dim,
+                    "capacity": self.capacity,
+                    "next_slot": self.next_slot,
+                },
+                fh,
+            )
+        os.replace(tmp, self.meta_path)
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        slot = self.index.get(key)
+        if slot is None:
+            return None
+        return np.array(self.vectors[slot], dtype=np.float32)
+
+    def put(self, key: bytes, vec: np.ndarray) -> None:
+        if key in self.index:
+            return
+
+        slot = self.next_slot
+        old = self.keys[slot].tobytes()
+        if old != bytes(DIGEST_SIZE):
+            self.index.pop(old, None)
+
+        self.vectors[slot] = vec
+        self.keys[slot] = np.frombuffer(key, dtype=np.uint8)
+        self.index[key] = slot
+        self.next_slot = (slot + 1) % self.capacity
+
+        self._puts_since_meta += 1
+        if self._puts_since_meta >= META_FLUSH_EVERY:
+            self.flush()
+
+    def flush(self) -> None:
+        self.vectors.flush()
+        self.keys.flush()
+        self._write_meta()
+        self._puts_since_meta = 0
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache keyed by cache_key(model, normalize, text).
+
+    - Memory tier: LRU bounded by `max_bytes`
+    - Disk tier (optional): memory-mapped float32 ring, survives restarts;
+      disk hits are promoted into memory. Used once open_disk() has run
+      (startup, in a thread); until then lookups are memory only
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        dim: int,
+        max_bytes: int = 64 * 1024 * 1024,
+        disk_dir: Optional[str] = None,
+        disk_capacity: int = 50_000,
+    ):
+        self.model_name = model_name
+        self.dim = dim
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_capacity = disk_capacity
+
+        self._memory: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._disk: Optional[_DiskTier] = None
+        self._disk_failed = False
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # -------------------------------------------------
+    # Disk tier (blocking open, never fatal)
+    # -------------------------------------------------
+    def open_disk(self) -> None:
+        with self._open_lock:
+            if self._disk is not None or self._disk_failed or not self.disk_dir:
+                return
+            try:
+                disk = _DiskTier(
+                    self.disk_dir, self.model_name, self.dim, self.disk_capacity
+                )
+            except Exception:
+                print("❌ [EMBED-CACHE] Disk tier unavailable, memory only")
+                traceback.print_exc()
+                self._disk_failed = True
+                return
+
+            # the key scan ran without the lookup lock held
+            with self._lock:
+                self._disk = disk
+            print(f"✅ [EMBED-CACHE] Disk tier opened in {disk.directory} ({len(disk)} vectors)")
+
+    # -------------------------------------------------
+    # Memory tier
+    # -------------------------------------------------
+    def _remember(self, key: bytes, vec: np.ndarray) -> None:
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+
+        self._memory[key] = vec
+        self._bytes += vec.nbytes + ENTRY_OVERHEAD_BYTES
+
+        while self._bytes > self.max_bytes and self._memory:
+            _, old = self._memory.popitem(last=False)
+            self._bytes -= old.nbytes + ENTRY_OVERHEAD_BYTES
+            self.evictions += 1
+
+    # -------------------------------------------------
+    # Public API
+    # -------------------------------------------------
+    def get_many(self, texts: List[str], normalize: bool) -> List[Optional[np.ndarray]]:
+        out: List[Optional[np.ndarray]] = []
+        with self._lock:
+            disk = self._disk
+            for text in texts:
+                key = cache_key(self.model_name, normalize, text)
+
+                vec = self._memory.get(key)
+                if vec is not None:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    out.append(vec)
+                    continue
+
+                vec = disk.get(key) if disk is not None else None
+                if vec is not None:
+                    self.disk_hits += 1
+                    self._remember(key, vec)
+                    out.append(vec)
+                    continue
+
+                self.misses += 1
+                out.append(None)
+        return out
+
+    def put_many(self, texts: List[str], normalize: bool, vectors: np.ndarray) -> None:
+        with self._lock:
+            disk = self._disk
+            for text, vec in zip(texts, vectors):
+                key = cache_key(self.model_name, normalize, text)
+                vec = np.array(vec, dtype=np.float32)
+                vec.setflags(write=False)
+                self._remember(key, vec)
+                if disk is not None:
+                    try:
+                        disk.put(key, vec)
+                    except Exception:
+                        traceback.print_exc()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._disk is not None:
+                self._disk.flush()
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._bytes,
+            "memory_budget_bytes": self.max_bytes,
+            "disk_entries": len(self._disk) if self._disk is not None else 0,
+            "disk_enabled": bool(self.disk_dir) and not self._disk_failed,
+            "disk_dir": self._disk.directory if self._disk is not None else None,
+        }
@@ -1,17 +1,186 @@
+import os
 import asyncio
+import threading
 from typing import Union, List
 import numpy as np
-from sentence_transformers import SentenceTransformer
+
+from MEMORY_SYSTEM.embeddings.batcher import EmbeddingBatcher
+from MEMORY_SYSTEM.embeddings.cache import EmbeddingCache
+from MEMORY_SYSTEM.embeddings.process_backend import ProcessEmbeddingBackend
+from MEMORY_SYSTEM.embeddings.model_loader import load_sentence_model
 
 # ------------------------------------------------------------
-# Model initialized at app startup (ready immediately)
+# Model is loaded lazily (first encode or warm_up_embeddings),
+# never at import time
 # ------------------------------------------------------------
 MODEL_NAME = "BAAI/bge-large-en-v1.5"
+EMBEDDING_DIM = 1024
+
+# fp32 | int8 | onnx  (see model_loader.py; check with parity_check.py)
+EMBED_MODE = os.getenv("EMBED_MODE", "fp32")
+EMBED_ONNX_FILE = os.getenv("EMBED_ONNX_FILE") or None
+
+# thread  : model in this process, encode on the default executor
+# process : model in dedicated worker processes (see process_backend.py)
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "thread")
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", "1"))
+EMBED_WORKER_THREADS = int(os.getenv("EMBED_WORKER_THREADS", "0")) or None
+EMBED_WORKER_PIN_CPUS = os.getenv("EMBED_WORKER_PIN_CPUS", "0") == "1"
+EMBED_WORKER_TIMEOUT_S = float(os.getenv("EMBED_WORKER_TIMEOUT_S", "60"))
+
+# Micro-batching (concurrent callers share one encode call)
+EMBED_BATCHING = os.getenv("EMBED_BATCHING", "1") == "1"
+EMBED_BATCH_MAX_SIZE = int(os.getenv("EMBED_BATCH_MAX_SIZE", "32"))
+EMBED_BATCH_MAX_WAIT_MS = float(os.getenv("EMBED_BATCH_MAX_WAIT_MS", "5"))
+EMBED_BATCH_MAX_QUEUE = int(os.getenv("EMBED_BATCH_MAX_QUEUE", "1024"))
+
+EMBEDDING_MODEL = None
+_model_lock = threading.Lock()
+process_backend = None
+
+if EMBED_BACKEND == "process":
+    process_backend = ProcessEmbeddingBackend(
+        model_name=MODEL_NAME,
+        dim=EMBEDDING_DIM,
+        num_workers=EMBED_WORKERS,
+        max_rows=max(EMBED_BATCH_MAX_SIZE * 2, 64),
+        num_threads=EMBED_WORKER_THREADS,
+        pin_cpus=EMBED_WORKER_PIN_CPUS,
+        mode=EMBED_MODE,
+        onnx_file=EMBED_ONNX_FILE,
+        timeout_s=EMBED_WORKER_TIMEOUT_S,
+    )
+
+
+def get_embedding_model():
+    """
+    In-process model (thread backend), loaded once on first use.
+    Blocking: call from a worker thread, not the event loop.
+    """
+    global EMBEDDING_MODEL
+    if EMBEDDING_MODEL is None:
+        with _model_lock:
+            if EMBEDDING_MODEL is None:
+                try:
+                    EMBEDDING_MODEL = load_sentence_model(
+                        MODEL_NAME, EMBED_MODE, EMBED_ONNX_FILE
+                    )
+                except Exception as e:
+                    raise RuntimeError(f"Failed to initialize embedding model: {e}")
+    return EMBEDDING_MODEL
+
+
+def _encode_sync(texts: List[str], normalize: bool) -> np.ndarray:
+    return get_embedding_model().encode(
+        texts,
+        normalize_embeddings=normalize,
+        show_progress_bar=False,
+        batch_size=max(EMBED_BATCH_MAX_SIZE, 1),
+    )
+
+
+embedding_batcher = EmbeddingBatcher(
+    process_backend.encode if process_backend is not None else _encode_sync,
+    max_batch_size=EMBED_BATCH_MAX_SIZE,
+    max_wait_ms=EMBED_BATCH_MAX_WAIT_MS,
+    max_queue_depth=EMBED_BATCH_MAX_QUEUE,
+    max_inflight=EMBED_WORKERS if process_backend is not None else 1,
+)
+
+
+def embedding_batcher_stats() -> dict:
+    stats = embedding_batcher.stats()
+    stats["backend"] = EMBED_BACKEND
+    stats["mode"] = EMBED_MODE
+    if process_backend is not None:
+        stats["process"] = process_backend.stats()
+    return stats
+
+
+# ------------------------------------------------------------
+# Content-hash cache (LRU in memory + optional mmap file on disk)
+# ------------------------------------------------------------
+EMBED_CACHE = os.getenv("EMBED_CACHE", "1") == "1"
+EMBED_CACHE_MAX_MB = float(os.getenv("EMBED_CACHE_MAX_MB", "64"))
+EMBED_CACHE_DIR = os.getenv("EMBED_CACHE_DIR") or None
+EMBED_CACHE_DISK_CAPACITY = int(os.getenv("EMBED_CACHE_DISK_CAPACITY", "50000"))
+
+# vectors differ slightly per inference mode, so the mode is part of the key
+embedding_cache = EmbeddingCache(
+    model_name=f"{MODEL_NAME}:{EMBED_MODE}",
+    dim=EMBEDDING_DIM,
+    max_bytes=int(EMBED_CACHE_MAX_MB * 1024 * 1024),
+    disk_dir=EMBED_CACHE_DIR,
+    disk_capacity=EMBED_CACHE_DISK_CAPACITY,
+)
+
+
+def embedding_cache_stats() -> dict:
+    return embedding_cache.stats()
+
+
+async def warm_up_embeddings() -> None:
+    """
+    Load the model (or start the worker processes) and open the disk
+    cache tier off the event loop, then run one encode, so the first
+    real request pays nothing.
+    """
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, embedding_cache.open_disk)
+
+    if process_backend is not None:
+        await process_backend.start()
+    else:
+        await loop.run_in_executor(None, get_embedding_model)
+
+    await _encode(["warm up"], True)
+
+
+def close_embeddings() -> None:
+    """
+    Shutdown hook: persist the disk cache tier and stop worker processes.
+    """
+    embedding_cache.flush()
+    if process_backend is not None:
+        process_backend.close()
+
+
+async def _encode(texts: List[str], normalize: bool) -> np.ndarray:
+    if EMBED_BATCHING:
+        return await embedding_batcher.encode(texts, normalize)
+
+    if process_backend is not None:
+        return await process_backend.encode(texts, normalize)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None,
+        _encode_sync,
+        texts,
+        normalize,
+    )
+
+
+async def _encode_cached(texts: List[str], normalize: bool) -> np.ndarray:
+    """
+    Serve what the cache has; encode only the (deduplicated) misses.
+    """
+    cached = embedding_cache.get_many(texts, normalize)
+
+    missing = list(dict.fromkeys(
+        t for t, v in zip(texts, cached) if v is None
+    ))
+
+    if missing:
+        fresh = np.asarray(await _encode(missing, normalize), dtype=np.float32)
+        embedding_cache.put_many(missing, normalize, fresh)
+        by_text = dict(zip(missing, fresh))
+        cached = [
+            v if v is not None else by_text[t]
+            for t, v in zip(texts, cached)
+        ]
 
-try:
-    EMBEDDING_MODEL = SentenceTransformer(MODEL_NAME)
-except Exception as e:
-    raise RuntimeError(f"Failed to initialize embedding model at startup: {e}")
+    return np.stack(cached).astype(np.float32, copy=False)
 
 
 async def create_embedding(
@@ -19,7 +188,7 @@ async def create_embedding(
     normalize: bool = True,
 ) -> np.ndarray:
     """
-    Async embedding function (model already initialized)
+    Async embedding function (thread or process backend, see EMBED_BACKEND)
 
     Args:
         text: string or list of strings
@@ -34,15 +203,10 @@ async def create_embedding(
 
         texts = [text] if isinstance(text, str) else text
 
-        loop = asyncio.get_running_loop()
-        embeddings = await loop.run_in_executor(
-            None,
-            lambda: EMBEDDING_MODEL.encode(
-                texts,
-                normalize_embeddings=normalize,
-                show_progress_bar=False
-            )
-        )
+        if EMBED_CACHE:
+            embeddings = await _encode_cached(texts, normalize)
+        else:
+            embeddings = await _encode(texts, normalize)
 
         embeddings = np.asarray(embeddings, dtype=np.float32)
 
@@ -0,0 +1,63 @@
+# MEMORY_SYSTEM/embeddings/model_loader.py
+#
+# Imported by the embedding worker processes as well, keep it light:
+# heavy libraries are imported inside load_sentence_model only.
+
+from typing import Optional
+
+# fp32 : full precision PyTorch (reference)
+# int8 : PyTorch dynamic int8 quantization of every nn.Linear
+# onnx : ONNX Runtime CPU graph (needs `optimum[onnxruntime]`)
+EMBED_MODES = ("fp32", "int8", "onnx")
+
+
+def load_sentence_model(
+    model_name: str,
+    mode: str = "fp32",
+    onnx_file: Optional[str] = None,
+):
+    """
+    Build a SentenceTransformer for the requested inference mode
+    (int8 / onnx are CPU-only).
+
+    All modes keep the same tokenizer, pooling and output dimension, so
+    vectors stay compatible with the VECTOR(1024) column.
+    """
+    if mode not in EMBED_MODES:
+        raise ValueError(f"Unknown embedding mode '{mode}', expected one of {EMBED_MODES}")
+
+    from sentence_transformers import SentenceTransformer
+
+    if mode == "fp32":
+        return SentenceTransformer(model_name)
+
+    if mode == "int8":
+        import torch
+
+        model = SentenceTransformer(model_name, device="cpu")
+        model.eval()
+        return torch.quantization.quantize_dynamic(
+            model,
+            {torch.nn.Linear},
+            dtype=torch.qint8,
+        )
+
+    # onnx
+    try:
+        import onnxruntime  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError(
+            "EMBED_MODE=onnx requires onnxruntime (pip install 'optimum[onnxruntime]')"
+        ) from e
+
+    model_kwargs = {"provider": "CPUExecutionProvider"}
+    if onnx_file:
+        # e.g. "onnx/model_qint8_avx512_vnni.onnx" for a pre-quantized graph
+        model_kwargs["file_name"] = onnx_file
+
+    return SentenceTransformer(
+        model_name,
+        device="cpu",
+        backend="onnx",
+        model_kwargs=model_kwargs,
+    )
@@ -0,0 +1,139 @@
+"""
+Embedding Parity Check
+======================
+
+Purpose:
+- Compare an alternative inference mode (int8 / onnx) against the fp32
+  reference model on a fixed corpus before switching EMBED_MODE
+- Output dimension must stay 1024 (VECTOR(1024) column)
+- Per-sentence cosine to the fp32 vector must stay above a floor
+- Nearest-neighbour order inside the corpus must be preserved
+
+Usage:
+    python MEMORY_SYSTEM/embeddings/parity_check.py int8
+    python MEMORY_SYSTEM/embeddings/parity_check.py onnx
+"""
+
+import sys
+import os
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "..", ".."))
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import time
+import numpy as np
+
+from MEMORY_SYSTEM.embeddings.model_loader import load_sentence_model
+
+MODEL_NAME = "BAAI/bge-large-en-v1.5"
+EXPECTED_DIM = 1024
+
+MIN_COSINE = float(os.getenv("PARITY_MIN_COSINE", "0.98"))
+MIN_MEAN_COSINE = float(os.getenv("PARITY_MIN_MEAN_COSINE", "0.99"))
+MIN_TOP1_AGREEMENT = float(os.getenv("PARITY_MIN_TOP1_AGREEMENT", "0.95"))
+
+# Fixed corpus: shaped like the facts, queries and intent prototypes we embed
+PARITY_CORPUS = [
+    "User has a 500GB PostgreSQL database.",
+    "Queries take more than 30 seconds.",
+    "Full table scans are happening.",
+    "Indexes already exist on join columns.",
+    "System uses Redis for caching.",
+    "Application is built with FastAPI.",
+    "pgvector is used for embeddings.",
+    "User prefers concise answers.",
+    "System is in production.",
+    "Performance optimization is the goal.",
+    "User works at an FMCG company selling packaged snacks.",
+    "Emails should be written in a friendly but professional tone.",
+    "The target audience is procurement managers in retail chains.",
+    "User is drafting a follow-up email to leads from a trade show.",
+    "Avoid using more than three bullet points per email.",
+    "The company brand colour is dark green.",
+    "User prefers British English spelling.",
+    "The product launch is planned for next quarter.",
+    "high level system design and architecture overview",
+    "conceptual explanation of how an AI system works",
+    "overview of components and interactions",
+    "big picture design of an AI agent system",
+    "how to implement a specific feature",
+    "how to debug or fix an issue",
+    "step by step implementation guidance",
+    "practical backend implementation details",
+    "short direct factual answer",
+    "quick clarification",
+    "concise response without explanation",
+    "Create a fresh new email for me, which follows to the leads of FMCG companies",
+    "What did we decide about the subject line yesterday?",
+    "Rewrite the same email but make it shorter",
+]
+
+
+def _encode(model, texts):
+    return np.asarray(
+        model.encode(texts, normalize_embeddings=True, show_progress_bar=False),
+        dtype=np.float32,
+    )
+
+
+def run_parity_check(mode: str, onnx_file: str | None = None) -> dict:
+    reference = load_sentence_model(MODEL_NAME, "fp32")
+    candidate = load_sentence_model(MODEL_NAME, mode, onnx_file)
+
+    t0 = time.perf_counter()
+    ref = _encode(reference, PARITY_CORPUS)
+    t1 = time.perf_counter()
+    cand = _encode(candidate, PARITY_CORPUS)
+    t2 = time.perf_counter()
+
+    # both sides are normalized: dot == cosine
+    cosines = np.sum(ref * cand, axis=1)
+
+    # nearest neighbour (excluding self) must agree
+    def top1(m):
+        sims = m @ m.T
+        np.fill_diagonal(sims, -np.inf)
+        return np.argmax(sims, axis=1)
+
+    agreement = float(np.mean(top1(ref) == top1(cand)))
+
+    report = {
+        "mode": mode,
+        "dim": int(cand.shape[1]),
+        "min_cosine": float(cosines.min()),
+        "mean_cosine": float(cosines.mean()),
+        "worst_sentence": PARITY_CORPUS[int(np.argmin(cosines))],
+        "top1_agreement": agreement,
+        "fp32_ms": round((t1 - t0) * 1000, 1),
+        "candidate_ms": round((t2 - t1) * 1000, 1),
+    }
+
+    report["passed"] = (
+        report["dim"] == EXPECTED_DIM
+        and report["min_cosine"] >= MIN_COSINE
+        and report["mean_cosine"] >= MIN_MEAN_COSINE
+        and report["top1_agreement"] >= MIN_TOP1_AGREEMENT
+    )
+
+    return report
+
+
+if __name__ == "__main__":
+    mode = sys.argv[1] if len(sys.argv) > 1 else "int8"
+    onnx_file = sys.argv[2] if len(sys.argv) > 2 else os.getenv("EMBED_ONNX_FILE")
+
+    print(f"🔬 Parity check: fp32 vs {mode}")
+    result = run_parity_check(mode, onnx_file)
+
+    for key, value in result.items():
+        print(f"  {key:16s}: {value}")
+
+    if result["passed"]:
+        print("✅ Parity check passed")
+        sys.exit(0)
+
+    print("❌ Parity check FAILED")
+    sys.exit(1)
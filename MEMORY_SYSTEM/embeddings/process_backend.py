@@ -0,0 +1,358 @@
+# MEMORY_SYSTEM/embeddings/process_backend.py
+#
+# NOTE: this module is imported by the spawned worker processes.
+# It must NOT import MEMORY_SYSTEM.embeddings.encoder (that would load
+# the model a second time inside every worker).
+
+import os
+import asyncio
+import traceback
+import multiprocessing as mp
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Optional
+
+import numpy as np
+
+from MEMORY_SYSTEM.embeddings.model_loader import load_sentence_model
+
+
+# =====================================================
+# CPU topology
+# =====================================================
+def available_cpus() -> List[int]:
+    """
+    CPUs this process may run on (respects taskset / cgroup cpusets).
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def physical_core_ratio() -> float:
+    """
+    physical cores / logical CPUs (0.5 with SMT on, 1.0 otherwise).
+    """
+    try:
+        import psutil
+        logical = psutil.cpu_count(logical=True) or 1
+        physical = psutil.cpu_count(logical=False) or logical
+        return max(physical / logical, 0.0) or 1.0
+    except Exception:
+        return 1.0
+
+
+def threads_per_worker(num_workers: int) -> int:
+    """
+    Split the physical cores we may use evenly across workers.
+    torch intra-op threads beyond physical cores only add contention.
+    """
+    cores = int(len(available_cpus()) * physical_core_ratio()) or 1
+    return max(1, cores // max(num_workers, 1))
+
+
+def cpu_partition(num_workers: int) -> List[List[int]]:
+    """
+    Disjoint CPU sets, one per worker (used when pinning is enabled).
+    """
+    cpus = available_cpus()
+    size = max(1, len(cpus) // max(num_workers, 1))
+    return [cpus[i * size:(i + 1) * size] or cpus for i in range(num_workers)]
+
+
+# =====================================================
+# Worker process
+# =====================================================
+def _worker_main(
+    conn,
+    shm_name: str,
+    max_rows: int,
+    dim: int,
+    model_name: str,
+    mode: str,
+    onnx_file: Optional[str],
+    num_threads: int,
+    cpus: Optional[List[int]],
+) -> None:
+    # Thread env must be set before torch is imported
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(num_threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+    if cpus and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, cpus)
+        except Exception:
+            pass
+
+    shm = None
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+
+        model = load_sentence_model(model_name, mode, onnx_file)
+
+        # Spawned children share the parent's resource tracker, so the
+        # segment stays registered once and the parent unlinks it.
+        shm = shared_memory.SharedMemory(name=shm_name)
+
+        out = np.ndarray((max_rows, dim), dtype=np.float32, buffer=shm.buf)
+        conn.send(("ready", None))
+    except Exception as e:
+        conn.send(("error", f"worker init failed: {e!r}"))
+        return
+
+    try:
+        while True:
+            msg = conn.recv()
+            if msg is None:
+                break
+
+            texts, normalize = msg
+            try:
+                emb = model.encode(
+                    texts,
+                    normalize_embeddings=normalize,
+                    show_progress_bar=False,
+                    batch_size=len(texts),
+                )
+                n = len(texts)
+                out[:n] = np.asarray(emb, dtype=np.float32)
+                conn.send(("ok", n))
+            except Exception as e:
+                conn.send(("error", repr(e)))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        del out
+        shm.close()
+
+
+# =====================================================
+# Parent side
+# =====================================================
+class _WorkerHandle:
+    def __init__(self, index: int):
+        self.index = index
+        self.process = None
+        self.conn = None
+        self.shm: Optional[shared_memory.SharedMemory] = None
+        self.out: Optional[np.ndarray] = None
+        self.jobs = 0
+
+
+class ProcessEmbeddingBackend:
+    """
+    SentenceTransformer running in dedicated worker processes.
+
+    - One model per worker, `threads_per_worker` torch threads each
+    - Requests go over a Pipe as (texts, normalize); the worker writes
+      the rows into a per-worker shared-memory block and replies with
+      the row count only, so no float lists are pickled
+    - Each worker serves one request at a time; batches larger than
+      `max_rows` are split across workers
+    - A worker that dies, or does not reply within `timeout_s`, is
+      respawned on its next use
+    - A worker goes back to the idle pool only once its round trip is
+      over, even when the awaiting caller was cancelled
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        dim: int,
+        num_workers: int = 1,
+        max_rows: int = 64,
+        num_threads: Optional[int] = None,
+        pin_cpus: bool = False,
+        mode: str = "fp32",
+        onnx_file: Optional[str] = None,
+        timeout_s: float = 60.0,
+    ):
+        self.model_name = model_name
+        self.mode = mode
+        self.onnx_file = onnx_file
+        self.dim = dim
+        self.num_workers = max(1, num_workers)
+        self.max_rows = max(1, max_rows)
+        self.num_threads = num_threads or threads_per_worker(self.num_workers)
+        self.pin_cpus = pin_cpus
+        self.timeout_s = timeout_s
+
+        self._ctx = mp.get_context("spawn")
+        self._workers: List[_WorkerHandle] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        # threads only wait on pipes (GIL released), never run inference
+        self._waiters = ThreadPoolExecutor(
+            max_workers=self.num_workers, thread_name_prefix="embed-ipc"
+        )
+
+    # -------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------
+    def _spawn(self, worker: _WorkerHandle) -> None:
+        nbytes = self.max_rows * self.dim * np.dtype(np.float32).itemsize
+        worker.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        worker.out = np.ndarray(
+            (self.max_rows, self.dim), dtype=np.float32, buffer=worker.shm.buf
+        )
+
+        parent_conn, child_conn = self._ctx.Pipe()
+        cpus = cpu_partition(self.num_workers)[worker.index] if self.pin_cpus else None
+
+        worker.process = self._ctx.Process(
+            target=_worker_main,
+            args=(
+                child_conn,
+                worker.shm.name,
+                self.max_rows,
+                self.dim,
+                self.model_name,
+                self.mode,
+                self.onnx_file,
+                self.num_threads,
+                cpus,
+            ),
+            daemon=True,
+            name=f"embed-worker-{worker.index}",
+        )
+        worker.process.start()
+        child_conn.close()
+        worker.conn = parent_conn
+
+        status, detail = worker.conn.recv()
+        if status != "ready":
+            self._release(worker)
+            raise RuntimeError(detail)
+
+    def _release(self, worker: _WorkerHandle) -> None:
+        try:
+            if worker.conn is not None:
+                try:
+                    worker.conn.send(None)
+                except Exception:
+                    pass
+                worker.conn.close()
+            if worker.process is not None:
+                worker.process.join(timeout=5)
+                if worker.process.is_alive():
+                    worker.process.terminate()
+        finally:
+            worker.out = None
+            if worker.shm is not None:
+                worker.shm.close()
+                try:
+                    worker.shm.unlink()
+                except FileNotFoundError:
+                    pass
+            worker.conn = None
+            worker.process = None
+            worker.shm = None
+
+    def _start_sync(self) -> None:
+        for i in range(self.num_workers):
+            worker = _WorkerHandle(i)
+            self._spawn(worker)
+            self._workers.append(worker)
+        print(
+            f"✅ [EMBED-PROC] {self.num_workers} worker(s) ready, "
+            f"{self.num_threads} thread(s) each"
+        )
+
+    async def start(self) -> None:
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+
+        async with self._start_lock:
+            if self._idle is not None:
+                return
+            await asyncio.get_running_loop().run_in_executor(
+                self._waiters, self._start_sync
+            )
+            self._idle = asyncio.Queue()
+            for worker in self._workers:
+                self._idle.put_nowait(worker)
+
+    def close(self) -> None:
+        for worker in self._workers:
+            self._release(worker)
+        self._workers = []
+        self._idle = None
+        self._waiters.shutdown(wait=False)
+
+    # -------------------------------------------------
+    # Encoding
+    # -------------------------------------------------
+    def _roundtrip(self, worker: _WorkerHandle, texts: List[str], normalize: bool) -> np.ndarray:
+        if worker.process is None or not worker.process.is_alive():
+            print(f"⚠️ [EMBED-PROC] worker {worker.index} not alive, respawning")
+            self._release(worker)
+            self._spawn(worker)
+
+        try:
+            worker.conn.send((texts, normalize))
+            if not worker.conn.poll(self.timeout_s):
+                # hung: kill it, the next use respawns
+                worker.process.terminate()
+                self._release(worker)
+                raise RuntimeError(
+                    f"embedding worker {worker.index} timed out after {self.timeout_s}s"
+                )
+            status, detail = worker.conn.recv()
+        except (EOFError, BrokenPipeError, OSError) as e:
+            traceback.print_exc()
+            self._release(worker)
+            raise RuntimeError(f"embedding worker {worker.index} died: {e!r}")
+
+        if status != "ok":
+            raise RuntimeError(f"embedding worker {worker.index} failed: {detail}")
+
+        worker.jobs += 1
+        # copy out before the worker is handed the next request
+        return worker.out[:detail].copy()
+
+    def _return_worker(self, worker: _WorkerHandle, fut: "asyncio.Future") -> None:
+        if not fut.cancelled():
+            fut.exception()  # retrieved: the caller is gone
+        if self._idle is not None:
+            self._idle.put_nowait(worker)
+
+    async def _encode_chunk(self, texts: List[str], normalize: bool) -> np.ndarray:
+        worker = await self._idle.get()
+        fut = asyncio.get_running_loop().run_in_executor(
+            self._waiters, self._roundtrip, worker, texts, normalize
+        )
+        try:
+            return await asyncio.shield(fut)
+        finally:
+            if fut.done():
+                self._idle.put_nowait(worker)
+            else:
+                # cancelled while the thread is still on this worker's
+                # pipe and buffer: hand it out again only once that is over
+                fut.add_done_callback(lambda f: self._return_worker(worker, f))
+
+    async def encode(self, texts: List[str], normalize: bool = True) -> np.ndarray:
+        if self._idle is None:
+            await self.start()
+
+        chunks = [
+            texts[i:i + self.max_rows]
+            for i in range(0, len(texts), self.max_rows)
+        ]
+        parts = await asyncio.gather(
+            *(self._encode_chunk(chunk, normalize) for chunk in chunks)
+        )
+        return np.concatenate(parts, axis=0) if len(parts) > 1 else parts[0]
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.num_workers,
+            "mode": self.mode,
+            "threads_per_worker": self.num_threads,
+            "max_rows_per_request": self.max_rows,
+            "pinned": self.pin_cpus,
+            "idle_workers": self._idle.qsize() if self._idle is not None else 0,
+            "jobs_per_worker": [w.jobs for w in self._workers],
+        }
@@ -5,7 +5,6 @@ from typing import Optional, Type
 import traceback
 import os
 
-from langchain_aws import ChatBedrock
 from pydantic import BaseModel
 
 
@@ -18,19 +17,32 @@ LLM_MODEL_NEWS_FETCHER = "amazon.nova-lite-v1:0"
 # BEDROCK INITIALIZATION
 # -------------------------------------------------------------------
 
-try:
-    llm = ChatBedrock(
-        model_id=LLM_MODEL_NEWS_FETCHER,
-        region_name=AWS_MODEL_REGION,
-        temperature=0.1,
-        max_tokens=9999,
-        aws_access_key_id=AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-    )
-except Exception:
-    print("❌ [BEDROCK] Failed to initialize ChatBedrock")
-    traceback.print_exc()
-    llm = None
+_llm = None
+
+
+def get_llm():
+    """
+    ChatBedrock client, built on first use (keeps import cheap).
+    Returns None if initialization fails (retried on the next call).
+    """
+    global _llm
+    if _llm is None:
+        try:
+            from langchain_aws import ChatBedrock
+
+            _llm = ChatBedrock(
+                model_id=LLM_MODEL_NEWS_FETCHER,
+                region_name=AWS_MODEL_REGION,
+                temperature=0.1,
+                max_tokens=9999,
+                aws_access_key_id=AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+            )
+        except Exception:
+            print("❌ [BEDROCK] Failed to initialize ChatBedrock")
+            traceback.print_exc()
+            _llm = None
+    return _llm
 
 
 # -------------------------------------------------------------------
@@ -52,6 +64,7 @@ async def bedrock_structured_llm_call(
     - Full traceback on failure
     """
 
+    llm = get_llm()
     if llm is None:
         print("❌ [BEDROCK] LLM not initialized")
         return None
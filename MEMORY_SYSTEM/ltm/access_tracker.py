@@ -0,0 +1,192 @@
+# MEMORY_SYSTEM/ltm/access_tracker.py
+#
+# Write-behind access tracking for retrieved factual memories.
+#
+# retrieve_ltm_memories records every factual row it returns; nothing is
+# written on the read path. A background task flushes the accumulated
+# accesses every LTM_ACCESS_FLUSH_INTERVAL_S in one transaction:
+# - memory_signals.access_count / last_accessed (narrow row, HOT update)
+# - one compacted 'retrieved' memory_event per memory and flush
+#   (metadata.count = accesses folded into it)
+#
+# Loss is bounded: stop() (FastAPI lifespan) flushes what is pending,
+# a crash loses at most one interval. A failed flush keeps its accesses
+# for the next one, up to LTM_ACCESS_MAX_PENDING memories.
+
+import asyncio
+import os
+import traceback
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from MEMORY_SYSTEM.database.connect.connect import db_manager
+
+LTM_ACCESS_TRACKING = os.getenv("LTM_ACCESS_TRACKING", "1") == "1"
+LTM_ACCESS_FLUSH_INTERVAL_S = float(os.getenv("LTM_ACCESS_FLUSH_INTERVAL_S", "5"))
+LTM_ACCESS_MAX_PENDING = int(os.getenv("LTM_ACCESS_MAX_PENDING", "50000"))
+
+# A memory without a signals row gets one seeded from its memories
+# values; deleted memories drop out of the JOIN.
+# $1 memory_id[], $2 accesses, $3 last access
+_SIGNALS_SQL = """
+    INSERT INTO agentic_memory_schema.memory_signals AS s (
+        memory_id,
+        frequency,
+        importance,
+        last_updated,
+        access_count,
+        last_accessed
+    )
+    SELECT
+        m.memory_id,
+        m.frequency,
+        m.importance,
+        m.last_updated,
+        u.hits,
+        GREATEST(m.last_accessed, u.accessed_at)
+    FROM unnest($1::uuid[], $2::int[], $3::timestamptz[])
+        AS u(memory_id, hits, accessed_at)
+    JOIN agentic_memory_schema.memories m
+      ON m.memory_id = u.memory_id
+    ON CONFLICT (memory_id) DO UPDATE
+    SET
+        access_count = s.access_count + EXCLUDED.access_count,
+        last_accessed = GREATEST(s.last_accessed, EXCLUDED.last_accessed)
+"""
+
+_EVENTS_SQL = """
+    INSERT INTO agentic_memory_schema.memory_events (
+        memory_id,
+        event_type,
+        source,
+        metadata,
+        created_at
+    )
+    SELECT
+        u.memory_id,
+        'retrieved',
+        'retrieval',
+        jsonb_build_object('count', u.hits),
+        u.accessed_at
+    FROM unnest($1::uuid[], $2::int[], $3::timestamptz[])
+        AS u(memory_id, hits, accessed_at)
+"""
+
+
+class AccessTracker:
+    def __init__(
+        self,
+        enabled: bool = LTM_ACCESS_TRACKING,
+        max_pending: int = LTM_ACCESS_MAX_PENDING,
+    ):
+        self.enabled = enabled
+        self.max_pending = max_pending
+
+        # memory_id -> [hits, last access]
+        self._pending: Dict[object, list] = {}
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.recorded = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.flush_errors = 0
+
+    # -------------------------------------------------
+    # Read path (no I/O)
+    # -------------------------------------------------
+    def record(self, rows: Iterable[dict]) -> None:
+        if not self.enabled:
+            return
+
+        now = datetime.now(timezone.utc)
+        for row in rows:
+            self._add(row["memory_id"], 1, now)
+            self.recorded += 1
+
+        if len(self._pending) >= self.max_pending:
+            self._wake.set()
+
+    def _add(self, memory_id, hits: int, accessed_at: datetime) -> None:
+        entry = self._pending.get(memory_id)
+        if entry is not None:
+            entry[0] += hits
+            entry[1] = max(entry[1], accessed_at)
+        elif len(self._pending) < self.max_pending:
+            self._pending[memory_id] = [hits, accessed_at]
+        else:
+            self.dropped += hits
+
+    # -------------------------------------------------
+    # Flush
+    # -------------------------------------------------
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            batch, self._pending = self._pending, {}
+            ids: List = list(batch)
+            hits = [batch[m][0] for m in ids]
+            accessed_at = [batch[m][1] for m in ids]
+
+            try:
+                pool = await db_manager.get_pool()
+                async with pool.acquire() as conn:
+                    async with conn.transaction():
+                        await conn.execute(_SIGNALS_SQL, ids, hits, accessed_at)
+                        await conn.execute(_EVENTS_SQL, ids, hits, accessed_at)
+            except Exception:
+                self.flush_errors += 1
+                traceback.print_exc()
+                # retry with the next flush
+                for m, (n, ts) in batch.items():
+                    self._add(m, n, ts)
+                return 0
+
+            self.flushed += sum(hits)
+            return len(ids)
+
+    async def _loop(self, interval_s: float) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=interval_s)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                traceback.print_exc()
+
+    def start(self, interval_s: float = LTM_ACCESS_FLUSH_INTERVAL_S) -> None:
+        if self.enabled and self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._loop(interval_s))
+
+    async def stop(self) -> None:
+        # no cancel: a flush in progress must finish, not roll back
+        if self._task is not None:
+            self._stopping = True
+            self._wake.set()
+            try:
+                await self._task
+            except Exception:
+                traceback.print_exc()
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "pending_memories": len(self._pending),
+            "recorded": self.recorded,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "flush_errors": self.flush_errors,
+        }
+
+
+access_tracker = AccessTracker()
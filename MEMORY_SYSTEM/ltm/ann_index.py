@@ -0,0 +1,359 @@
+# MEMORY_SYSTEM/ltm/ann_index.py
+#
+# Lifecycle of the ANN index on memories.embedding:
+# - choose HNSW or ivfflat from the pgvector version and the row count
+# - build / rebuild CONCURRENTLY when the table outgrows the build
+# - derive ivfflat.probes / hnsw.ef_search from a recall target
+# - report health (validity, size, growth since build, scans)
+#
+# Build state lives in a COMMENT on the index so every app instance (and
+# a restart) sees the same rows_at_build / params.
+
+import asyncio
+import json
+import math
+import os
+import re
+import time
+import traceback
+from typing import Dict, Optional
+
+from MEMORY_SYSTEM.database.connect.connect import db_manager
+from MEMORY_SYSTEM.ltm.vector_query import (
+    EMBEDDING_INDEX,
+    MEMORIES_TABLE,
+    VECTOR_OPCLASS,
+)
+
+# =====================================================
+# Tunables
+# =====================================================
+ANN_INDEX_METHOD = os.getenv("ANN_INDEX_METHOD", "auto")        # auto | hnsw | ivfflat
+ANN_RECALL_TARGET = float(os.getenv("ANN_RECALL_TARGET", "0.95"))
+ANN_IVFFLAT_MIN_ROWS = int(os.getenv("ANN_IVFFLAT_MIN_ROWS", "10000"))
+ANN_REBUILD_GROWTH = float(os.getenv("ANN_REBUILD_GROWTH", "2.0"))
+ANN_CHECK_INTERVAL_S = float(os.getenv("ANN_CHECK_INTERVAL_S", "3600"))
+ANN_BUILD_MAINTENANCE_WORK_MEM = os.getenv("ANN_BUILD_MAINTENANCE_WORK_MEM", "512MB")
+
+# one builder across all app instances
+_BUILD_LOCK_KEY = 7_401_236_551
+
+_SCHEMA, _TABLE = MEMORIES_TABLE.split(".")
+
+
+# =====================================================
+# Parameter selection
+# =====================================================
+def ivfflat_lists(rows: int) -> int:
+    # pgvector guidance: rows / 1000 up to 1M rows, sqrt(rows) beyond
+    if rows <= 1_000_000:
+        return max(10, rows // 1000)
+    return int(math.sqrt(rows))
+
+
+def ivfflat_probes(lists: int, recall_target: float = ANN_RECALL_TARGET) -> int:
+    # ~sqrt(lists) probes gives ~0.9 recall; double per extra "nine"
+    base = math.sqrt(lists)
+    if recall_target >= 0.99:
+        factor = 4.0
+    elif recall_target >= 0.95:
+        factor = 2.0
+    else:
+        factor = 1.0
+    return max(1, min(lists, int(math.ceil(base * factor))))
+
+
+def hnsw_build_params(rows: int) -> Dict[str, int]:
+    if rows >= 1_000_000:
+        return {"m": 24, "ef_construction": 128}
+    return {"m": 16, "ef_construction": 64}
+
+
+def hnsw_ef_search(limit: int, recall_target: float = ANN_RECALL_TARGET) -> int:
+    if recall_target >= 0.99:
+        ef = 200
+    elif recall_target >= 0.95:
+        ef = 80
+    else:
+        ef = 40
+    # ef_search below LIMIT silently returns fewer rows
+    return max(ef, limit)
+
+
+def _parse_indexdef(indexdef: str) -> dict:
+    """
+    Recover method / params for indexes created before the manager
+    (no comment): treated as built on an empty table.
+    """
+    method = "hnsw" if " USING hnsw " in indexdef else "ivfflat"
+    params = {
+        k: int(v)
+        for k, v in re.findall(r"(\w+)='?(\d+)'?", indexdef.split("WITH", 1)[-1])
+    } if "WITH" in indexdef else {}
+    return {"method": method, "params": params, "rows_at_build": 0}
+
+
+class AnnIndexManager:
+    """
+    Owns idx_memories_embedding.
+
+    - maintain(): create / rebuild when needed (safe to call repeatedly)
+    - apply_search_params(conn, limit): per-query recall tuning
+    - health(): index report for /ann/health
+    """
+
+    def __init__(self):
+        self.state: Optional[dict] = None   # {"method", "params", "rows_at_build", "built_at"}
+        self.pgvector_version: tuple = ()
+        self._task: Optional[asyncio.Task] = None
+        self._last_check: Optional[dict] = None
+
+    # -------------------------------------------------
+    # Introspection
+    # -------------------------------------------------
+    async def _row_count(self, conn) -> int:
+        # planner estimate is free; -1 means never analyzed
+        estimate = await conn.fetchval(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = $1::regclass",
+            MEMORIES_TABLE,
+        )
+        if estimate is not None and estimate >= 0:
+            return int(estimate)
+        return int(await conn.fetchval(f"SELECT COUNT(*) FROM {MEMORIES_TABLE}"))
+
+    async def _pgvector_version(self, conn) -> tuple:
+        version = await conn.fetchval(
+            "SELECT extversion FROM pg_extension WHERE extname = 'vector'"
+        )
+        return tuple(int(p) for p in re.findall(r"\d+", version or "0"))
+
+    async def _load_state(self, conn) -> Optional[dict]:
+        row = await conn.fetchrow(
+            """
+            SELECT i.indexdef, obj_description(c.oid, 'pg_class') AS comment
+            FROM pg_indexes i
+            JOIN pg_class c ON c.relname = i.indexname
+            JOIN pg_namespace n ON n.oid = c.relnamespace AND n.nspname = i.schemaname
+            WHERE i.schemaname = $1 AND i.indexname = $2
+            """,
+            _SCHEMA,
+            EMBEDDING_INDEX,
+        )
+        if not row:
+            return None
+        try:
+            return json.loads(row["comment"])
+        except (TypeError, ValueError):
+            return _parse_indexdef(row["indexdef"])
+
+    async def _choose_method(self, conn, rows: int) -> str:
+        if ANN_INDEX_METHOD in ("hnsw", "ivfflat"):
+            return ANN_INDEX_METHOD
+        # HNSW needs pgvector >= 0.5 and no training data
+        if self.pgvector_version >= (0, 5):
+            return "hnsw"
+        return "ivfflat"
+
+    def _target_params(self, method: str, rows: int) -> dict:
+        if method == "hnsw":
+            return hnsw_build_params(rows)
+        return {"lists": ivfflat_lists(rows)}
+
+    def _rebuild_reason(self, method: str, rows: int) -> Optional[str]:
+        state = self.state
+        if method == "ivfflat" and rows < ANN_IVFFLAT_MIN_ROWS:
+            return None  # too few rows to train centroids, exact scan is fine
+        if state is None:
+            return "missing"
+        if state["method"] != method:
+            return f"method {state['method']} -> {method}"
+        if state["params"] != self._target_params(method, rows):
+            if method == "hnsw":
+                return "hnsw params tier changed"
+            # ivfflat centroids go stale as the table grows
+            if rows >= max(state["rows_at_build"], 1) * ANN_REBUILD_GROWTH:
+                return f"grew {state['rows_at_build']} -> {rows} rows"
+        return None
+
+    # -------------------------------------------------
+    # Build
+    # -------------------------------------------------
+    async def _build(self, conn, method: str, rows: int) -> None:
+        params = self._target_params(method, rows)
+        with_clause = ", ".join(f"{k} = {v}" for k, v in params.items())
+        tmp_index = f"{EMBEDDING_INDEX}_new"
+        old_index = f"{EMBEDDING_INDEX}_old"
+
+        await conn.execute(f"SET maintenance_work_mem = '{ANN_BUILD_MAINTENANCE_WORK_MEM}'")
+        # leftovers from an interrupted build / swap, drop them first
+        await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {_SCHEMA}.{tmp_index}")
+        await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {_SCHEMA}.{old_index}")
+
+        started = time.perf_counter()
+        await conn.execute(
+            f"""
+            CREATE INDEX CONCURRENTLY {tmp_index}
+            ON {MEMORIES_TABLE}
+            USING {method} (embedding {VECTOR_OPCLASS})
+            WITH ({with_clause})
+            """
+        )
+
+        state = {
+            "method": method,
+            "params": params,
+            "rows_at_build": rows,
+            "built_at": time.time(),
+        }
+
+        # swap in one transaction: there is always a live index, the
+        # old one is dropped only after the new one has its name
+        async with conn.transaction():
+            await conn.execute(
+                f"ALTER INDEX IF EXISTS {_SCHEMA}.{EMBEDDING_INDEX} RENAME TO {old_index}"
+            )
+            await conn.execute(f"ALTER INDEX {_SCHEMA}.{tmp_index} RENAME TO {EMBEDDING_INDEX}")
+            await conn.execute(
+                f"COMMENT ON INDEX {_SCHEMA}.{EMBEDDING_INDEX} IS {_quote(json.dumps(state))}"
+            )
+        await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {_SCHEMA}.{old_index}")
+
+        self.state = state
+        print(
+            f"✅ [ANN] Built {method} {params} on {rows} rows "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+    async def maintain(self) -> dict:
+        """
+        Create or rebuild the index if needed. Returns what was checked.
+        """
+        pool = await db_manager.get_pool()
+        async with pool.acquire() as conn:
+            self.state = await self._load_state(conn)
+            self.pgvector_version = await self._pgvector_version(conn)
+            rows = await self._row_count(conn)
+            method = await self._choose_method(conn, rows)
+            reason = self._rebuild_reason(method, rows)
+
+            result = {"rows": rows, "method": method, "rebuild": reason}
+
+            if reason:
+                locked = await conn.fetchval("SELECT pg_try_advisory_lock($1)", _BUILD_LOCK_KEY)
+                if not locked:
+                    result["rebuild"] = None
+                    result["skipped"] = "another instance is building"
+                else:
+                    try:
+                        print(f"🔧 [ANN] Rebuilding {EMBEDDING_INDEX}: {reason}")
+                        await self._build(conn, method, rows)
+                    finally:
+                        await conn.execute("SELECT pg_advisory_unlock($1)", _BUILD_LOCK_KEY)
+
+        self._last_check = {**result, "checked_at": time.time()}
+        return result
+
+    # -------------------------------------------------
+    # Query-time tuning
+    # -------------------------------------------------
+    def search_settings(self, limit: int, iterative: bool = False) -> Dict[str, object]:
+        """
+        iterative: keep scanning the index until LIMIT rows pass the WHERE
+        filters (pgvector >= 0.8), instead of post-filtering a fixed
+        candidate list down to too few rows.
+        """
+        if not self.state:
+            return {}
+        method = self.state["method"]
+        if method == "hnsw":
+            settings = {"hnsw.ef_search": hnsw_ef_search(limit)}
+        else:
+            settings = {"ivfflat.probes": ivfflat_probes(self.state["params"].get("lists", 100))}
+        if iterative and self.pgvector_version >= (0, 8):
+            settings[f"{method}.iterative_scan"] = "relaxed_order"
+        return settings
+
+    async def apply_search_params(self, conn, limit: int, iterative: bool = False) -> None:
+        """
+        One round trip before an ANN query. Session-level SET is enough:
+        the pool runs RESET ALL when the connection is released.
+        """
+        settings = self.search_settings(limit, iterative)
+        if settings:
+            await conn.execute(
+                "; ".join(f"SET {name} = {value}" for name, value in settings.items())
+            )
+
+    # -------------------------------------------------
+    # Health
+    # -------------------------------------------------
+    async def health(self) -> dict:
+        pool = await db_manager.get_pool()
+        async with pool.acquire() as conn:
+            self.state = await self._load_state(conn)
+            rows = await self._row_count(conn)
+            stats = await conn.fetchrow(
+                """
+                SELECT
+                    x.indisvalid AS valid,
+                    pg_relation_size(c.oid) AS size_bytes,
+                    s.idx_scan AS scans
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                JOIN pg_index x ON x.indexrelid = c.oid
+                LEFT JOIN pg_stat_user_indexes s ON s.indexrelid = c.oid
+                WHERE n.nspname = $1 AND c.relname = $2
+                """,
+                _SCHEMA,
+                EMBEDDING_INDEX,
+            )
+
+        report = {
+            "index": EMBEDDING_INDEX,
+            "exists": stats is not None,
+            "rows": rows,
+            "recall_target": ANN_RECALL_TARGET,
+            "state": self.state,
+            "last_check": self._last_check,
+        }
+        if stats:
+            rows_at_build = (self.state or {}).get("rows_at_build") or 0
+            report.update({
+                "valid": stats["valid"],
+                "size_bytes": stats["size_bytes"],
+                "scans": stats["scans"],
+                "growth_since_build": round(rows / rows_at_build, 2) if rows_at_build else None,
+                "search_settings": self.search_settings(limit=20),
+            })
+        return report
+
+    # -------------------------------------------------
+    # Periodic maintenance (FastAPI lifespan)
+    # -------------------------------------------------
+    async def _loop(self, interval_s: float) -> None:
+        while True:
+            try:
+                await self.maintain()
+            except Exception:
+                traceback.print_exc()
+            await asyncio.sleep(interval_s)
+
+    def start(self, interval_s: float = ANN_CHECK_INTERVAL_S) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(interval_s))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+
+def _quote(text: str) -> str:
+    return "'" + text.replace("'", "''") + "'"
+
+
+ann_index_manager = AnnIndexManager()
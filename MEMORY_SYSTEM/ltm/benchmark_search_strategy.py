@@ -0,0 +1,224 @@
+"""
+Search Strategy Benchmark (exact vs ANN per user size)
+======================================================
+
+Purpose:
+- Load synthetic users of increasing size into a scratch copy of the
+  memories table (same columns, btree + ANN indexes)
+- Time the factual nearest-neighbour query per user with both strategies
+  (exact btree-filtered scan vs ANN index scan) and measure ANN recall
+- Print the crossover size to use for EXACT_SCAN_MAX_ROWS
+
+The scratch table is dropped afterwards unless --keep is given.
+
+Usage:
+    python MEMORY_SYSTEM/ltm/benchmark_search_strategy.py
+    python MEMORY_SYSTEM/ltm/benchmark_search_strategy.py --sizes 100 1000 10000 --queries 50
+"""
+
+import sys
+import os
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "..", ".."))
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import numpy as np
+
+from MEMORY_SYSTEM.database.connect.connect import db_manager
+from MEMORY_SYSTEM.embeddings.encoder import EMBEDDING_DIM
+from MEMORY_SYSTEM.ltm.ann_index import (
+    hnsw_build_params,
+    hnsw_ef_search,
+    ivfflat_lists,
+    ivfflat_probes,
+)
+from MEMORY_SYSTEM.ltm.vector_query import VECTOR_OPCLASS, nearest_neighbours_sql
+
+BENCH_TABLE = "agentic_memory_schema.bench_search_strategy"
+LIMIT = 20
+
+COLUMNS = (
+    "user_id",
+    "memory_kind",
+    "category",
+    "topic",
+    "fact",
+    "importance",
+    "confidence_score",
+    "confidence_source",
+    "status",
+    "embedding",
+)
+
+
+def _unit_vectors(rng, n: int) -> np.ndarray:
+    m = rng.standard_normal((n, EMBEDDING_DIM)).astype(np.float32)
+    return m / np.linalg.norm(m, axis=1, keepdims=True)
+
+
+def _query_sql(exact: bool) -> str:
+    return nearest_neighbours_sql(
+        vector="$2::vector",
+        where="""user_id = $1
+              AND memory_kind = 'factual'
+              AND status = 'active'
+              AND confidence_score >= 0.65""",
+        limit=str(LIMIT),
+        columns=("memory_id",),
+        table=BENCH_TABLE,
+        exact=exact,
+    )
+
+
+async def _load(conn, rng, sizes, background_rows: int) -> dict:
+    await conn.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+    await conn.execute(
+        f"""
+        CREATE TABLE {BENCH_TABLE}
+        (LIKE agentic_memory_schema.memories INCLUDING DEFAULTS)
+        """
+    )
+
+    users = {size: str(uuid.uuid4()) for size in sizes}
+    plan = [(users[size], size) for size in sizes]
+
+    # background rows spread over many small users, like production
+    bg_users = max(1, background_rows // 300)
+    plan += [(str(uuid.uuid4()), background_rows // bg_users) for _ in range(bg_users)]
+
+    for user_id, n in plan:
+        vectors = _unit_vectors(rng, n)
+        records = [
+            (
+                user_id, "factual", "technical_context", f"topic{i % 50}", f"fact {i}",
+                5.0, 0.9, "explicit", "active", vectors[i],
+            )
+            for i in range(n)
+        ]
+        await conn.copy_records_to_table(
+            BENCH_TABLE.split(".")[1],
+            schema_name=BENCH_TABLE.split(".")[0],
+            records=records,
+            columns=COLUMNS,
+        )
+
+    total = sum(n for _, n in plan)
+    print(f"📥 loaded {total} rows ({len(sizes)} measured users + {bg_users} background users)")
+    return {"users": users, "total": total}
+
+
+async def _build_indexes(conn, total: int) -> dict:
+    await conn.execute(
+        f"CREATE INDEX ON {BENCH_TABLE} (user_id, memory_kind, status)"
+    )
+
+    version = await conn.fetchval("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+    parts = tuple(int(p) for p in version.split(".")[:2])
+    method = "hnsw" if parts >= (0, 5) else "ivfflat"
+    params = hnsw_build_params(total) if method == "hnsw" else {"lists": ivfflat_lists(total)}
+
+    started = time.perf_counter()
+    await conn.execute("SET maintenance_work_mem = '512MB'")
+    await conn.execute(
+        f"""
+        CREATE INDEX ON {BENCH_TABLE}
+        USING {method} (embedding {VECTOR_OPCLASS})
+        WITH ({", ".join(f"{k} = {v}" for k, v in params.items())})
+        """
+    )
+    await conn.execute(f"ANALYZE {BENCH_TABLE}")
+    print(f"🏗  {method} {params} built in {time.perf_counter() - started:.1f}s (pgvector {version})")
+
+    settings = (
+        {"hnsw.ef_search": hnsw_ef_search(LIMIT)}
+        if method == "hnsw"
+        else {"ivfflat.probes": ivfflat_probes(params["lists"])}
+    )
+    if parts >= (0, 8):
+        settings[f"{method}.iterative_scan"] = "relaxed_order"
+    return settings
+
+
+async def _time_queries(conn, sql: str, user_id: str, queries: np.ndarray):
+    latencies, results = [], []
+    for q in queries:
+        started = time.perf_counter()
+        rows = await conn.fetch(sql, user_id, q)
+        latencies.append((time.perf_counter() - started) * 1000)
+        results.append({r["memory_id"] for r in rows})
+    return latencies, results
+
+
+async def run_benchmark(sizes, n_queries: int, background_rows: int, keep: bool) -> None:
+    rng = np.random.default_rng(42)
+    pool = await db_manager.get_pool()
+
+    async with pool.acquire() as conn:
+        loaded = await _load(conn, rng, sizes, background_rows)
+        ann_settings = await _build_indexes(conn, loaded["total"])
+
+        exact_sql = _query_sql(exact=True)
+        ann_sql = _query_sql(exact=False)
+        queries = _unit_vectors(rng, n_queries)
+
+        print(f"\n{'user rows':>10} {'exact p50':>10} {'ann p50':>10} {'ann recall':>11} {'ann rows':>9}")
+        crossover = None
+
+        try:
+            for size in sizes:
+                user_id = loaded["users"][size]
+
+                await conn.execute("RESET ALL")
+                exact_ms, exact_sets = await _time_queries(conn, exact_sql, user_id, queries)
+
+                await conn.execute(
+                    "; ".join(f"SET {k} = {v}" for k, v in ann_settings.items())
+                )
+                ann_ms, ann_sets = await _time_queries(conn, ann_sql, user_id, queries)
+
+                recall = statistics.mean(
+                    len(a & e) / max(1, len(e)) for a, e in zip(ann_sets, exact_sets)
+                )
+                returned = statistics.mean(len(a) for a in ann_sets)
+                exact_p50 = statistics.median(exact_ms)
+                ann_p50 = statistics.median(ann_ms)
+
+                if crossover is None and ann_p50 < exact_p50:
+                    crossover = size
+
+                print(f"{size:>10} {exact_p50:>9.2f}ms {ann_p50:>9.2f}ms {recall:>11.3f} {returned:>9.1f}")
+        finally:
+            await conn.execute("RESET ALL")
+            if not keep:
+                await conn.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+
+    if crossover is None:
+        print(f"\n➡️  exact scan won at every size: EXACT_SCAN_MAX_ROWS >= {max(sizes)}")
+    else:
+        print(f"\n➡️  ANN faster from ~{crossover} rows/user: set EXACT_SCAN_MAX_ROWS below that")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300, 1000, 3000, 10000, 30000])
+    parser.add_argument("--queries", type=int, default=30)
+    parser.add_argument("--background-rows", type=int, default=50000)
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+
+    async def _main():
+        try:
+            await run_benchmark(sorted(args.sizes), args.queries, args.background_rows, args.keep)
+        finally:
+            await db_manager.close_pool()
+
+    asyncio.run(_main())
@@ -0,0 +1,25 @@
+# MEMORY_SYSTEM/ltm/content_hash.py
+#
+# Normalized-text hash of a factual memory.
+#
+# Exact repeats ("User prefers Python." / "user prefers python") are
+# matched on (user_id, memory_kind, content_hash) before any embedding
+# is computed; only novel text reaches the encoder and vector dedup.
+#
+# Normalization is deliberately conservative (unicode form, case,
+# whitespace, surrounding punctuation): anything looser belongs to the
+# semantic dedup, not to an exact-match key.
+
+import hashlib
+import unicodedata
+
+_EDGE_PUNCTUATION = " \t\n.,;:!?\"'`"
+
+
+def normalize_fact(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return " ".join(text.split()).strip(_EDGE_PUNCTUATION)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(normalize_fact(text).encode("utf-8")).hexdigest()
@@ -0,0 +1,261 @@
+# MEMORY_SYSTEM/ltm/event_partitions.py
+#
+# Time-range partitions of agentic_memory_schema.memory_events.
+#
+# - partitions are created MEMORY_EVENTS_PREMAKE periods ahead, so
+#   inserts (event sink COPY, access tracker) never hit a missing range
+# - retention detaches and drops whole partitions whose range ended more
+#   than MEMORY_EVENTS_RETENTION_DAYS ago; no row-by-row DELETE
+# - with MEMORY_EVENTS_ARCHIVE_DIR set, a partition is exported to
+#   <dir>/<partition>.csv.gz first and only dropped when the export
+#   succeeded
+#
+# Partition bounds are read back from the catalog, so the legacy table
+# attached by schema/memory_events.py (MINVALUE .. first period) ages
+# out like any other partition.
+
+import asyncio
+import gzip
+import os
+import traceback
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from MEMORY_SYSTEM.database.connect.connect import db_manager
+
+MEMORY_EVENTS_PARTITION_INTERVAL = os.getenv("MEMORY_EVENTS_PARTITION_INTERVAL", "month")  # month | week | day
+MEMORY_EVENTS_PREMAKE = int(os.getenv("MEMORY_EVENTS_PREMAKE", "3"))
+MEMORY_EVENTS_RETENTION_DAYS = int(os.getenv("MEMORY_EVENTS_RETENTION_DAYS", "180"))
+MEMORY_EVENTS_ARCHIVE_DIR = os.getenv("MEMORY_EVENTS_ARCHIVE_DIR", "")
+MEMORY_EVENTS_MAINTENANCE_INTERVAL_S = float(os.getenv("MEMORY_EVENTS_MAINTENANCE_INTERVAL_S", "3600"))
+
+EVENTS_SCHEMA = "agentic_memory_schema"
+EVENTS_TABLE = "memory_events"
+EVENTS_PARENT = f"{EVENTS_SCHEMA}.{EVENTS_TABLE}"
+
+# one maintainer across all app instances
+_MAINTENANCE_LOCK_KEY = 7_401_236_552
+
+_PARTITIONS_SQL = """
+    SELECT
+        c.relname AS name,
+        (regexp_match(pg_get_expr(c.relpartbound, c.oid), 'FROM \\(''([^'']*)''\\)'))[1]::timestamptz
+            AS lower_bound,
+        (regexp_match(pg_get_expr(c.relpartbound, c.oid), 'TO \\(''([^'']*)''\\)'))[1]::timestamptz
+            AS upper_bound,
+        pg_get_expr(c.relpartbound, c.oid) = 'DEFAULT' AS is_default,
+        pg_total_relation_size(c.oid) AS size_bytes
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = $1::regclass
+    ORDER BY upper_bound
+"""
+
+
+# =====================================================
+# Periods
+# =====================================================
+def period_start(ts: datetime, interval: str = MEMORY_EVENTS_PARTITION_INTERVAL) -> datetime:
+    ts = ts.astimezone(timezone.utc)
+    day = datetime(ts.year, ts.month, ts.day, tzinfo=timezone.utc)
+    if interval == "day":
+        return day
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def next_period(start: datetime, interval: str = MEMORY_EVENTS_PARTITION_INTERVAL) -> datetime:
+    if interval == "day":
+        return start + timedelta(days=1)
+    if interval == "week":
+        return start + timedelta(days=7)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+def partition_name(start: datetime) -> str:
+    return f"{EVENTS_TABLE}_p{start:%Y%m%d}"
+
+
+def _literal(ts: datetime) -> str:
+    return "'" + ts.isoformat() + "'"
+
+
+# =====================================================
+# Operations (caller's connection)
+# =====================================================
+async def list_partitions(conn) -> List[dict]:
+    return [dict(r) for r in await conn.fetch(_PARTITIONS_SQL, EVENTS_PARENT)]
+
+
+async def ensure_partitions(
+    conn,
+    now: Optional[datetime] = None,
+    premake: int = MEMORY_EVENTS_PREMAKE,
+) -> List[str]:
+    """
+    Current period + `premake` periods ahead. Periods already covered
+    (e.g. by the attached legacy table) are skipped.
+    """
+    now = now or datetime.now(timezone.utc)
+    existing = [p for p in await list_partitions(conn) if not p["is_default"]]
+    created = []
+
+    start = period_start(now)
+    for _ in range(premake + 1):
+        end = next_period(start)
+        overlaps = any(
+            (p["lower_bound"] is None or p["lower_bound"] < end)
+            and (p["upper_bound"] is None or start < p["upper_bound"])
+            for p in existing
+        )
+        if not overlaps:
+            name = partition_name(start)
+            await conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {EVENTS_SCHEMA}.{name}
+                PARTITION OF {EVENTS_PARENT}
+                FOR VALUES FROM ({_literal(start)}) TO ({_literal(end)})
+                """
+            )
+            created.append(name)
+        start = end
+
+    return created
+
+
+async def _export_partition(conn, name: str, archive_dir: str) -> str:
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{name}.csv.gz")
+    tmp = path + ".part"
+
+    f = gzip.open(tmp, "wb")
+    try:
+        async def _write(chunk: bytes) -> None:
+            await asyncio.to_thread(f.write, chunk)
+
+        await conn.copy_from_table(
+            name,
+            schema_name=EVENTS_SCHEMA,
+            output=_write,
+            format="csv",
+            header=True,
+        )
+        f.close()
+        os.replace(tmp, path)
+    except BaseException:
+        f.close()
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    return path
+
+
+async def drop_expired_partitions(
+    conn,
+    now: Optional[datetime] = None,
+    retention_days: int = MEMORY_EVENTS_RETENTION_DAYS,
+    archive_dir: str = MEMORY_EVENTS_ARCHIVE_DIR,
+) -> List[dict]:
+    """
+    Detach + drop partitions whose whole range is older than the
+    retention window (exported first when archive_dir is set).
+    """
+    now = now or datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=retention_days)
+    dropped = []
+
+    for p in await list_partitions(conn):
+        if p["is_default"] or p["upper_bound"] is None or p["upper_bound"] > cutoff:
+            continue
+
+        archived = None
+        if archive_dir:
+            archived = await _export_partition(conn, p["name"], archive_dir)
+
+        async with conn.transaction():
+            await conn.execute(
+                f"ALTER TABLE {EVENTS_PARENT} DETACH PARTITION {EVENTS_SCHEMA}.{p['name']}"
+            )
+            await conn.execute(f"DROP TABLE {EVENTS_SCHEMA}.{p['name']}")
+
+        print(f"🗑️ [EVENTS] dropped {p['name']} (< {p['upper_bound']}) archived={archived}")
+        dropped.append({"name": p["name"], "upper_bound": p["upper_bound"], "archive": archived})
+
+    return dropped
+
+
+# =====================================================
+# Background maintenance
+# =====================================================
+class EventPartitionManager:
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._last_run: Optional[dict] = None
+
+    async def maintain(self) -> Optional[dict]:
+        pool = await db_manager.get_pool()
+        async with pool.acquire() as conn:
+            locked = await conn.fetchval("SELECT pg_try_advisory_lock($1)", _MAINTENANCE_LOCK_KEY)
+            if not locked:
+                return None  # another instance is on it
+            try:
+                created = await ensure_partitions(conn)
+                dropped = await drop_expired_partitions(conn)
+            finally:
+                await conn.execute("SELECT pg_advisory_unlock($1)", _MAINTENANCE_LOCK_KEY)
+
+        self._last_run = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "created": created,
+            "dropped": [d["name"] for d in dropped],
+        }
+        return self._last_run
+
+    async def health(self) -> dict:
+        pool = await db_manager.get_pool()
+        async with pool.acquire() as conn:
+            partitions = await list_partitions(conn)
+
+        return {
+            "interval": MEMORY_EVENTS_PARTITION_INTERVAL,
+            "retention_days": MEMORY_EVENTS_RETENTION_DAYS,
+            "archive_dir": MEMORY_EVENTS_ARCHIVE_DIR or None,
+            "partitions": [
+                {
+                    "name": p["name"],
+                    "from": p["lower_bound"].isoformat() if p["lower_bound"] else None,
+                    "to": p["upper_bound"].isoformat() if p["upper_bound"] else None,
+                    "size_bytes": p["size_bytes"],
+                }
+                for p in partitions
+            ],
+            "last_run": self._last_run,
+        }
+
+    async def _loop(self, interval_s: float) -> None:
+        while True:
+            try:
+                await self.maintain()
+            except Exception:
+                traceback.print_exc()
+            await asyncio.sleep(interval_s)
+
+    def start(self, interval_s: float = MEMORY_EVENTS_MAINTENANCE_INTERVAL_S) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(interval_s))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+
+event_partition_manager = EventPartitionManager()
@@ -0,0 +1,223 @@
+# MEMORY_SYSTEM/ltm/event_sink.py
+#
+# Buffered writer for agentic_memory_schema.memory_events.
+#
+# The event log is append-only and the most inserted table; writers
+# (store_ltm_facts) hand events to the sink after their own transaction
+# commits and never wait on the audit insert.
+#
+# - events buffer in process and are written with binary COPY
+#   (copy_records_to_table) when LTM_EVENT_BATCH_SIZE events are queued
+#   or every LTM_EVENT_FLUSH_INTERVAL_S
+# - backpressure: emit() waits while LTM_EVENT_MAX_QUEUE events are
+#   queued, so a slow database throttles writers instead of growing
+#   memory without bound
+# - not started (scripts, tests without the app lifespan): emit()
+#   writes inline
+#
+# created_at is taken at emit() time, not at flush time.
+
+import asyncio
+import os
+import time
+import traceback
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence
+
+from MEMORY_SYSTEM.database.connect.connect import db_manager
+
+LTM_EVENT_BATCH_SIZE = int(os.getenv("LTM_EVENT_BATCH_SIZE", "500"))
+LTM_EVENT_FLUSH_INTERVAL_S = float(os.getenv("LTM_EVENT_FLUSH_INTERVAL_S", "1"))
+LTM_EVENT_MAX_QUEUE = int(os.getenv("LTM_EVENT_MAX_QUEUE", "10000"))
+
+EVENTS_SCHEMA = "agentic_memory_schema"
+EVENTS_TABLE = "memory_events"
+
+# metadata keeps its '{}' default
+COLUMNS = (
+    "memory_id",
+    "event_type",
+    "source",
+    "signal_strength",
+    "raw_context",
+    "created_at",
+)
+
+
+def event_record(
+    memory_id,
+    event_type: str,
+    source: str,
+    signal_strength: Optional[float] = None,
+    raw_context: Optional[str] = None,
+    created_at: Optional[datetime] = None,
+) -> tuple:
+    """One memory_events row, in COLUMNS order."""
+    return (
+        memory_id,
+        event_type,
+        source,
+        signal_strength,
+        raw_context,
+        created_at or datetime.now(timezone.utc),
+    )
+
+
+class MemoryEventSink:
+    def __init__(
+        self,
+        batch_size: int = LTM_EVENT_BATCH_SIZE,
+        max_queue: int = LTM_EVENT_MAX_QUEUE,
+    ):
+        self.batch_size = batch_size
+        self.max_queue = max(max_queue, batch_size)
+
+        self._buffer: List[tuple] = []
+        self._wake = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.emitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.flush_errors = 0
+        self.backpressure_waits = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    # -------------------------------------------------
+    # Writers
+    # -------------------------------------------------
+    async def emit(self, records: Sequence[tuple]) -> None:
+        if not records:
+            return
+
+        if self._task is None:
+            self._buffer.extend(records)
+            self.emitted += len(records)
+            await self.flush()
+            return
+
+        while len(self._buffer) >= self.max_queue and not self._stopping:
+            self.backpressure_waits += 1
+            self._space.clear()
+            self._wake.set()
+            await self._space.wait()
+
+        self._buffer.extend(records)
+        self.emitted += len(records)
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    # -------------------------------------------------
+    # Flush
+    # -------------------------------------------------
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            written = 0
+            while self._buffer:
+                batch = self._buffer[: self.batch_size]
+                del self._buffer[: len(batch)]
+                self._space.set()
+
+                started = time.perf_counter()
+                ok = await self._write(batch)
+                self._record_latency((time.perf_counter() - started) * 1000)
+
+                if not ok:
+                    self._requeue(batch)
+                    break
+                written += len(batch)
+            return written
+
+    async def _write(self, batch: List[tuple]) -> bool:
+        try:
+            pool = await db_manager.get_pool()
+            async with pool.acquire() as conn:
+                # routed to the created_at partition (ltm/event_partitions.py)
+                await conn.copy_records_to_table(
+                    EVENTS_TABLE,
+                    schema_name=EVENTS_SCHEMA,
+                    columns=COLUMNS,
+                    records=batch,
+                )
+        except Exception:
+            self.flush_errors += 1
+            traceback.print_exc()
+            return False
+
+        self.written += len(batch)
+        return True
+
+    def _requeue(self, batch: List[tuple]) -> None:
+        # retried by the next flush, oldest first; beyond the queue bound
+        # the oldest events are dropped
+        self._buffer[:0] = batch
+        overflow = len(self._buffer) - self.max_queue
+        if overflow > 0:
+            del self._buffer[:overflow]
+            self.dropped += overflow
+
+    def _record_latency(self, ms: float) -> None:
+        self.flushes += 1
+        self.last_flush_ms = ms
+        self.max_flush_ms = max(self.max_flush_ms, ms)
+        self._total_flush_ms += ms
+
+    async def _loop(self, interval_s: float) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=interval_s)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            errors = self.flush_errors
+            try:
+                await self.flush()
+            except Exception:
+                traceback.print_exc()
+            if self.flush_errors != errors and not self._stopping:
+                # database unavailable: retry on the interval, not on
+                # every wake-up from a blocked writer
+                await asyncio.sleep(interval_s)
+
+    def start(self, interval_s: float = LTM_EVENT_FLUSH_INTERVAL_S) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._loop(interval_s))
+
+    async def stop(self) -> None:
+        # no cancel: a COPY in progress must finish
+        if self._task is not None:
+            self._stopping = True
+            self._wake.set()
+            self._space.set()
+            try:
+                await self._task
+            except Exception:
+                traceback.print_exc()
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": len(self._buffer),
+            "max_queue": self.max_queue,
+            "emitted": self.emitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "flush_errors": self.flush_errors,
+            "backpressure_waits": self.backpressure_waits,
+            "flushes": self.flushes,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "avg_flush_ms": round(self._total_flush_ms / self.flushes, 2) if self.flushes else 0.0,
+            "max_flush_ms": round(self.max_flush_ms, 2),
+        }
+
+
+memory_event_sink = MemoryEventSink()
@@ -0,0 +1,136 @@
+"""
+Vector Query EXPLAIN Check
+==========================
+
+Purpose:
+- EXPLAIN the hot vector queries (factual retrieval, dedup on store)
+  against a real database
+- Fail when the ANN index on memories.embedding is not in the plan,
+  i.e. the query operator does not match the index opclass
+
+Sequential scans, bitmap scans and explicit sorts are discouraged for
+the EXPLAIN only, so a small or empty table still shows whether the
+index is *usable* for the query shape.
+
+Usage:
+    python MEMORY_SYSTEM/ltm/explain_vector_queries.py
+"""
+
+import sys
+import os
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "..", ".."))
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import asyncio
+import uuid
+from typing import Iterator, List
+
+import numpy as np
+from pgvector import Vector
+
+from MEMORY_SYSTEM.database.connect.connect import db_manager
+from MEMORY_SYSTEM.embeddings.encoder import EMBEDDING_DIM
+from MEMORY_SYSTEM.ltm.retriever import (
+    build_factual_search_sql,
+    build_ranked_factual_sql,
+    VECTOR_LIMIT,
+    MIN_CONFIDENCE,
+    MAX_DISTANCE,
+)
+from MEMORY_SYSTEM.ltm.store_ltm import NEAREST_FACTS_SQL
+from MEMORY_SYSTEM.ltm.vector_query import (
+    EMBEDDING_INDEX,
+    VECTOR_METRIC,
+    VECTOR_OPCLASS,
+)
+
+
+def _random_unit_vector() -> np.ndarray:
+    v = np.random.default_rng(0).standard_normal(EMBEDDING_DIM).astype(np.float32)
+    return v / np.linalg.norm(v)
+
+
+def _plan_nodes(node: dict) -> Iterator[dict]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def _indexes_used(plan: List[dict]) -> set:
+    return {
+        n["Index Name"]
+        for n in _plan_nodes(plan[0]["Plan"])
+        if "Index Name" in n
+    }
+
+
+async def _explain(conn, sql: str, *args) -> List[dict]:
+    async with conn.transaction():
+        await conn.execute("SET LOCAL enable_seqscan = off")
+        await conn.execute("SET LOCAL enable_bitmapscan = off")
+        await conn.execute("SET LOCAL enable_sort = off")
+        # json codec on the pool decodes the plan
+        return await conn.fetchval("EXPLAIN (FORMAT JSON) " + sql, *args)
+
+
+async def run_explain_check() -> bool:
+    pool = await db_manager.get_pool()
+    user_id = str(uuid.uuid4())
+    vec = _random_unit_vector()
+
+    queries = {
+        "retriever.factual_search": (
+            build_factual_search_sql(),
+            (user_id, [Vector(vec), Vector(vec)], VECTOR_LIMIT, MIN_CONFIDENCE),
+        ),
+        "retriever.factual_search(supporting)": (
+            build_factual_search_sql(include_supporting=True),
+            (user_id, [Vector(vec)], VECTOR_LIMIT, MIN_CONFIDENCE),
+        ),
+        "retriever.ranked_factual": (
+            build_ranked_factual_sql(),
+            (user_id, [Vector(vec)], VECTOR_LIMIT, MIN_CONFIDENCE, [], [], MAX_DISTANCE, {}),
+        ),
+        "store_ltm.nearest_facts": (
+            NEAREST_FACTS_SQL,
+            (user_id, [Vector(vec), Vector(vec)]),
+        ),
+    }
+
+    passed = True
+
+    async with pool.acquire() as conn:
+        indexdef = await conn.fetchval(
+            "SELECT indexdef FROM pg_indexes WHERE indexname = $1",
+            EMBEDDING_INDEX,
+        )
+        print(f"🔎 metric={VECTOR_METRIC} opclass={VECTOR_OPCLASS}")
+        print(f"   {EMBEDDING_INDEX}: {indexdef}")
+
+        if not indexdef or VECTOR_OPCLASS not in indexdef:
+            print(f"❌ {EMBEDDING_INDEX} is missing or not built with {VECTOR_OPCLASS}")
+            return False
+
+        for name, (sql, args) in queries.items():
+            plan = await _explain(conn, sql, *args)
+            used = _indexes_used(plan)
+            ok = EMBEDDING_INDEX in used
+            passed = passed and ok
+            print(f"  {'✅' if ok else '❌'} {name:40s} indexes={sorted(used) or '-'}")
+
+    return passed
+
+
+async def _main() -> int:
+    try:
+        return 0 if await run_explain_check() else 1
+    finally:
+        await db_manager.close_pool()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main()))
@@ -0,0 +1,188 @@
+# MEMORY_SYSTEM/ltm/intent_classifier.py
+
+import os
+import json
+import asyncio
+import hashlib
+import traceback
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from MEMORY_SYSTEM.embeddings.encoder import create_embedding, MODEL_NAME, EMBED_MODE
+
+# =====================================================
+# Tunables
+# =====================================================
+INTENT_CONFIDENCE_THRESHOLD = 0.25
+INTENT_CENTROIDS_PATH = os.getenv(
+    "INTENT_CENTROIDS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_centroids.npz"),
+)
+
+
+# =====================================================
+# Intent prototypes (static, versioned)
+# =====================================================
+INTENT_PROTOTYPES = {
+    "exploratory": [
+        "high level system design and architecture overview",
+        "conceptual explanation of how an AI system works",
+        "overview of components and interactions",
+        "big picture design of an AI agent system",
+    ],
+    "focused": [
+        "how to implement a specific feature",
+        "how to debug or fix an issue",
+        "step by step implementation guidance",
+        "practical backend implementation details",
+    ],
+    "minimal": [
+        "short direct factual answer",
+        "quick clarification",
+        "concise response without explanation",
+    ],
+}
+
+
+def _normalize_rows(m: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(m, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return m / norms
+
+
+class IntentClassifier:
+    """
+    Prototype-centroid intent classifier.
+
+    - One normalized centroid per intent, stacked into a (K, dim) matrix
+    - classify() is a single matrix-vector product on a query embedding
+      the caller already has (e.g. the retriever's query vector)
+    - Centroids are persisted to disk with the model identity and a
+      version hash of the prototypes; a mismatch triggers a rebuild
+    """
+
+    def __init__(
+        self,
+        prototypes: Dict[str, List[str]],
+        model_identity: str,
+        path: Optional[str] = INTENT_CENTROIDS_PATH,
+        threshold: float = INTENT_CONFIDENCE_THRESHOLD,
+        fallback: str = "minimal",
+    ):
+        self.prototypes = prototypes
+        self.model_identity = model_identity
+        self.path = path
+        self.threshold = threshold
+        self.fallback = fallback
+
+        self.labels: List[str] = list(prototypes)
+        self.version = self._version()
+        self.centroids: Optional[np.ndarray] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _version(self) -> str:
+        payload = json.dumps(
+            {"model": self.model_identity, "prototypes": self.prototypes},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    # -------------------------------------------------
+    # Persistence
+    # -------------------------------------------------
+    def _load(self) -> bool:
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if (
+                    str(data["version"]) != self.version
+                    or str(data["model_identity"]) != self.model_identity
+                    or list(data["labels"]) != self.labels
+                ):
+                    return False
+                self.centroids = np.asarray(data["centroids"], dtype=np.float32)
+            return True
+        except Exception:
+            traceback.print_exc()
+            return False
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        try:
+            tmp = self.path + ".tmp.npz"
+            np.savez(
+                tmp,
+                centroids=self.centroids,
+                labels=np.array(self.labels),
+                version=np.array(self.version),
+                model_identity=np.array(self.model_identity),
+            )
+            os.replace(tmp, self.path)
+        except Exception:
+            traceback.print_exc()
+
+    async def _build(self) -> None:
+        texts: List[str] = []
+        owners: List[int] = []
+        for idx, label in enumerate(self.labels):
+            for t in self.prototypes[label]:
+                texts.append(t)
+                owners.append(idx)
+
+        # one batched encode for every prototype sentence
+        vectors = np.asarray(await create_embedding(texts), dtype=np.float32)
+        owners_arr = np.asarray(owners)
+
+        centroids = np.stack([
+            vectors[owners_arr == idx].mean(axis=0)
+            for idx in range(len(self.labels))
+        ])
+        self.centroids = _normalize_rows(centroids).astype(np.float32)
+
+    async def ensure_loaded(self) -> None:
+        if self.centroids is not None:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.centroids is not None:
+                return
+            if await asyncio.to_thread(self._load):
+                print(f"✅ [INTENT] Centroids loaded ({self.version})")
+                return
+            await self._build()
+            await asyncio.to_thread(self._save)
+            print(f"✅ [INTENT] Centroids built ({self.version})")
+
+    # -------------------------------------------------
+    # Classification
+    # -------------------------------------------------
+    def classify(self, query_vec: np.ndarray) -> Tuple[str, float]:
+        """
+        Returns (intent, cosine score). Requires ensure_loaded().
+        """
+        q = np.asarray(query_vec, dtype=np.float32).reshape(-1)
+        norm = float(np.linalg.norm(q))
+        if norm == 0 or self.centroids is None:
+            return self.fallback, 0.0
+
+        scores = self.centroids @ (q / norm)
+        best = int(np.argmax(scores))
+        score = float(scores[best])
+
+        if score < self.threshold:
+            return self.fallback, score
+        return self.labels[best], score
+
+    async def classify_embedding(self, query_vec: np.ndarray) -> str:
+        await self.ensure_loaded()
+        return self.classify(query_vec)[0]
+
+
+intent_classifier = IntentClassifier(
+    INTENT_PROTOTYPES,
+    model_identity=f"{MODEL_NAME}:{EMBED_MODE}",
+)
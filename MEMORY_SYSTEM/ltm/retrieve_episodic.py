@@ -1,7 +1,6 @@
 # MEMORY_SYSTEM/ltm/retrieve_episodic.py
 
 from typing import List, Dict
-from datetime import datetime
 import traceback
 
 from MEMORY_SYSTEM.database.connect.connect import db_manager
@@ -20,6 +19,8 @@ async def retrieve_episodic_context(
     - Expired episodic memory is excluded
     - Chunk similarity is used ONLY for ordering, never gating
     - No episodic vs factual competition
+    - Ordering and LIMIT run in SQL: cost is bounded by `limit`,
+      not by how many turns were stored
     """
 
     try:
@@ -28,70 +29,51 @@ async def retrieve_episodic_context(
         traceback.print_exc()
         return []
 
-    now = datetime.utcnow()
+    chunks = [c.lower() for c in (query_chunks or []) if c]
 
     # -------------------------------------------------
-    # 1️⃣ Load ALL active episodic memory
+    # Bounded load: ordering + LIMIT in SQL
+    # (idx_memories_episodic_user_expiry)
     # -------------------------------------------------
+    # With query chunks, rows whose fact contains more chunks come first
+    # (advisory ordering only, never gating); otherwise newest first.
+    if chunks:
+        order_by = """
+            (
+                SELECT COUNT(*)
+                FROM unnest($3::text[]) AS c(chunk)
+                WHERE strpos(lower(COALESCE(e.fact, '')), c.chunk) > 0
+            ) DESC,
+            e.confidence_score DESC,
+            e.created_at DESC"""
+        args = (user_id, limit, chunks)
+    else:
+        order_by = "e.created_at DESC"
+        args = (user_id, limit)
+
     try:
         async with pool.acquire() as conn:
             rows = await conn.fetch(
-                """
+                f"""
                 SELECT
-                    memory_id,
-                    category,
-                    topic,
-                    fact,
-                    confidence_score,
-                    metadata,
-                    created_at
-                FROM agentic_memory_schema.memories
-                WHERE user_id = $1
-                  AND memory_kind = 'episodic'
-                  AND (expires_at IS NULL OR expires_at > $2)
-                ORDER BY created_at DESC
+                    e.memory_id,
+                    e.category,
+                    e.topic,
+                    e.fact,
+                    e.confidence_score,
+                    e.metadata,
+                    e.created_at
+                FROM agentic_memory_schema.memories e
+                WHERE e.user_id = $1
+                  AND e.memory_kind = 'episodic'
+                  AND (e.expires_at IS NULL OR e.expires_at > NOW())
+                ORDER BY {order_by}
+                LIMIT $2
                 """,
-                user_id,
-                now,
+                *args,
             )
     except Exception:
         traceback.print_exc()
         return []
 
-    episodic = [dict(r) for r in rows]
-
-    if not episodic:
-        return []
-
-    # -------------------------------------------------
-    # 2️⃣ Optional chunk-based ordering (SELECTION ONLY)
-    # -------------------------------------------------
-    if query_chunks:
-        for e in episodic:
-            score = 0.0
-            fact_text = (e.get("fact") or "").lower()
-
-            for chunk in query_chunks:
-                if chunk.lower() in fact_text:
-                    score += 1.0
-
-            # Episodic score is advisory only
-            e["_episodic_score"] = score
-
-        episodic.sort(
-            key=lambda x: (
-                x.get("_episodic_score", 0.0),
-                x.get("confidence_score", 0.0),
-                x.get("created_at"),
-            ),
-            reverse=True,
-        )
-
-        # Clean internal scoring field
-        for e in episodic:
-            e.pop("_episodic_score", None)
-
-    # -------------------------------------------------
-    # 3️⃣ Hard cap (defensive)
-    # -------------------------------------------------
-    return episodic[:limit]
+    return [dict(r) for r in rows]
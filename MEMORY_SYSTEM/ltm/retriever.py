@@ -1,79 +1,48 @@
-from typing import List, Dict
+from functools import lru_cache
+from typing import List, Dict, Optional
+import os
 import traceback
 import re
 import numpy as np
+from pgvector import Vector
 
 from MEMORY_SYSTEM.database.connect.connect import db_manager
 from MEMORY_SYSTEM.embeddings.encoder import create_embedding
 from MEMORY_SYSTEM.ltm.retrieve_episodic import retrieve_episodic_context
+from MEMORY_SYSTEM.ltm.intent_classifier import (
+    INTENT_PROTOTYPES,
+    INTENT_CONFIDENCE_THRESHOLD,
+    intent_classifier,
+)
+from MEMORY_SYSTEM.ltm.vector_query import (
+    from_l2,
+    to_l2,
+    l2_from_distance_sql,
+    nearest_neighbours_sql,
+)
+from MEMORY_SYSTEM.ltm.ann_index import ann_index_manager
+from MEMORY_SYSTEM.ltm.search_strategy import search_strategy, ANN
+from MEMORY_SYSTEM.ltm.user_vector_cache import user_vector_cache
+from MEMORY_SYSTEM.ltm.access_tracker import access_tracker
 
 # =====================================================
 # Tunables (production-safe defaults)
 # =====================================================
 VECTOR_LIMIT = 20
-MAX_DISTANCE = 1.05
+MAX_DISTANCE = from_l2(1.05)   # 1.05 in L2 units, in the index metric's scale
 MIN_CONFIDENCE = 0.65
-INTENT_CONFIDENCE_THRESHOLD = 0.25
+EPISODIC_BOOST = 1.5
+EPISODIC_BOOST_MIN_CONFIDENCE = 0.8
 
-
-# =====================================================
-# Intent prototypes (static, versioned)
-# =====================================================
-INTENT_PROTOTYPES = {
-    "exploratory": [
-        "high level system design and architecture overview",
-        "conceptual explanation of how an AI system works",
-        "overview of components and interactions",
-        "big picture design of an AI agent system",
-    ],
-    "focused": [
-        "how to implement a specific feature",
-        "how to debug or fix an issue",
-        "step by step implementation guidance",
-        "practical backend implementation details",
-    ],
-    "minimal": [
-        "short direct factual answer",
-        "quick clarification",
-        "concise response without explanation",
-    ],
-}
-
-# populated at startup
-INTENT_EMBEDDINGS: Dict[str, np.ndarray] = {}
-
-
-# =====================================================
-# Intent initialization (run once at app startup)
-# =====================================================
-async def initialize_intent_embeddings():
-    for intent, texts in INTENT_PROTOTYPES.items():
-        vectors = []
-        for t in texts:
-            emb = await create_embedding(t)
-            if hasattr(emb, "tolist"):
-                emb = emb.tolist()
-            vectors.append(emb)
-
-        INTENT_EMBEDDINGS[intent] = np.mean(
-            np.array(vectors), axis=0
-        )
+# "sql": dedup, scoring and intent caps run in Postgres (one statement,
+# only final rows transferred); "python": rank fetched rows in process.
+# Users served by the in-process vector cache are always ranked in Python.
+LTM_RANKING_MODE = os.getenv("LTM_RANKING_MODE", "sql")
 
 
 # =====================================================
 # Utilities
 # =====================================================
-def cosine_similarity(v1, v2) -> float:
-    return float(
-        np.dot(v1, v2) /
-        (np.linalg.norm(v1) * np.linalg.norm(v2))
-    )
-
-
-def to_pgvector_literal(vec: List[float]) -> str:
-    return "[" + ",".join(f"{x:.6f}" for x in vec) + "]"
-
-
 def extract_query_tokens(query: str) -> set[str]:
     return {
         t.lower()
@@ -86,27 +55,309 @@ def chunk_query(user_query: str) -> List[str]:
     return [p.strip() for p in parts if len(p.strip()) > 8]
 
 
+def _factual_nearest_sql(include_supporting: bool, exact: bool) -> str:
+    """
+    Per-chunk nearest rows (LATERAL body). $1 user_id, $3 per-chunk
+    limit, $4 min confidence; q.vec comes from the outer query.
+    """
+    status_clause = (
+        "status = 'active'"
+        if not include_supporting
+        else "status IN ('active','supporting')"
+    )
+
+    return nearest_neighbours_sql(
+        vector="q.vec",
+        where=f"""user_id = $1
+              AND memory_kind = 'factual'
+              AND {status_clause}
+              AND confidence_score >= $4""",
+        limit="$3",
+        columns=(
+            "memory_id",
+            "category",
+            "topic",
+            "fact",
+            "importance",
+            "confidence_score",
+        ),
+        exact=exact,
+    )
+
+
+_CHUNK_VECTORS_SQL = """
+        SELECT v AS vec, i AS chunk_index
+        FROM unnest($2::vector[]) WITH ORDINALITY AS t(v, i)
+"""
+
+# Live importance lives in memory_signals (reinforcement); joined after
+# the LATERAL so the nearest-neighbour shape stays index-servable.
+_SIGNALS_JOIN_SQL = """
+        LEFT JOIN agentic_memory_schema.memory_signals s
+            ON s.memory_id = m.memory_id
+"""
+
+
+@lru_cache(maxsize=None)
+def build_factual_search_sql(include_supporting: bool = False, exact: bool = False) -> str:
+    """
+    $1 user_id, $2 vector[] of chunk embeddings, $3 per-chunk limit,
+    $4 min confidence.
+    """
+    return f"""
+        SELECT
+            q.chunk_index,
+            m.memory_id,
+            m.category,
+            m.topic,
+            m.fact,
+            COALESCE(s.importance, m.importance) AS importance,
+            m.confidence_score,
+            m.distance
+        FROM ({_CHUNK_VECTORS_SQL}) q
+        CROSS JOIN LATERAL ({_factual_nearest_sql(include_supporting, exact)}) m
+        {_SIGNALS_JOIN_SQL}
+        ORDER BY q.chunk_index, m.distance;
+    """
+
+
+@lru_cache(maxsize=None)
+def build_ranked_factual_sql(include_supporting: bool = False, exact: bool = False) -> str:
+    """
+    Search + rank_factual_rows() in one statement; only the final rows
+    come back.
+
+    $1..$4 as build_factual_search_sql, $5 query tokens (lowercase),
+    $6 boosting episodic facts (lowercase), $7 MAX_DISTANCE,
+    $8 per-category caps for the intent (jsonb, default 1).
+    """
+    l2_distance = l2_from_distance_sql("f.distance")
+    topic_match = "lower(f.topic) = ANY($5::text[])"
+
+    return f"""
+        WITH hits AS (
+            SELECT
+                q.chunk_index,
+                m.memory_id,
+                m.category,
+                m.topic,
+                m.fact,
+                COALESCE(s.importance, m.importance) AS importance,
+                m.confidence_score,
+                m.distance
+            FROM ({_CHUNK_VECTORS_SQL}) q
+            CROSS JOIN LATERAL ({_factual_nearest_sql(include_supporting, exact)}) m
+            {_SIGNALS_JOIN_SQL}
+        ),
+        firsts AS (
+            -- first hit per (category, topic) in (chunk, distance) order
+            SELECT DISTINCT ON (category, topic) *
+            FROM hits
+            ORDER BY category, topic, chunk_index, distance
+        ),
+        scored AS (
+            SELECT
+                f.*,
+                (CASE WHEN {topic_match} THEN 2.0 ELSE 0.0 END)
+                + (1.0 - LEAST({l2_distance}, 1.0))
+                + (COALESCE(f.importance, 0) / 10.0)
+                + f.confidence_score
+                + (CASE WHEN EXISTS (
+                        SELECT 1 FROM unnest($6::text[]) AS e(fact)
+                        WHERE strpos(lower(f.fact), e.fact) > 0
+                   ) THEN {EPISODIC_BOOST} ELSE 0.0 END)
+                AS relevance_score
+            FROM firsts f
+            WHERE {topic_match}
+               OR f.distance <= $7
+        ),
+        capped AS (
+            SELECT
+                s.*,
+                ROW_NUMBER() OVER (
+                    PARTITION BY s.category
+                    ORDER BY s.relevance_score DESC, s.chunk_index, s.distance
+                ) AS category_rank
+            FROM scored s
+        )
+        SELECT
+            c.chunk_index,
+            c.memory_id,
+            c.category,
+            c.topic,
+            c.fact,
+            c.importance,
+            c.confidence_score,
+            c.distance,
+            round(c.relevance_score::numeric, 6)::float8 AS relevance_score
+        FROM capped c
+        WHERE c.category_rank <= COALESCE(($8::jsonb ->> c.category)::int, 1)
+        ORDER BY c.relevance_score DESC, c.chunk_index, c.distance;
+    """
+
+
+async def _fetch_factual(
+    user_id: str,
+    chunk_embeddings: np.ndarray,
+    build_sql,
+    include_supporting: bool,
+    *extra_args,
+) -> List[Dict]:
+    """
+    Runs a factual query built by build_sql(include_supporting, exact)
+    with the per-user exact / ANN strategy in one round trip.
+    chunk_index is 0-based.
+    """
+    # Vector-wrapped so asyncpg sends each row as one binary vector
+    vecs = [Vector(e) for e in chunk_embeddings]
+
+    pool = await db_manager.get_pool()
+    async with pool.acquire() as conn:
+        strategy = await search_strategy.choose(conn, user_id)
+        if strategy == ANN:
+            await ann_index_manager.apply_search_params(
+                conn, VECTOR_LIMIT, iterative=True
+            )
+
+        rows = await conn.fetch(
+            build_sql(include_supporting, exact=strategy != ANN),
+            user_id,
+            vecs,
+            VECTOR_LIMIT,
+            MIN_CONFIDENCE,
+            *extra_args,
+        )
+
+    result = []
+    for r in rows:
+        row = dict(r)
+        # WITH ORDINALITY is 1-based
+        row["chunk_index"] = int(row["chunk_index"]) - 1
+        result.append(row)
+    return result
+
+
+def _boosting_episodic_facts(episodic: List[Dict]) -> List[str]:
+    return [
+        e["fact"].lower()
+        for e in episodic
+        if e["confidence_score"] >= EPISODIC_BOOST_MIN_CONFIDENCE
+    ]
+
+
+def rank_factual_rows(
+    rows: List[Dict],
+    query_tokens: set[str],
+    episodic: List[Dict],
+    intent: str,
+) -> List[Dict]:
+    """
+    Dedup on (category, topic), score, sort and apply the intent caps.
+    `rows` must be in (chunk_index, distance) order.
+    """
+    boosting = _boosting_episodic_facts(episodic)
+
+    # -------------------------------------------------
+    # Rank factual memories (episodic-aware, not episodic-gated)
+    # -------------------------------------------------
+    seen = set()
+    ranked: List[Dict] = []
+
+    for row in rows:
+        key = (row["category"], row["topic"])
+        if key in seen:
+            continue
+        seen.add(key)
+
+        topic_match = row["topic"].lower() in query_tokens
+        vector_match = row["distance"] <= MAX_DISTANCE
+        l2_distance = to_l2(row["distance"])
+
+        if not (topic_match or vector_match):
+            continue
+
+        # Episodic alignment boost (soft, optional)
+        fact_lower = row["fact"].lower()
+        episodic_boost = (
+            EPISODIC_BOOST if any(e in fact_lower for e in boosting) else 0.0
+        )
+
+        row["_score"] = (
+            (2.0 if topic_match else 0.0)
+            + (1.0 - min(l2_distance, 1.0))
+            + (row["importance"] / 10.0)
+            + row["confidence_score"]
+            + episodic_boost
+        )
+
+        ranked.append(row)
+
+    ranked.sort(key=lambda r: r["_score"], reverse=True)
+
+    # -------------------------------------------------
+    # Intent-aware capping (FACTUAL ONLY)
+    # -------------------------------------------------
+    limits = INTENT_LIMITS.get(intent, {})
+    per_category = {}
+    final_factual: List[Dict] = []
+
+    for row in ranked:
+        cat = row["category"]
+        limit = limits.get(cat, 1)
+
+        if per_category.get(cat, 0) >= limit:
+            continue
+
+        per_category[cat] = per_category.get(cat, 0) + 1
+        row["relevance_score"] = round(row.pop("_score"), 6)
+        final_factual.append(row)
+
+    return final_factual
+
+
+async def rank_factual_sql(
+    user_id: str,
+    chunk_embeddings: np.ndarray,
+    query_tokens: set[str],
+    episodic: List[Dict],
+    intent: str,
+    include_supporting: bool = False,
+) -> List[Dict]:
+    """
+    Same result as build_factual_search_sql() rows + rank_factual_rows(),
+    computed by build_ranked_factual_sql().
+    """
+    return await _fetch_factual(
+        user_id,
+        chunk_embeddings,
+        build_ranked_factual_sql,
+        include_supporting,
+        sorted(query_tokens),
+        _boosting_episodic_facts(episodic),
+        MAX_DISTANCE,
+        INTENT_LIMITS.get(intent, {}),
+    )
+
+
 # =====================================================
 # Embedding-based intent detection
 # =====================================================
-async def detect_query_intent_embedding(query: str) -> str:
-    emb = await create_embedding(query)
-    if hasattr(emb, "tolist"):
-        emb = emb.tolist()
-
-    best_intent = "minimal"
-    best_score = -1.0
+async def initialize_intent_embeddings():
+    """
+    Load (or build and persist) the intent centroid matrix.
+    Optional at startup: the classifier also loads on first use.
+    """
+    await intent_classifier.ensure_loaded()
 
-    for intent, intent_vec in INTENT_EMBEDDINGS.items():
-        score = cosine_similarity(emb, intent_vec)
-        if score > best_score:
-            best_score = score
-            best_intent = intent
 
-    if best_score < INTENT_CONFIDENCE_THRESHOLD:
-        return "minimal"
+async def detect_query_intent_embedding(
+    query: str,
+    query_embedding: Optional[np.ndarray] = None,
+) -> str:
+    if query_embedding is None:
+        query_embedding = await create_embedding(query)
 
-    return best_intent
+    return await intent_classifier.classify_embedding(query_embedding)
 
 
 # =====================================================
@@ -158,7 +409,14 @@ async def retrieve_ltm_memories(
             return {"episodic": [], "factual": []}
 
         query_tokens = extract_query_tokens(user_query)
-        intent = await detect_query_intent_embedding(user_query)
+
+        # One encode: row 0 is the full query (intent), the rest are chunks
+        embeddings = await create_embedding([user_query] + query_chunks)
+        intent = await detect_query_intent_embedding(
+            user_query,
+            query_embedding=embeddings[0],
+        )
+        chunk_embeddings = embeddings[1:]
 
     except Exception:
         traceback.print_exc()
@@ -168,122 +426,49 @@ async def retrieve_ltm_memories(
     # 1️⃣ ALWAYS retrieve episodic LTM (NO HEURISTICS)
     # -------------------------------------------------
     try:
-        episodic = await retrieve_episodic_context(user_id)
+        episodic = await retrieve_episodic_context(user_id, query_chunks)
     except Exception:
         traceback.print_exc()
         episodic = []
 
     # -------------------------------------------------
-    # 2️⃣ Retrieve factual LTM (existing logic preserved)
+    # 2️⃣ Retrieve + rank factual LTM
     # -------------------------------------------------
-    pool = await db_manager.get_pool()
-    all_rows: List[Dict] = []
-
-    status_clause = (
-        "status = 'active'"
-        if not include_supporting
-        else "status IN ('active','supporting')"
-    )
-
-    for chunk in query_chunks:
-        try:
-            emb = await create_embedding(chunk)
-            if hasattr(emb, "tolist"):
-                emb = emb.tolist()
-
-            vec = to_pgvector_literal(emb)
-
-            async with pool.acquire() as conn:
-                rows = await conn.fetch(
-                    f"""
-                    SELECT
-                        memory_id,
-                        category,
-                        topic,
-                        fact,
-                        importance,
-                        confidence_score,
-                        embedding <-> $2::vector AS distance
-                    FROM agentic_memory_schema.memories
-                    WHERE user_id = $1
-                      AND memory_kind = 'factual'
-                      AND {status_clause}
-                      AND confidence_score >= $4
-                    ORDER BY embedding <-> $2::vector
-                    LIMIT $3;
-                    """,
-                    user_id,
-                    vec,
-                    VECTOR_LIMIT,
-                    MIN_CONFIDENCE,
+    try:
+        cached = await user_vector_cache.get(user_id)
+
+        if cached is None and LTM_RANKING_MODE == "sql":
+            final_factual = await rank_factual_sql(
+                user_id,
+                chunk_embeddings,
+                query_tokens,
+                episodic,
+                intent,
+                include_supporting,
+            )
+        else:
+            if cached is not None:
+                rows = cached.search(
+                    chunk_embeddings, VECTOR_LIMIT, MIN_CONFIDENCE, include_supporting
                 )
+            else:
+                rows = await _fetch_factual(
+                    user_id, chunk_embeddings, build_factual_search_sql, include_supporting
+                )
+            final_factual = rank_factual_rows(rows, query_tokens, episodic, intent)
 
-            all_rows.extend(dict(r) for r in rows)
-
-        except Exception:
-            traceback.print_exc()
-            continue
-
-    # -------------------------------------------------
-    # 3️⃣ Rank factual memories (episodic-aware, not episodic-gated)
-    # -------------------------------------------------
-    seen = set()
-    ranked: List[Dict] = []
-
-    for row in all_rows:
-        key = (row["category"], row["topic"])
-        if key in seen:
-            continue
-        seen.add(key)
-
-        topic_match = row["topic"].lower() in query_tokens
-        vector_match = row["distance"] <= MAX_DISTANCE
-
-        if not (topic_match or vector_match):
-            continue
-
-        # Episodic alignment boost (soft, optional)
-        episodic_boost = 0.0
-        for e in episodic:
-            if (
-                e["confidence_score"] >= 0.8
-                and e["fact"].lower() in row["fact"].lower()
-            ):
-                episodic_boost = 1.5
-                break
-
-        row["_score"] = (
-            (2.0 if topic_match else 0.0)
-            + (1.0 - min(row["distance"], 1.0))
-            + (row["importance"] / 10.0)
-            + row["confidence_score"]
-            + episodic_boost
-        )
-
-        ranked.append(row)
+        for row in final_factual:
+            row["matched_chunk"] = query_chunks[row["chunk_index"]]
 
-    ranked.sort(key=lambda r: r["_score"], reverse=True)
+        # flushed in the background (memory_signals + 'retrieved' events)
+        access_tracker.record(final_factual)
 
-    # -------------------------------------------------
-    # 4️⃣ Intent-aware capping (FACTUAL ONLY)
-    # -------------------------------------------------
-    limits = INTENT_LIMITS.get(intent, {})
-    per_category = {}
-    final_factual: List[Dict] = []
-
-    for row in ranked:
-        cat = row["category"]
-        limit = limits.get(cat, 1)
-
-        if per_category.get(cat, 0) >= limit:
-            continue
-
-        per_category[cat] = per_category.get(cat, 0) + 1
-        row["relevance_score"] = round(row.pop("_score"), 6)
-        final_factual.append(row)
+    except Exception:
+        traceback.print_exc()
+        final_factual = []
 
     # -------------------------------------------------
-    # 5️⃣ RETURN (SEPARATED, INTENTIONAL)
+    # 3️⃣ RETURN (SEPARATED, INTENTIONAL)
     # -------------------------------------------------
     return {
         "episodic": episodic,     # injected into STM later
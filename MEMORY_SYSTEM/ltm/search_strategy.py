@@ -0,0 +1,88 @@
+# MEMORY_SYSTEM/ltm/search_strategy.py
+#
+# Per-user choice between an exact scan and the ANN index.
+#
+# Factual search always filters by user_id / memory_kind / status.
+# - small users: the btree on (user_id, memory_kind, status) narrows the
+#   candidates to a few hundred rows; sorting them exactly is cheap and
+#   has perfect recall
+# - large users: the global ANN index with an iterative scan, so the
+#   user filter does not post-filter the candidate list down to nothing
+#
+# The crossover comes from ltm/benchmark_search_strategy.py.
+
+import os
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+from MEMORY_SYSTEM.ltm.ann_index import ann_index_manager
+
+EXACT_SCAN_MAX_ROWS = int(os.getenv("EXACT_SCAN_MAX_ROWS", "2000"))
+USER_COUNT_TTL_S = float(os.getenv("USER_COUNT_TTL_S", "300"))
+USER_COUNT_MAX_USERS = int(os.getenv("USER_COUNT_MAX_USERS", "10000"))
+
+EXACT = "exact"
+ANN = "ann"
+
+
+class SearchStrategySelector:
+    def __init__(
+        self,
+        exact_max_rows: int = EXACT_SCAN_MAX_ROWS,
+        ttl_s: float = USER_COUNT_TTL_S,
+        max_users: int = USER_COUNT_MAX_USERS,
+    ):
+        self.exact_max_rows = exact_max_rows
+        self.ttl_s = ttl_s
+        self.max_users = max(1, max_users)
+        # user_id -> (rows, fetched_at), least recently used first
+        self._counts: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+
+    async def user_factual_count(self, conn, user_id: str) -> int:
+        cached = self._counts.get(user_id)
+        now = time.monotonic()
+        if cached and now - cached[1] < self.ttl_s:
+            self._counts.move_to_end(user_id)
+            return cached[0]
+
+        # index-only on idx_memories_user_kind_status
+        count = await conn.fetchval(
+            """
+            SELECT COUNT(*)
+            FROM agentic_memory_schema.memories
+            WHERE user_id = $1
+              AND memory_kind = 'factual'
+              AND status = 'active'
+            """,
+            user_id,
+        )
+        self._counts[user_id] = (int(count), now)
+        self._counts.move_to_end(user_id)
+        while len(self._counts) > self.max_users:
+            self._counts.popitem(last=False)
+        return int(count)
+
+    async def choose(self, conn, user_id: str) -> str:
+        if ann_index_manager.state is None:
+            return EXACT  # no ANN index (yet)
+        count = await self.user_factual_count(conn, user_id)
+        return EXACT if count <= self.exact_max_rows else ANN
+
+    def note_inserted(self, user_id: str, rows: int = 1) -> None:
+        cached = self._counts.get(user_id)
+        if cached:
+            self._counts[user_id] = (cached[0] + rows, cached[1])
+
+    def invalidate(self, user_id: str) -> None:
+        self._counts.pop(user_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "exact_max_rows": self.exact_max_rows,
+            "cached_users": len(self._counts),
+            "max_cached_users": self.max_users,
+        }
+
+
+search_strategy = SearchStrategySelector()
@@ -1,9 +1,8 @@
 # MEMORY_SYSTEM/ltm/store_episodic_ltm.py
 
 from typing import List, Dict
-from datetime import datetime, timedelta
+from datetime import timedelta
 import traceback
-import json
 
 from MEMORY_SYSTEM.database.connect.connect import db_manager
 from MEMORY_SYSTEM.embeddings.encoder import create_embedding
@@ -30,7 +29,8 @@ async def store_episodic_ltm(
     Guarantees:
     - Episodic memories never collide with factual
     - Scope-based expiry is enforced
-    - JSONB fields are explicitly serialized
+    - One row per (context_type, key) binding: repeated bindings refresh
+      fact, confidence and expiry in place instead of piling up
     """
 
     if not episodic_items:
@@ -42,67 +42,113 @@ async def store_episodic_ltm(
         traceback.print_exc()
         return
 
-    async with pool.acquire() as conn:
-        for item in episodic_items:
-            try:
-                scope = item.get("scope")
-                ttl = EPISODIC_TTL.get(scope)
-                if not ttl:
-                    continue
-
-                expires_at = datetime.utcnow() + ttl
-
-                fact_text = f"{item.get('key')}: {item.get('value')}"
-
-                # # Optional embedding (lightweight)
-                # embedding = await create_embedding(fact_text)
-                # if hasattr(embedding, "tolist"):
-                #     embedding = embedding.tolist()
-
-                await conn.execute(
-                    """
-                    INSERT INTO agentic_memory_schema.memories (
-                        user_id,
-                        memory_kind,
-                        category,
-                        topic,
-                        fact,
-                        confidence_score,
-                        confidence_source,
-                        importance,
-                        metadata,
-                        expires_at,
-                        created_at,
-                        last_updated
-                    )
-                    VALUES (
-                        $1,
-                        'episodic',
-                        $2,
-                        $3,
-                        $4,
-                        $5,
-                        $6,
-                        1.0,
-                        $7,
-                        $8,
-                        NOW(),
-                        NOW()
-                    )
-                    """,
+    # -------------------------------------------------
+    # 1️⃣ Prepare rows (last item per binding wins)
+    # -------------------------------------------------
+    bindings: Dict[tuple, Dict] = {}
+
+    for item in episodic_items:
+        try:
+            scope = item.get("scope")
+            ttl = EPISODIC_TTL.get(scope)
+            if not ttl:
+                continue
+
+            category = item.get("context_type")
+            topic = item.get("key")
+            if not category or not topic or item.get("value") is None:
+                continue
+
+            # # Optional embedding (lightweight)
+            # fact_text = f"{item.get('key')}: {item.get('value')}"
+            # embedding = await create_embedding(fact_text)
+
+            bindings[(category, topic)] = {
+                "category": category,
+                "topic": topic,
+                "fact": str(item.get("value")),
+                "confidence_score": float(item["confidence"]["score"]),
+                "confidence_source": item["confidence"]["source"],
+                "scope": scope,
+                "ttl_s": ttl.total_seconds(),
+            }
+        except Exception:
+            traceback.print_exc()
+            continue
+
+    if not bindings:
+        return
+
+    rows = list(bindings.values())
+
+    # -------------------------------------------------
+    # 2️⃣ One batched upsert keyed on (user_id, category, topic)
+    #    (uq_memories_episodic_binding)
+    # -------------------------------------------------
+    try:
+        async with pool.acquire() as conn:
+            await conn.execute(
+                """
+                INSERT INTO agentic_memory_schema.memories (
                     user_id,
-                    item.get("context_type"),          # category
-                    item.get("key"),                   # topic
-                    item.get("value"),                 # fact
-                    item["confidence"]["score"],
-                    item["confidence"]["source"],
-                    json.dumps({                       # ✅ JSONB SAFE
-                        "scope": scope,
-                        "source": "episodic_extraction"
-                    }),
+                    memory_kind,
+                    category,
+                    topic,
+                    fact,
+                    confidence_score,
+                    confidence_source,
+                    importance,
+                    metadata,
                     expires_at,
+                    created_at,
+                    last_updated
                 )
-                print("\n🎉 [LTM EPISODIC] Storage completed successfully")
-            except Exception:
-                traceback.print_exc()
-                continue
+                SELECT
+                    $1,
+                    'episodic',
+                    t.category,
+                    t.topic,
+                    t.fact,
+                    t.confidence_score,
+                    t.confidence_source,
+                    1.0,
+                    jsonb_build_object(
+                        'scope', t.scope,
+                        'source', 'episodic_extraction'
+                    ),
+                    NOW() + make_interval(secs => t.ttl_s),
+                    NOW(),
+                    NOW()
+                FROM unnest(
+                    $2::text[],
+                    $3::text[],
+                    $4::text[],
+                    $5::real[],
+                    $6::text[],
+                    $7::text[],
+                    $8::float8[]
+                ) AS t(category, topic, fact, confidence_score, confidence_source, scope, ttl_s)
+                ON CONFLICT (user_id, category, topic) WHERE memory_kind = 'episodic'
+                DO UPDATE SET
+                    fact = EXCLUDED.fact,
+                    confidence_score = EXCLUDED.confidence_score,
+                    confidence_source = EXCLUDED.confidence_source,
+                    metadata = EXCLUDED.metadata,
+                    expires_at = EXCLUDED.expires_at,
+                    -- a refreshed binding is as recent as a new one
+                    -- (retrieve_episodic orders by created_at)
+                    created_at = NOW(),
+                    last_updated = NOW()
+                """,
+                user_id,
+                [r["category"] for r in rows],
+                [r["topic"] for r in rows],
+                [r["fact"] for r in rows],
+                [r["confidence_score"] for r in rows],
+                [r["confidence_source"] for r in rows],
+                [r["scope"] for r in rows],
+                [r["ttl_s"] for r in rows],
+            )
+        print(f"\n🎉 [LTM EPISODIC] Upserted {len(rows)} binding(s)")
+    except Exception:
+        traceback.print_exc()
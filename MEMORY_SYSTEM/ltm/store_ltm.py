@@ -1,40 +1,183 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 import traceback
-import json
+import uuid
+
+import numpy as np
+from pgvector import Vector
+
 from MEMORY_SYSTEM.database.connect.connect import db_manager
 from MEMORY_SYSTEM.embeddings.encoder import create_embedding
+from MEMORY_SYSTEM.ltm.content_hash import content_hash
+from MEMORY_SYSTEM.ltm.vector_query import (
+    from_l2,
+    distance_from_similarity,
+    nearest_neighbours_sql,
+)
+from MEMORY_SYSTEM.ltm.ann_index import ann_index_manager
+from MEMORY_SYSTEM.ltm.search_strategy import search_strategy, ANN
+from MEMORY_SYSTEM.ltm.user_vector_cache import user_vector_cache
+from MEMORY_SYSTEM.ltm.event_sink import memory_event_sink, event_record
 
 
 # -------------------------------
 # Tunables
 # -------------------------------
-SEMANTIC_DUP_DISTANCE = 0.12
+SEMANTIC_DUP_DISTANCE = from_l2(0.12)   # 0.12 in L2 units, in the index metric's scale
 IMPORTANCE_INCREMENT = 0.5
 MAX_IMPORTANCE = 10.0
 
 
-def to_pgvector_literal(vec: List[float]) -> str:
-    return "[" + ",".join(f"{x:.6f}" for x in vec) + "]"
+def _build_nearest_facts_sql(exact: bool) -> str:
+    """
+    Nearest active factual memory for every fact of the batch, one query.
+    $1 user_id, $2 vector[] of fact embeddings. fact_index is 1-based.
+    """
+    nearest = nearest_neighbours_sql(
+        vector="q.vec",
+        where="""user_id = $1
+              AND memory_kind = 'factual'
+              AND status = 'active'""",
+        limit="1",
+        columns=("memory_id", "importance"),
+        exact=exact,
+    )
+    return f"""
+        SELECT q.fact_index, m.memory_id, m.importance, m.distance
+        FROM (
+            SELECT v AS vec, i AS fact_index
+            FROM unnest($2::vector[]) WITH ORDINALITY AS t(v, i)
+        ) q
+        CROSS JOIN LATERAL ({nearest}) m
+    """
 
 
-async def store_ltm_facts(
-    user_id: str,
-    extracted_facts: List[Dict],
-    raw_context: str
-) -> None:
+NEAREST_FACTS_SQL = _build_nearest_facts_sql(exact=False)
+NEAREST_FACTS_EXACT_SQL = _build_nearest_facts_sql(exact=True)
 
-    print("\n💾 [LTM] Starting LTM storage")
 
-    if not extracted_facts:
-        print("ℹ️ [LTM] No extracted facts provided")
-        return
+# $1 user_id, $2 content_hash[]  (uq_memories_content_hash)
+_EXISTING_HASHES_SQL = """
+    SELECT content_hash, memory_id
+    FROM agentic_memory_schema.memories
+    WHERE user_id = $1
+      AND memory_kind = 'factual'
+      AND status = 'active'
+      AND content_hash = ANY($2::text[])
+"""
+
+
+# Reinforcement only touches the narrow memory_signals row, never the
+# wide memories row (embedding, fact, metadata) or the ANN index.
+# A memory without a signals row (not yet backfilled) gets one seeded
+# from its memories values plus the hits. memory_ids are unique, so
+# array_position finds the hits of a conflicting row.
+# $1 memory_id[], $2 hits per memory, $3 increment, $4 cap
+_REINFORCE_SQL = """
+    INSERT INTO agentic_memory_schema.memory_signals AS s (
+        memory_id,
+        frequency,
+        importance,
+        last_updated,
+        last_accessed
+    )
+    SELECT
+        m.memory_id,
+        COALESCE(m.frequency, 0) + u.hits,
+        LEAST(COALESCE(m.importance, 0) + u.hits * $3, $4),
+        NOW(),
+        m.last_accessed
+    FROM unnest($1::uuid[], $2::int[]) AS u(memory_id, hits)
+    JOIN agentic_memory_schema.memories m
+      ON m.memory_id = u.memory_id
+    ON CONFLICT (memory_id) DO UPDATE
+    SET
+        frequency = s.frequency + ($2::int[])[array_position($1::uuid[], s.memory_id)],
+        importance = LEAST(
+            COALESCE(s.importance, 0)
+                + ($2::int[])[array_position($1::uuid[], s.memory_id)] * $3,
+            $4
+        ),
+        last_updated = NOW()
+    RETURNING s.memory_id, s.importance
+"""
+
+# New memories + their memory_signals rows in one statement. Rows whose
+# text was stored concurrently since the hash lookup are skipped (and
+# reinforced by the caller).
+_INSERT_SQL = """
+    WITH inserted AS (
+    INSERT INTO agentic_memory_schema.memories (
+        memory_id,
+        user_id,
+        memory_kind,
+        category,
+        topic,
+        fact,
+        importance,
+        confidence_score,
+        confidence_source,
+        frequency,
+        status,
+        embedding,
+        content_hash,
+        created_at,
+        last_updated
+    )
+    SELECT
+        t.memory_id,
+        $1,
+        'factual',
+        t.category,
+        t.topic,
+        t.fact,
+        t.importance,
+        t.confidence_score,
+        t.confidence_source,
+        t.frequency,
+        'active',
+        t.embedding,
+        t.content_hash,
+        NOW(),
+        NOW()
+    FROM unnest(
+        $2::uuid[],
+        $3::text[],
+        $4::text[],
+        $5::text[],
+        $6::real[],
+        $7::real[],
+        $8::text[],
+        $9::int[],
+        $10::vector[],
+        $11::text[]
+    ) AS t(
+        memory_id, category, topic, fact, importance,
+        confidence_score, confidence_source, frequency, embedding, content_hash
+    )
+    ON CONFLICT (user_id, memory_kind, content_hash)
+        WHERE status = 'active' AND content_hash IS NOT NULL
+    DO NOTHING
+    RETURNING memory_id, content_hash, frequency, importance, last_updated
+    ),
+    signals AS (
+        INSERT INTO agentic_memory_schema.memory_signals (
+            memory_id,
+            frequency,
+            importance,
+            last_updated
+        )
+        SELECT memory_id, frequency, importance, last_updated
+        FROM inserted
+    )
+    SELECT memory_id, content_hash
+    FROM inserted
+"""
+
 
+def _prepare_items(extracted_facts: List[Dict]) -> List[Dict]:
     prepared_items = []
 
-    # -------------------------------------------------
-    # 1️⃣ Prepare items
-    # -------------------------------------------------
-    for idx, item in enumerate(extracted_facts):
+    for item in extracted_facts:
         try:
             fact = item.get("fact")
             category = item.get("category")
@@ -48,184 +191,271 @@ async def store_ltm_facts(
             if not fact or not category or not topic:
                 continue
 
-            embedding = await create_embedding(fact)
-            if hasattr(embedding, "tolist"):
-                embedding = embedding.tolist()
-
-            embedding = to_pgvector_literal(embedding)
-
             prepared_items.append({
+                "index": len(prepared_items),
                 "fact": fact,
+                "content_hash": content_hash(fact),
                 "category": category,
                 "topic": topic,
                 "importance": importance,
                 "confidence_score": confidence_score,
                 "confidence_source": confidence_source,
-                "embedding": embedding,
-                "metadata": json.dumps({}),   # ✅ explicit
             })
 
         except Exception:
             traceback.print_exc()
             continue
 
-    if not prepared_items:
+    return prepared_items
+
+
+async def _nearest_existing(conn, user_id: str, embeddings: np.ndarray) -> List[Optional[Dict]]:
+    """
+    Nearest active factual memory per embedding (None when the user has
+    none): in-process matrix for cached users, else one LATERAL query.
+    """
+    cached = await user_vector_cache.get(user_id, conn)
+    if cached is not None:
+        return [cached.nearest_active(e) for e in embeddings]
+
+    strategy = await search_strategy.choose(conn, user_id)
+    if strategy == ANN:
+        await ann_index_manager.apply_search_params(conn, 1, iterative=True)
+
+    rows = await conn.fetch(
+        NEAREST_FACTS_SQL if strategy == ANN else NEAREST_FACTS_EXACT_SQL,
+        user_id,
+        [Vector(e) for e in embeddings],
+    )
+
+    nearest: List[Optional[Dict]] = [None] * len(embeddings)
+    for r in rows:
+        nearest[int(r["fact_index"]) - 1] = dict(r)
+    return nearest
+
+
+def _resolve_targets(
+    items: List[Dict],
+    embeddings: np.ndarray,
+    nearest: List[Optional[Dict]],
+) -> None:
+    """
+    Decide per embedded fact: reinforce an existing memory, reinforce a
+    memory inserted earlier in this batch, or insert a new one. Same
+    outcome as processing the facts one by one.
+
+    Sets item["target"] = ("existing", memory_id) | ("new", item index).
+    """
+    new_positions: List[int] = []
+
+    for k, item in enumerate(items):
+        best = nearest[k]
+        candidate = ("existing", best["memory_id"]) if best else None
+        distance = best["distance"] if best else None
+
+        # facts inserted earlier in this batch are dedup candidates too
+        if new_positions:
+            sims = embeddings[new_positions] @ embeddings[k]
+            j = int(np.argmax(sims))
+            d = float(distance_from_similarity(sims[j]))
+            if distance is None or d < distance:
+                candidate, distance = ("new", items[new_positions[j]]["index"]), d
+
+        if candidate is not None and distance < SEMANTIC_DUP_DISTANCE:
+            item["target"] = candidate
+        else:
+            item["target"] = ("new", item["index"])
+            new_positions.append(k)
+
+
+async def store_ltm_facts(
+    user_id: str,
+    extracted_facts: List[Dict],
+    raw_context: str
+) -> None:
+    """
+    Bulk factual LTM write:
+    - exact repeats (same normalized text) are matched by content_hash
+      and reinforced without embedding
+    - one batched embedding call + one set-based dedup query for the rest
+    - reinforcements and inserts as unnest statements in one transaction
+    - 'extracted' events handed to the buffered event sink after commit
+    """
+
+    print("\n💾 [LTM] Starting LTM storage")
+
+    if not extracted_facts:
+        print("ℹ️ [LTM] No extracted facts provided")
+        return
+
+    items = _prepare_items(extracted_facts)
+    if not items:
         return
 
+    pool = await db_manager.get_pool()
+
     # -------------------------------------------------
-    # 2️⃣ DB operations
+    # 1️⃣ Exact repeats (content hash, no embedding)
     # -------------------------------------------------
-    pool = await db_manager.get_pool()
+    first_by_hash: Dict[str, Dict] = {}
+    repeats: List[Dict] = []
+    for item in items:
+        first = first_by_hash.setdefault(item["content_hash"], item)
+        if first is not item:
+            repeats.append(item)
 
-    async with pool.acquire() as conn:
-        for item in prepared_items:
-            fact = item["fact"]
+    try:
+        async with pool.acquire() as conn:
+            existing = {
+                r["content_hash"]: r["memory_id"]
+                for r in await conn.fetch(
+                    _EXISTING_HASHES_SQL, user_id, list(first_by_hash)
+                )
+            }
+    except Exception:
+        traceback.print_exc()
+        return
 
-            print(f"\n🧠 [LTM] Processing DB ops for: {fact}")
+    novel = []
+    for h, item in first_by_hash.items():
+        if h in existing:
+            item["target"] = ("existing", existing[h])
+        else:
+            novel.append(item)
 
-            # -----------------------------------------
-            # 2.1 Deduplication (FACTUAL ONLY)
-            # -----------------------------------------
-            try:
-                row = await conn.fetchrow(
-                    """
-                    SELECT
-                        memory_id,
-                        importance,
-                        embedding <-> $2::vector AS distance
-                    FROM agentic_memory_schema.memories
-                    WHERE user_id = $1
-                      AND memory_kind = 'factual'
-                      AND status = 'active'
-                    ORDER BY embedding <-> $2::vector
-                    LIMIT 1
-                    """,
-                    user_id,
-                    item["embedding"],
-                )
-            except Exception:
-                traceback.print_exc()
-                continue
+    print(
+        f"🔁 [LTM] {len(items) - len(novel)} exact repeat(s), "
+        f"{len(novel)} novel fact(s) to embed"
+    )
+
+    # -------------------------------------------------
+    # 2️⃣ Embed novel text (one batch)
+    # -------------------------------------------------
+    embeddings = np.empty((0, 0), dtype=np.float32)
+    if novel:
+        try:
+            # float32 (N, dim), sent as binary by the pool's vector codec
+            embeddings = np.asarray(
+                await create_embedding([item["fact"] for item in novel]),
+                dtype=np.float32,
+            )
+        except Exception:
+            traceback.print_exc()
+            return
 
+    try:
+        async with pool.acquire() as conn:
             # -----------------------------------------
-            # 2.2 Reinforce
+            # 3️⃣ Semantic dedup (FACTUAL ONLY), set-based
             # -----------------------------------------
-            if row and row["distance"] < SEMANTIC_DUP_DISTANCE:
-                try:
-                    new_importance = min(
-                        row["importance"] + IMPORTANCE_INCREMENT,
-                        MAX_IMPORTANCE
-                    )
+            if novel:
+                nearest = await _nearest_existing(conn, user_id, embeddings)
+                _resolve_targets(novel, embeddings, nearest)
 
-                    await conn.execute(
-                        """
-                        UPDATE agentic_memory_schema.memories
-                        SET
-                            frequency = frequency + 1,
-                            importance = $2,
-                            last_updated = NOW()
-                        WHERE memory_id = $1
-                        """,
-                        row["memory_id"],
-                        new_importance,
-                    )
+            # same text earlier in this batch: follow that fact
+            for item in repeats:
+                item["target"] = first_by_hash[item["content_hash"]]["target"]
+
+            reinforce_hits: Dict = {}
+            new_rows: Dict[int, Dict] = {}
 
-                    memory_id = row["memory_id"]
+            for item in items:
+                kind, ref = item["target"]
+                if kind == "existing":
+                    reinforce_hits[ref] = reinforce_hits.get(ref, 0) + 1
+                elif ref == item["index"]:
+                    new_rows[ref] = {**item, "memory_id": uuid.uuid4(), "frequency": 1}
+                else:
+                    # repeat of a fact inserted earlier in this batch
+                    leader = new_rows[ref]
+                    leader["frequency"] += 1
+                    leader["importance"] = min(
+                        leader["importance"] + IMPORTANCE_INCREMENT,
+                        MAX_IMPORTANCE,
+                    )
 
-                except Exception:
-                    traceback.print_exc()
-                    continue
+            embedding_of = {item["index"]: embeddings[k] for k, item in enumerate(novel)}
 
             # -----------------------------------------
-            # 2.3 Insert new factual memory
+            # 4️⃣ Apply in one transaction
             # -----------------------------------------
-            else:
-                try:
-                    row = await conn.fetchrow(
-                        """
-                        INSERT INTO agentic_memory_schema.memories (
+            async with conn.transaction():
+                written = {}
+                if new_rows:
+                    rows = list(new_rows.values())
+                    written = {
+                        r["content_hash"]: r["memory_id"]
+                        for r in await conn.fetch(
+                            _INSERT_SQL,
                             user_id,
-                            memory_kind,
-                            category,
-                            topic,
-                            fact,
-                            importance,
-                            confidence_score,
-                            confidence_source,
-                            frequency,
-                            status,
-                            embedding,
-                            metadata,
-                            created_at,
-                            last_updated
+                            [r["memory_id"] for r in rows],
+                            [r["category"] for r in rows],
+                            [r["topic"] for r in rows],
+                            [r["fact"] for r in rows],
+                            [r["importance"] for r in rows],
+                            [r["confidence_score"] for r in rows],
+                            [r["confidence_source"] for r in rows],
+                            [r["frequency"] for r in rows],
+                            [Vector(embedding_of[i]) for i in new_rows],
+                            [r["content_hash"] for r in rows],
                         )
-                        VALUES (
-                            $1,
-                            'factual',
-                            $2,
-                            $3,
-                            $4,
-                            $5,
-                            $6,
-                            $7,
-                            1,
-                            'active',
-                            $8,
-                            $9,
-                            NOW(),
-                            NOW()
+                    }
+
+                # same text stored concurrently since the hash lookup:
+                # reinforce that row instead
+                lost = [
+                    row["content_hash"] for row in new_rows.values()
+                    if row["content_hash"] not in written
+                ]
+                if lost:
+                    for r in await conn.fetch(_EXISTING_HASHES_SQL, user_id, lost):
+                        written[r["content_hash"]] = r["memory_id"]
+                        hits = sum(
+                            row["frequency"] for row in new_rows.values()
+                            if row["content_hash"] == r["content_hash"]
                         )
-                        RETURNING memory_id
-                        """,
-                        user_id,
-                        item["category"],
-                        item["topic"],
-                        item["fact"],
-                        item["importance"],
-                        item["confidence_score"],
-                        item["confidence_source"],
-                        item["embedding"],
-                        item["metadata"],
+                        reinforce_hits[r["memory_id"]] = reinforce_hits.get(r["memory_id"], 0) + hits
+
+                reinforced = []
+                if reinforce_hits:
+                    reinforced = await conn.fetch(
+                        _REINFORCE_SQL,
+                        list(reinforce_hits.keys()),
+                        list(reinforce_hits.values()),
+                        IMPORTANCE_INCREMENT,
+                        MAX_IMPORTANCE,
                     )
 
-                    memory_id = row["memory_id"]
+                # one 'extracted' event per fact, on the memory it landed on
+                event_ids = [
+                    ref if kind == "existing" else written[new_rows[ref]["content_hash"]]
+                    for kind, ref in (item["target"] for item in items)
+                ]
 
-                except Exception:
-                    traceback.print_exc()
-                    continue
+    except Exception:
+        traceback.print_exc()
+        return
 
-            # -----------------------------------------
-            # 2.4 Memory event log
-            # -----------------------------------------
-            try:
-                await conn.execute(
-                    """
-                    INSERT INTO agentic_memory_schema.memory_events (
-                        memory_id,
-                        event_type,
-                        source,
-                        signal_strength,
-                        raw_context,
-                        metadata,
-                        created_at
-                    )
-                    VALUES (
-                        $1,
-                        'extracted',
-                        'llm',
-                        $2,
-                        $3,
-                        '{}',
-                        NOW()
-                    )
-                    """,
-                    memory_id,
-                    item["confidence_score"],
-                    raw_context[:500],
-                )
-                print("\n🎉 [LTM FACTUAL] Storage completed successfully")
-            except Exception:
-                traceback.print_exc()
-                continue
+    # -------------------------------------------------
+    # 5️⃣ Audit events (buffered, COPY) + in-process views (after commit)
+    # -------------------------------------------------
+    context = raw_context[:500]
+    await memory_event_sink.emit([
+        event_record(memory_id, "extracted", "llm", item["confidence_score"], context)
+        for memory_id, item in zip(event_ids, items)
+    ])
+
+    for r in reinforced:
+        user_vector_cache.apply_reinforce(user_id, r["memory_id"], r["importance"])
+
+    inserted = 0
+    for i, row in new_rows.items():
+        if written[row["content_hash"]] == row["memory_id"]:
+            inserted += 1
+            user_vector_cache.apply_insert(user_id, {**row, "embedding": embedding_of[i]})
+    search_strategy.note_inserted(user_id, inserted)
 
-    
+    print(
+        f"\n🎉 [LTM FACTUAL] Stored {len(items)} fact(s): "
+        f"{inserted} new, {len(items) - inserted} reinforcement(s)"
+    )
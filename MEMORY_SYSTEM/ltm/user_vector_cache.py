@@ -0,0 +1,314 @@
+# MEMORY_SYSTEM/ltm/user_vector_cache.py
+#
+# Optional in-process cache of each active user's factual memories:
+# one contiguous float32 matrix + metadata arrays per user.
+#
+# - exact top-k with a single matmul (vectors are normalized)
+# - LRU eviction under a global byte budget
+# - writes in this process update / invalidate the entry
+#   (store_ltm_facts, consolidation); the TTL bounds staleness from
+#   writes made by other instances
+# - users with more than LTM_VECTOR_CACHE_MAX_USER_ROWS rows stay on the
+#   SQL path
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from MEMORY_SYSTEM.database.connect.connect import db_manager
+from MEMORY_SYSTEM.ltm.vector_query import distance_from_similarity
+
+LTM_VECTOR_CACHE = os.getenv("LTM_VECTOR_CACHE", "0") == "1"
+LTM_VECTOR_CACHE_MAX_MB = float(os.getenv("LTM_VECTOR_CACHE_MAX_MB", "256"))
+LTM_VECTOR_CACHE_MAX_USER_ROWS = int(os.getenv("LTM_VECTOR_CACHE_MAX_USER_ROWS", "20000"))
+LTM_VECTOR_CACHE_TTL_S = float(os.getenv("LTM_VECTOR_CACHE_TTL_S", "300"))
+
+# rough per-row cost of ids / strings / python objects next to the vector
+_ROW_OVERHEAD_BYTES = 400
+
+
+class UserMatrix:
+    """
+    Factual memories of one user ('active' and 'supporting').
+    """
+
+    def __init__(self, rows: List[dict]):
+        self.memory_ids = [r["memory_id"] for r in rows]
+        self.category = [r["category"] for r in rows]
+        self.topic = [r["topic"] for r in rows]
+        self.fact = [r["fact"] for r in rows]
+        self.importance = np.array([r["importance"] or 0.0 for r in rows], dtype=np.float32)
+        self.confidence = np.array([r["confidence_score"] for r in rows], dtype=np.float32)
+        self.active = np.array([r["status"] == "active" for r in rows], dtype=bool)
+
+        if rows:
+            self.matrix = np.stack([r["embedding"] for r in rows]).astype(np.float32, copy=False)
+        else:
+            self.matrix = np.empty((0, 0), dtype=np.float32)
+
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.memory_ids)
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.matrix.nbytes
+            + self.importance.nbytes
+            + self.confidence.nbytes
+            + self.active.nbytes
+            + len(self) * _ROW_OVERHEAD_BYTES
+            + sum(len(f) for f in self.fact)
+        )
+
+    def _row(self, i: int, distance: float) -> dict:
+        return {
+            "memory_id": self.memory_ids[i],
+            "category": self.category[i],
+            "topic": self.topic[i],
+            "fact": self.fact[i],
+            "importance": float(self.importance[i]),
+            "confidence_score": float(self.confidence[i]),
+            "distance": float(distance),
+        }
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        min_confidence: float,
+        include_supporting: bool = False,
+    ) -> List[dict]:
+        """
+        Same rows / order as the SQL factual search: per chunk the k
+        nearest rows, ordered by (chunk_index, distance).
+        """
+        if not len(self):
+            return []
+
+        mask = self.confidence >= min_confidence
+        if not include_supporting:
+            mask &= self.active
+        candidates = np.flatnonzero(mask)
+        if candidates.size == 0:
+            return []
+
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        sims = queries @ self.matrix[candidates].T           # (chunks, candidates)
+
+        k = min(k, candidates.size)
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+
+        rows: List[dict] = []
+        for chunk_index in range(sims.shape[0]):
+            chunk_top = top[chunk_index]
+            order = chunk_top[np.argsort(-sims[chunk_index, chunk_top], kind="stable")]
+            distances = distance_from_similarity(sims[chunk_index, order])
+            for j, distance in zip(order, distances):
+                row = self._row(int(candidates[j]), distance)
+                row["chunk_index"] = chunk_index
+                rows.append(row)
+        return rows
+
+    def nearest_active(self, vec: np.ndarray) -> Optional[dict]:
+        """
+        Store-time dedup: nearest active row, same shape as the SQL row.
+        """
+        candidates = np.flatnonzero(self.active)
+        if candidates.size == 0:
+            return None
+        sims = self.matrix[candidates] @ np.asarray(vec, dtype=np.float32).reshape(-1)
+        j = int(np.argmax(sims))
+        i = int(candidates[j])
+        return {
+            "memory_id": self.memory_ids[i],
+            "importance": float(self.importance[i]),
+            "distance": float(distance_from_similarity(sims[j])),
+        }
+
+    def append(self, row: dict) -> None:
+        vec = np.asarray(row["embedding"], dtype=np.float32).reshape(1, -1)
+        self.matrix = vec if not len(self) else np.vstack([self.matrix, vec])
+        self.memory_ids.append(row["memory_id"])
+        self.category.append(row["category"])
+        self.topic.append(row["topic"])
+        self.fact.append(row["fact"])
+        self.importance = np.append(self.importance, np.float32(row["importance"] or 0.0))
+        self.confidence = np.append(self.confidence, np.float32(row["confidence_score"]))
+        self.active = np.append(self.active, row.get("status", "active") == "active")
+
+    def set_importance(self, memory_id, importance: float) -> None:
+        try:
+            self.importance[self.memory_ids.index(memory_id)] = importance
+        except ValueError:
+            pass
+
+
+class UserVectorCache:
+    def __init__(
+        self,
+        enabled: bool = LTM_VECTOR_CACHE,
+        max_bytes: int = int(LTM_VECTOR_CACHE_MAX_MB * 1024 * 1024),
+        max_user_rows: int = LTM_VECTOR_CACHE_MAX_USER_ROWS,
+        ttl_s: float = LTM_VECTOR_CACHE_TTL_S,
+    ):
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.max_user_rows = max_user_rows
+        self.ttl_s = ttl_s
+
+        self._entries: "OrderedDict[str, UserMatrix]" = OrderedDict()
+        self._too_large: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # -------------------------------------------------
+    # Lookup / load
+    # -------------------------------------------------
+    def _fresh(self, loaded_at: float) -> bool:
+        return time.monotonic() - loaded_at < self.ttl_s
+
+    def peek(self, user_id: str) -> Optional[UserMatrix]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        if not self._fresh(entry.loaded_at):
+            self.invalidate(user_id)
+            return None
+        self._entries.move_to_end(user_id)
+        return entry
+
+    async def get(self, user_id: str, conn=None) -> Optional[UserMatrix]:
+        """
+        Cached matrix for the user, loading it on a miss.
+        None when disabled or the user is too large to cache.
+        """
+        if not self.enabled:
+            return None
+
+        entry = self.peek(user_id)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        too_large_at = self._too_large.get(user_id)
+        if too_large_at is not None and self._fresh(too_large_at):
+            return None
+
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        try:
+            async with lock:
+                entry = self.peek(user_id)
+                if entry is not None:
+                    self.hits += 1
+                    return entry
+
+                self.misses += 1
+                if conn is not None:
+                    rows = await self._fetch(conn, user_id)
+                else:
+                    pool = await db_manager.get_pool()
+                    async with pool.acquire() as conn:
+                        rows = await self._fetch(conn, user_id)
+
+                if len(rows) > self.max_user_rows:
+                    self._too_large[user_id] = time.monotonic()
+                    return None
+
+                entry = UserMatrix(rows)
+                self._put(user_id, entry)
+                return entry
+        finally:
+            self._locks.pop(user_id, None)
+
+    async def _fetch(self, conn, user_id: str) -> List[dict]:
+        return await conn.fetch(
+            """
+            SELECT
+                m.memory_id,
+                m.category,
+                m.topic,
+                m.fact,
+                COALESCE(s.importance, m.importance) AS importance,
+                m.confidence_score,
+                m.status,
+                m.embedding
+            FROM agentic_memory_schema.memories m
+            LEFT JOIN agentic_memory_schema.memory_signals s
+                ON s.memory_id = m.memory_id
+            WHERE m.user_id = $1
+              AND m.memory_kind = 'factual'
+              AND m.status IN ('active', 'supporting')
+              AND m.embedding IS NOT NULL
+            LIMIT $2
+            """,
+            user_id,
+            self.max_user_rows + 1,
+        )
+
+    def _put(self, user_id: str, entry: UserMatrix) -> None:
+        self.invalidate(user_id)
+        self._entries[user_id] = entry
+        self._bytes += entry.nbytes
+        self._evict_over_budget()
+
+    def _evict_over_budget(self) -> None:
+        # least recently used first; the most recent entry always stays
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evictions += 1
+
+    # -------------------------------------------------
+    # Write path (this process)
+    # -------------------------------------------------
+    def apply_insert(self, user_id: str, row: dict) -> None:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return
+        before = entry.nbytes
+        entry.append(row)
+        self._bytes += entry.nbytes - before
+        self._entries.move_to_end(user_id)
+        self.note_size_change(user_id)
+        self._evict_over_budget()
+
+    def apply_reinforce(self, user_id: str, memory_id, importance: float) -> None:
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            entry.set_importance(memory_id, importance)
+
+    def note_size_change(self, user_id: str) -> None:
+        entry = self._entries.get(user_id)
+        if entry is not None and len(entry) > self.max_user_rows:
+            self.invalidate(user_id)
+            self._too_large[user_id] = time.monotonic()
+
+    def invalidate(self, user_id: str) -> None:
+        entry = self._entries.pop(user_id, None)
+        if entry is not None:
+            self._bytes -= entry.nbytes
+        self._too_large.pop(user_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "users": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+user_vector_cache = UserVectorCache()
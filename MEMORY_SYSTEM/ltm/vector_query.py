@@ -0,0 +1,121 @@
+# MEMORY_SYSTEM/ltm/vector_query.py
+#
+# Single place that decides which pgvector distance operator the hot
+# queries use. The operator MUST match the opclass of the ANN index on
+# memories.embedding, otherwise Postgres cannot use the index for
+# ORDER BY ... LIMIT and falls back to a sequential scan.
+
+import math
+import os
+from typing import Sequence
+
+import numpy as np
+
+# =====================================================
+# Metric (must match the index opclass)
+# =====================================================
+# cosine : vector_cosine_ops, <=>  distance = 1 - cos          in [0, 2]
+# ip     : vector_ip_ops,     <#>  distance = -(a . b)         in [-1, 1]
+# l2     : vector_l2_ops,     <->  distance = ||a - b||        in [0, 2]
+#
+# Embeddings are normalized, so all three give the same ordering; cosine
+# matches the existing idx_memories_embedding. Changing the metric
+# requires rebuilding the index with the new opclass.
+METRICS = {
+    "cosine": ("vector_cosine_ops", "<=>"),
+    "ip": ("vector_ip_ops", "<#>"),
+    "l2": ("vector_l2_ops", "<->"),
+}
+
+VECTOR_METRIC = os.getenv("VECTOR_METRIC", "cosine")
+if VECTOR_METRIC not in METRICS:
+    raise ValueError(f"Unknown VECTOR_METRIC '{VECTOR_METRIC}', expected one of {tuple(METRICS)}")
+
+VECTOR_OPCLASS, VECTOR_OPERATOR = METRICS[VECTOR_METRIC]
+
+MEMORIES_TABLE = "agentic_memory_schema.memories"
+EMBEDDING_INDEX = "idx_memories_embedding"
+
+
+# =====================================================
+# Threshold conversion (unit vectors: ||a-b||^2 = 2 - 2 cos)
+# =====================================================
+def from_l2(l2_distance: float) -> float:
+    """
+    Convert an L2 distance threshold to the configured metric's scale.
+    """
+    if VECTOR_METRIC == "l2":
+        return l2_distance
+    cos_distance = (l2_distance ** 2) / 2.0
+    if VECTOR_METRIC == "cosine":
+        return cos_distance
+    return cos_distance - 1.0  # ip: -(cos) = (1 - cos) - 1
+
+
+def to_l2(distance: float) -> float:
+    """
+    Convert a distance returned by the configured operator back to L2.
+    """
+    if VECTOR_METRIC == "l2":
+        return distance
+    cos_distance = distance if VECTOR_METRIC == "cosine" else distance + 1.0
+    return math.sqrt(max(0.0, 2.0 * cos_distance))
+
+
+def l2_from_distance_sql(expr: str) -> str:
+    """
+    SQL version of to_l2() for a distance column / expression.
+    """
+    if VECTOR_METRIC == "l2":
+        return expr
+    cos_distance = expr if VECTOR_METRIC == "cosine" else f"({expr} + 1.0)"
+    return f"sqrt(GREATEST(0.0, 2.0 * {cos_distance}))"
+
+
+def distance_from_similarity(similarity):
+    """
+    Cosine similarity of unit vectors (scalar or ndarray) -> distance in
+    the configured metric, as the SQL operator would return it.
+    """
+    if VECTOR_METRIC == "cosine":
+        return 1.0 - similarity
+    if VECTOR_METRIC == "ip":
+        return -similarity
+    return np.sqrt(np.maximum(0.0, 2.0 - 2.0 * similarity))
+
+
+# =====================================================
+# SQL builders
+# =====================================================
+def distance_sql(vector: str, column: str = "embedding") -> str:
+    return f"{column} {VECTOR_OPERATOR} {vector}"
+
+
+def nearest_neighbours_sql(
+    *,
+    vector: str,
+    where: str,
+    limit: str,
+    columns: Sequence[str],
+    table: str = MEMORIES_TABLE,
+    exact: bool = False,
+) -> str:
+    """
+    Top-k nearest rows to `vector` (a placeholder or column reference).
+
+    ANN: ORDER BY is the bare `embedding <op> vector` expression with
+    LIMIT, the only shape the ANN index can serve.
+    exact: ORDER BY an expression the ANN index cannot serve, so the
+    planner filters through the btree indexes and sorts every match.
+    """
+    distance = distance_sql(vector)
+    order_by = f"({distance}) + 0" if exact else distance
+    return f"""
+        SELECT
+            {", ".join(columns)},
+            {distance} AS distance
+        FROM {table}
+        WHERE {where}
+        ORDER BY {order_by}
+        LIMIT {limit}
+    """
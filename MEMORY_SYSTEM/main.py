@@ -10,23 +10,24 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
 import os
+import json
+import time
+import uuid
 import asyncio
 import traceback
+from typing import AsyncIterator, List, Optional
 
 from dotenv import load_dotenv
 load_dotenv()
 from fastapi import BackgroundTasks
 from MEMORY_SYSTEM.runtime.background_worker import submit_background_task
-from MEMORY_SYSTEM.context.build_cognition_context import build_epistemic_system_prompt
-from MEMORY_SYSTEM.persona.persona_agent_flow import bring_user_persona
+from MEMORY_SYSTEM.context.context_assembly import assemble_context
 from MEMORY_SYSTEM.persona.persona_agent_flow import learn_persona_from_interaction
 from MEMORY_SYSTEM.ltm.extract_ltm import extract_ltm_facts
-from MEMORY_SYSTEM.ltm.retriever import retrieve_ltm_memories
-from MEMORY_SYSTEM.ltm.context_builder import build_ltm_context
-from MEMORY_SYSTEM.stm.stm_orchestrator import process_user_message, post_model_response
+from MEMORY_SYSTEM.stm.stm_orchestrator import post_model_response
+from MEMORY_SYSTEM.runtime.tracing import span, traced_task, start_trace, record_span, new_span_id
 
 import traceback
-from langchain_aws import ChatBedrock
 
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID") 
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY") 
@@ -59,15 +60,61 @@ def safe_bg(task_name: str, factory):
 #  # BEDROCK INITIALIZATION 
 # -------------------------------------------------------------------
 
-llm = ChatBedrock( 
-    model_id=LLM_MODEL_NEWS_FETCHER, 
-    region_name=AWS_MODEL_REGION, 
-    temperature=0.2, 
-    max_tokens=9999, 
-    aws_access_key_id=AWS_ACCESS_KEY_ID, 
-    aws_secret_access_key=AWS_SECRET_ACCESS_KEY 
+_llm = None
+
+
+def get_llm():
+    """
+    ChatBedrock client, built on first use (keeps import cheap).
+    """
+    global _llm
+    if _llm is None:
+        from langchain_aws import ChatBedrock
+
+        _llm = ChatBedrock( 
+            model_id=LLM_MODEL_NEWS_FETCHER, 
+            region_name=AWS_MODEL_REGION, 
+            temperature=0.2, 
+            max_tokens=9999, 
+            aws_access_key_id=AWS_ACCESS_KEY_ID, 
+            aws_secret_access_key=AWS_SECRET_ACCESS_KEY 
+            )
+    return _llm
+
+# -------------------------------------------------------------------
+# POST-RESPONSE BACKGROUND JOBS (shared by blocking + streaming paths)
+# -------------------------------------------------------------------
+
+def schedule_post_response_tasks(
+    background_tasks: BackgroundTasks,
+    user_id: str,
+    user_prompt: str,
+    user_intent: dict,
+    response_text: str
+) -> None:
+    background_tasks.add_task(
+        traced_task("bg.post_model_response", post_model_response),
+        user_id=user_id,
+        route=user_intent["route"],
+        route_confidence=user_intent["route_confidence"],
+        stm_written=user_intent["stm_written"],
+        response_text=response_text
+    )
+
+    background_tasks.add_task(
+        traced_task("bg.learn_persona_from_interaction", learn_persona_from_interaction),
+        user_id,
+        user_prompt
+    )
+
+    background_tasks.add_task(
+        traced_task("bg.extract_ltm_facts", extract_ltm_facts),
+        user_id,
+        user_prompt,
+        response_text
     )
 
+
 # ------------------------------------------------------------------- 
 # # RAW BEDROCK CALL (NO STRUCTURED OUTPUT) 
 # -------------------------------------------------------------------
@@ -87,53 +134,28 @@ async def bedrock_llm_call(
         print(user_prompt)
         print("\n\n===================USER PROMPT END===================\n\n")
 
-        user_intent = await process_user_message(
-        user_id,
-        user_prompt
-    )
-        print("user_intent:  ", user_intent)
-        try:
-            epistemic_system_prompt = build_epistemic_system_prompt(system_prompt)
-            print("\n\n===================EPISTEMIC SYSTEM PROMPT START===================\n\n")
-            print(epistemic_system_prompt)
-            print("\n\n===================EPISTEMIC SYSTEM PROMPT END===================\n\n")
-            user_persona = await bring_user_persona(user_id)
-            print("\n\n===================USER PERSONA START===================\n\n")
-            print(user_persona)
-            print("\n\n===================USER PERSONA END===================\n\n")
-
-            final_system_prompt = f"""
-            RULES:
-            {epistemic_system_prompt}
-
-            USER_PERSONA:
-            {user_persona}
-"""
-        except Exception:
-            final_system_prompt = system_prompt
-
+        # --------------------------------------------------
+        # CONTEXT ASSEMBLY (intent / epistemic / persona / LTM run concurrently)
+        # --------------------------------------------------
+        context = await assemble_context(
+            user_id,
+            system_prompt,
+            user_prompt
+        )
 
-        try:
-            ltm_memories = await retrieve_ltm_memories(user_id, user_prompt)
-            episodic = ltm_memories.get("episodic",None)
-            factual = ltm_memories.get("factual",None)
-            ltm_context = build_ltm_context(factual)
-            print("\n\n===================LONG TERMS EPISODIC MEMORIES START===================\n\n")
-            print(episodic)
-            print("\n\n===================LONG TERM EPISODIC MEMORIES END===================\n\n")
+        user_intent = context.user_intent
+        final_system_prompt = context.final_system_prompt
+        final_user_prompt = context.final_user_prompt
 
-            print("\n\n===================LONG TERMS FACTUAL MEMORIES START===================\n\n")
-            print(factual)
-            print("\n\n===================LONG TERM FACTUAL MEMORIES END===================\n\n")
+        print("user_intent:  ", user_intent)
 
-            final_user_prompt = f"""
-            {ltm_context}
+        print("\n\n===================LONG TERMS EPISODIC MEMORIES START===================\n\n")
+        print(context.episodic)
+        print("\n\n===================LONG TERM EPISODIC MEMORIES END===================\n\n")
 
-            User question:
-            {user_prompt}
-            """
-        except Exception:
-            final_user_prompt = user_prompt
+        print("\n\n===================LONG TERMS FACTUAL MEMORIES START===================\n\n")
+        print(context.factual)
+        print("\n\n===================LONG TERM FACTUAL MEMORIES END===================\n\n")
 
 
         print("#"*40)
@@ -147,12 +169,13 @@ async def bedrock_llm_call(
 
 
 
-        response = await llm.ainvoke(
-            [
-                {"role": "system", "content": final_system_prompt},
-                {"role": "user", "content": final_user_prompt}
-            ]
-        )
+        with span("bedrock.generate", model_id=LLM_MODEL_NEWS_FETCHER):
+            response = await get_llm().ainvoke(
+                [
+                    {"role": "system", "content": final_system_prompt},
+                    {"role": "user", "content": final_user_prompt}
+                ]
+            )
         # --------------------------------------------------
         # BACKGROUND PERSONA LEARNING (NON-BLOCKING)
         # --------------------------------------------------
@@ -167,27 +190,13 @@ async def bedrock_llm_call(
         print(agent_response.get('content'))
         agent_response_content = agent_response.get('content')
 
-        background_tasks.add_task(
-            post_model_response,
+        schedule_post_response_tasks(
+            background_tasks,
             user_id=user_id,
-            route=user_intent["route"],
-            route_confidence=user_intent["route_confidence"],
-            stm_written=user_intent["stm_written"],
+            user_prompt=user_prompt,
+            user_intent=user_intent,
             response_text=agent_response_content
         )
-        
-        background_tasks.add_task(
-            learn_persona_from_interaction,
-            user_id,
-            user_prompt
-        )
-        
-        background_tasks.add_task(
-            extract_ltm_facts,
-            user_id,
-            user_prompt,
-            agent_response_content
-        )
 
         return agent_response_content
 
@@ -199,6 +208,153 @@ async def bedrock_llm_call(
 
 
 
+# -------------------------------------------------------------------
+# STREAMING BEDROCK CALL (SERVER-SENT EVENTS)
+# -------------------------------------------------------------------
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _chunk_text(chunk) -> str:
+    """
+    AIMessageChunk.content is a str, or a list of content blocks
+    (Bedrock Converse style) for some models.
+    """
+    content = getattr(chunk, "content", "")
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            block.get("text", "") if isinstance(block, dict) else str(block)
+            for block in content
+        )
+    return ""
+
+
+async def bedrock_llm_stream(
+    user_id: str,
+    system_prompt: str,
+    user_prompt: str,
+    background_tasks: BackgroundTasks,
+    request_id: Optional[str] = None
+) -> AsyncIterator[str]:
+    """
+    Same flow as bedrock_llm_call, but yields SSE frames as tokens arrive.
+
+    Events:
+    - token : {"delta": "..."}
+    - done  : {"request_id": "..."}
+    - error : {"error": "..."}
+
+    The full text is buffered; background jobs are scheduled ONLY after
+    the stream completes (never for a failed or abandoned stream).
+    """
+
+    # The trace (and the request span, parent of the spans below) is
+    # bound around each step, never across a yield: a client disconnect
+    # closes the generator from another context, where resetting a token
+    # set here raises ValueError. Spans are recorded with record_span.
+    trace_id = request_id or str(uuid.uuid4())
+    request_span_id = new_span_id()
+    request_started = time.perf_counter()
+    request_error: Optional[BaseException] = None
+
+    try:
+        with start_trace(trace_id, request_span_id):
+            context = await assemble_context(
+                user_id,
+                system_prompt,
+                user_prompt
+            )
+
+        user_intent = context.user_intent
+        print("user_intent:  ", user_intent)
+
+        buffer: List[str] = []
+        started = time.perf_counter()
+        ttft_ms: Optional[float] = None
+        stream_error: Optional[BaseException] = None
+
+        chunks = get_llm().astream(
+            [
+                {"role": "system", "content": context.final_system_prompt},
+                {"role": "user", "content": context.final_user_prompt}
+            ]
+        ).__aiter__()
+
+        try:
+            while True:
+                with start_trace(trace_id, request_span_id):
+                    try:
+                        chunk = await chunks.__anext__()
+                    except StopAsyncIteration:
+                        break
+
+                delta = _chunk_text(chunk)
+                if not delta:
+                    continue
+
+                if ttft_ms is None:
+                    ttft_ms = round((time.perf_counter() - started) * 1000, 1)
+
+                buffer.append(delta)
+                yield _sse("token", {"delta": delta})
+        except BaseException as e:
+            stream_error = e
+            raise
+        finally:
+            attributes = {"model_id": LLM_MODEL_NEWS_FETCHER}
+            if ttft_ms is not None:
+                attributes["ttft_ms"] = ttft_ms
+            with start_trace(trace_id, request_span_id):
+                # abandoned / failed stream: release the Bedrock
+                # connection now, not at garbage collection
+                try:
+                    await chunks.aclose()
+                except Exception:
+                    traceback.print_exc()
+                record_span(
+                    "bedrock.stream",
+                    duration_ms=(time.perf_counter() - started) * 1000,
+                    error=stream_error,
+                    **attributes
+                )
+
+        agent_response_content = "".join(buffer)
+        print(agent_response_content)
+
+        with start_trace(trace_id, request_span_id):
+            schedule_post_response_tasks(
+                background_tasks,
+                user_id=user_id,
+                user_prompt=user_prompt,
+                user_intent=user_intent,
+                response_text=agent_response_content
+            )
+
+        yield _sse("done", {"request_id": trace_id})
+
+    except Exception as e:
+        request_error = e
+        traceback.print_exc()
+        yield _sse("error", {"error": str(e)})
+
+    except BaseException as e:
+        request_error = e
+        raise
+
+    finally:
+        with start_trace(trace_id):
+            record_span(
+                "http.model.stream",
+                duration_ms=(time.perf_counter() - request_started) * 1000,
+                error=request_error,
+                span_id=request_span_id,
+                user_id=user_id
+            )
+
+
 # -------------------------------------------------------------------
 # MANUAL TEST ENTRY POINT
 # -------------------------------------------------------------------
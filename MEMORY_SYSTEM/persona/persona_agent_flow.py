@@ -31,8 +31,6 @@ from typing import Dict, Any
 from dotenv import load_dotenv
 load_dotenv()
 
-from langchain_aws import ChatBedrock
-
 from MEMORY_SYSTEM.persona.persona_schema import UserPersonaModel
 from MEMORY_SYSTEM.persona.persona_context_builder import build_persona_context
 # from MEMORY_SYSTEM.persona.persona_extractor import persona_extractor_llm_call
@@ -54,14 +52,26 @@ AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 AWS_MODEL_REGION = "ap-southeast-2"
 BEDROCK_MODEL_ID = "amazon.nova-lite-v1:0"
 
-llm = ChatBedrock(
-    model_id=BEDROCK_MODEL_ID,
-    region_name=AWS_MODEL_REGION,
-    temperature=0.2,
-    max_tokens=2000,
-    aws_access_key_id=AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-)
+_llm = None
+
+
+def get_llm():
+    """
+    ChatBedrock client, built on first use (keeps import cheap).
+    """
+    global _llm
+    if _llm is None:
+        from langchain_aws import ChatBedrock
+
+        _llm = ChatBedrock(
+            model_id=BEDROCK_MODEL_ID,
+            region_name=AWS_MODEL_REGION,
+            temperature=0.2,
+            max_tokens=2000,
+            aws_access_key_id=AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+        )
+    return _llm
 
 
 # -------------------------------------------------------------------
@@ -74,7 +84,7 @@ async def call_llm(system_prompt: str, user_prompt: str) -> str:
     Persona is already embedded in system_prompt.
     """
 
-    response = await llm.ainvoke(
+    response = await get_llm().ainvoke(
         [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
@@ -16,7 +16,6 @@ Design Rules:
 - Stable, reusable guidance only
 """
 
-import json
 from copy import deepcopy
 from MEMORY_SYSTEM.database.connect.connect import db_manager
 
@@ -41,27 +40,8 @@ async def load_user_persona(user_id: str) -> dict | None:
         if not row:
             return None
 
-        data = dict(row)
-
-        # Explicit JSONB decoding
-        for key in [
-            "user_identity",
-            "company_profile",
-            "company_business",
-            "company_products",
-            "company_brand",
-            "objective",
-            "content_format",
-            "audience",
-            "tone",
-            "writing_style",
-            "language",
-            "constraints",
-        ]:
-            if isinstance(data.get(key), str):
-                data[key] = json.loads(data[key])
-
-        return data
+        # JSONB blocks arrive as dicts (pool jsonb codec)
+        return dict(row)
 
 
 # -------------------------------------------------------------------
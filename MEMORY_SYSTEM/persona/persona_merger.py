@@ -9,7 +9,6 @@ Guarantees:
 - Schema matches UserPersonaModel exactly
 """
 
-import json
 from datetime import datetime
 from typing import Optional
 
@@ -26,14 +25,10 @@ CONFIDENCE_OVERRIDE_THRESHOLD = 0.80
 def normalize_db_block(value: Optional[object]) -> Optional[dict]:
     """
     Normalize JSONB values coming from Postgres.
-    asyncpg may return dict OR str depending on state.
+    The pool's jsonb codec already decodes them to dicts.
     """
-    if value is None:
-        return None
     if isinstance(value, dict):
         return value
-    if isinstance(value, str):
-        return json.loads(value)
     return None
 
 
@@ -47,13 +42,14 @@ def safe_confidence(block) -> float:
     return float(value) if value is not None else 0.0
 
 
-def jsonb_or_none(block: Optional[dict]) -> Optional[str]:
+def jsonb_or_none(block: Optional[dict]) -> Optional[dict]:
     """
     Prevent empty objects from overwriting stored data.
+    Dicts are encoded by the pool's jsonb codec.
     """
     if not block:
         return None
-    return json.dumps(block)
+    return block
 
 
 # -------------------------------------------------------------------
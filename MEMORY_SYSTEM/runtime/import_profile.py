@@ -0,0 +1,105 @@
+"""
+Import-Time Profile Report
+==========================
+
+Purpose:
+- Measure what importing a module costs (cold interpreter, -X importtime)
+- List the slowest imports (cumulative) so regressions are easy to spot
+- Fail when the total exceeds the startup budget
+
+Usage:
+    python MEMORY_SYSTEM/runtime/import_profile.py
+    python MEMORY_SYSTEM/runtime/import_profile.py MEMORY_SYSTEM.ltm.retriever --top 30
+
+Defaults to MEMORY_SYSTEM.main (app.py also fetches AWS secrets at import).
+"""
+
+import sys
+import os
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "..", ".."))
+
+import argparse
+import subprocess
+import time
+from typing import List, Tuple
+
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "3000"))
+
+
+def profile_import(module: str) -> Tuple[float, List[Tuple[int, int, str]]]:
+    """
+    Returns (wall_ms, [(self_us, cumulative_us, qualified_name), ...]).
+    """
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+
+    if proc.returncode != 0:
+        raise RuntimeError(
+            f"import {module} failed:\n"
+            + "\n".join(
+                line for line in proc.stderr.splitlines()
+                if not line.startswith("import time:")
+            )
+        )
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0].strip())
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            continue  # header line
+        # one separator space, then two spaces per nesting level
+        rows.append((self_us, cumulative_us, parts[2][1:].rstrip()))
+
+    return wall_ms, rows
+
+
+def print_report(module: str, top: int, budget_ms: float) -> bool:
+    wall_ms, rows = profile_import(module)
+
+    # top-level entries (no leading indentation) sum to the total import cost
+    total_ms = sum(c for _, c, name in rows if not name.startswith(" ")) / 1000
+
+    print(f"\n📦 Import profile: {module}")
+    print(f"  interpreter wall : {wall_ms:9.1f} ms")
+    print(f"  imports total    : {total_ms:9.1f} ms  (budget {budget_ms:.0f} ms)")
+
+    print(f"\n  Top {top} by cumulative time:")
+    for self_us, cumulative_us, name in sorted(rows, key=lambda r: r[1], reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:9.1f} ms  (self {self_us / 1000:7.1f})  {name.strip()}")
+
+    heavy = [
+        name.strip() for _, c, name in rows
+        if name.strip().split(".")[0] in ("torch", "sentence_transformers", "transformers", "langchain_aws")
+        and "." not in name.strip()
+    ]
+    if heavy:
+        print(f"\n  ⚠ heavy libraries imported eagerly: {', '.join(sorted(set(heavy)))}")
+
+    within = total_ms <= budget_ms
+    print("\n✅ Within budget" if within else "\n❌ Over budget")
+    return within
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("module", nargs="?", default="MEMORY_SYSTEM.main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    args = parser.parse_args()
+
+    sys.exit(0 if print_report(args.module, args.top, args.budget_ms) else 1)
@@ -0,0 +1,261 @@
+# MEMORY_SYSTEM/runtime/tracing.py
+
+import os
+import json
+import time
+import uuid
+import threading
+import functools
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+load_dotenv()
+
+# =====================================================
+# Configuration
+# =====================================================
+# memory | jsonl | off
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "memory")
+TRACE_JSONL_PATH = os.getenv("TRACE_JSONL_PATH", "traces.jsonl")
+TRACE_MEMORY_MAX_SPANS = int(os.getenv("TRACE_MEMORY_MAX_SPANS", "10000"))
+TRACE_DB_QUERY_MAX_CHARS = 200
+
+
+# =====================================================
+# Context (request id + current span, task-local)
+# =====================================================
+_current_trace_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "trace_id", default=None
+)
+_current_span_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "span_id", default=None
+)
+
+
+@dataclass
+class Span:
+    trace_id: Optional[str]
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    start_ts: float
+    duration_ms: float = 0.0
+    status: str = "ok"
+    error: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+# =====================================================
+# Exporters
+# =====================================================
+class InMemoryCollector:
+    """
+    Bounded ring buffer of finished spans (oldest dropped first).
+    """
+
+    def __init__(self, max_spans: int = TRACE_MEMORY_MAX_SPANS):
+        self._spans: deque = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self, trace_id: Optional[str] = None) -> List[Span]:
+        with self._lock:
+            items = list(self._spans)
+        if trace_id is None:
+            return items
+        return [s for s in items if s.trace_id == trace_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+class JsonlExporter:
+    """
+    Appends one JSON object per finished span to a local file.
+    """
+
+    def __init__(self, path: str = TRACE_JSONL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._fh = None
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            if self._fh is None:
+                self._fh = open(self.path, "a", encoding="utf-8", buffering=1)
+            self._fh.write(line + "\n")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+
+def _build_exporter():
+    if TRACE_EXPORTER == "jsonl":
+        return JsonlExporter(TRACE_JSONL_PATH)
+    if TRACE_EXPORTER == "memory":
+        return InMemoryCollector(TRACE_MEMORY_MAX_SPANS)
+    return None
+
+
+_exporter = _build_exporter()
+
+
+def set_exporter(exporter) -> None:
+    """
+    Replace the active exporter (any object with .export(span), or None to disable).
+    """
+    global _exporter
+    _exporter = exporter
+
+
+def get_exporter():
+    return _exporter
+
+
+def _export(span: Span) -> None:
+    if _exporter is None:
+        return
+    try:
+        _exporter.export(span)
+    except Exception as e:
+        # Tracing must never break the request path
+        print("⚠️ [TRACE] export failed:", e)
+
+
+# =====================================================
+# Public API
+# =====================================================
+def current_trace_id() -> Optional[str]:
+    return _current_trace_id.get()
+
+
+def new_span_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+@contextmanager
+def start_trace(trace_id: Optional[str] = None, span_id: Optional[str] = None):
+    """
+    Bind a request id (and optionally the span new spans are parented
+    under) to the current context. Yields the id.
+    """
+    trace_id = trace_id or str(uuid.uuid4())
+    token = _current_trace_id.set(trace_id)
+    span_token = _current_span_id.set(span_id) if span_id is not None else None
+    try:
+        yield trace_id
+    finally:
+        if span_token is not None:
+            _current_span_id.reset(span_token)
+        _current_trace_id.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Record a timed span around a block (works in sync and async code).
+
+    Usage:
+        with span("ltm.retrieve", user_id=user_id):
+            ...
+    """
+    s = Span(
+        trace_id=_current_trace_id.get(),
+        span_id=new_span_id(),
+        parent_id=_current_span_id.get(),
+        name=name,
+        start_ts=time.time(),
+        attributes=dict(attributes),
+    )
+    token = _current_span_id.set(s.span_id)
+    started = time.perf_counter()
+    try:
+        yield s
+    except BaseException as e:
+        s.status = "error"
+        s.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        s.duration_ms = (time.perf_counter() - started) * 1000
+        _current_span_id.reset(token)
+        _export(s)
+
+
+def record_span(
+    name: str,
+    duration_ms: float,
+    error: Optional[BaseException] = None,
+    span_id: Optional[str] = None,
+    **attributes,
+) -> None:
+    """
+    Record a span that was already measured elsewhere (e.g. DB query logger).
+    `span_id`: id its children were already parented under, if any.
+    """
+    _export(
+        Span(
+            trace_id=_current_trace_id.get(),
+            span_id=span_id or new_span_id(),
+            parent_id=_current_span_id.get(),
+            name=name,
+            start_ts=time.time() - duration_ms / 1000,
+            duration_ms=duration_ms,
+            status="error" if error is not None else "ok",
+            error=f"{type(error).__name__}: {error}" if error is not None else None,
+            attributes=dict(attributes),
+        )
+    )
+
+
+def traced_task(name: str, func: Callable) -> Callable:
+    """
+    Wrap a coroutine function (e.g. a BackgroundTasks job) so it runs
+    under the request id that was active when it was scheduled.
+    """
+    trace_id = _current_trace_id.get()
+    parent_id = _current_span_id.get()
+
+    @functools.wraps(func)
+    async def _wrapped(*args, **kwargs):
+        trace_token = _current_trace_id.set(trace_id)
+        span_token = _current_span_id.set(parent_id)
+        try:
+            with span(name):
+                return await func(*args, **kwargs)
+        finally:
+            _current_span_id.reset(span_token)
+            _current_trace_id.reset(trace_token)
+
+    return _wrapped
+
+
+def record_db_query(record) -> None:
+    """
+    asyncpg query logger callback (see DatabaseManager.get_pool).
+    Only queries issued inside a trace are recorded.
+    """
+    if _current_trace_id.get() is None:
+        return
+
+    query = " ".join((record.query or "").split())
+    record_span(
+        "db.query",
+        duration_ms=(record.elapsed or 0.0) * 1000,
+        error=record.exception,
+        query=query[:TRACE_DB_QUERY_MAX_CHARS],
+    )
@@ -0,0 +1,93 @@
+# MEMORY_SYSTEM/runtime/warmup.py
+
+import asyncio
+import time
+import traceback
+from typing import Awaitable, Callable, Dict, Optional
+
+_warmup_task: Optional[asyncio.Task] = None
+_ready: Optional[asyncio.Event] = None
+_status: Dict[str, dict] = {}
+_required: set = set()
+
+
+async def _run_warmup(steps: Dict[str, Callable[[], Awaitable]]) -> None:
+    async def _step(name: str, factory: Callable[[], Awaitable]) -> None:
+        _status[name] = {"state": "running"}
+        started = time.perf_counter()
+        try:
+            await factory()
+            _status[name] = {
+                "state": "done",
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+            }
+        except Exception as e:
+            print(f"❌ [WARMUP] {name} failed: {e}", flush=True)
+            traceback.print_exc()
+            _status[name] = {
+                "state": "failed",
+                "error": str(e),
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+            }
+
+    await asyncio.gather(*(_step(name, f) for name, f in steps.items()))
+
+    if all(_status.get(name, {}).get("state") == "done" for name in _required):
+        _ready.set()
+        print("🟢 [WARMUP] Ready:", _status, flush=True)
+    else:
+        print("🔴 [WARMUP] Required step failed, staying NOT ready:", _status, flush=True)
+
+
+def start_warmup(
+    steps: Dict[str, Callable[[], Awaitable]],
+    required: Optional[set] = None,
+) -> None:
+    """
+    Start warm-up in the background (call from the FastAPI lifespan).
+
+    - Steps run concurrently; each is a zero-arg coroutine factory
+    - Readiness flips once every `required` step succeeded
+      (default: all steps); optional steps may fail without blocking
+    - Lazy initialization still covers anything that is not warm yet
+    """
+    global _warmup_task, _ready, _required
+
+    if _warmup_task is not None:
+        return
+
+    _ready = asyncio.Event()
+    _required = set(steps) if required is None else set(required)
+    for name in steps:
+        _status[name] = {"state": "pending"}
+
+    _warmup_task = asyncio.create_task(_run_warmup(steps))
+
+
+def is_ready() -> bool:
+    return _ready is not None and _ready.is_set()
+
+
+async def wait_until_ready(timeout: Optional[float] = None) -> bool:
+    if _ready is None:
+        return False
+    try:
+        await asyncio.wait_for(_ready.wait(), timeout=timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+def warmup_status() -> dict:
+    return {"ready": is_ready(), "steps": dict(_status)}
+
+
+async def stop_warmup() -> None:
+    global _warmup_task
+    if _warmup_task is not None and not _warmup_task.done():
+        _warmup_task.cancel()
+        try:
+            await _warmup_task
+        except (asyncio.CancelledError, Exception):
+            pass
+    _warmup_task = None
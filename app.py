@@ -1,8 +1,8 @@
 from boss_env import load_aws_secrets
 load_aws_secrets()
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 import uvicorn
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi import HTTPException
 from pydantic import ValidationError
 import traceback
@@ -13,22 +13,43 @@ from datetime import datetime
 import pytz
 from typing import List
 import asyncio
+import uuid
 from fastapi import BackgroundTasks
 from MEMORY_SYSTEM.runtime.background_worker import start_background_worker
 from MEMORY_SYSTEM.database.schema.memories import ensure_memories_table_exists
 # from MEMORY_SYSTEM.database.schema.memory_access_log import ensure_memory_access_log_table_exists
 from MEMORY_SYSTEM.database.schema.memory_events import ensure_memory_events_table_exists
+from MEMORY_SYSTEM.database.schema.memory_signals import ensure_memory_signals_table_exists
 from MEMORY_SYSTEM.database.schema.artifacts import ensure_artifacts_table_exists
 from MEMORY_SYSTEM.database.schema.stm_entries import ensure_stm_entries_table_exists
 from MEMORY_SYSTEM.database.schema.user_persona import ensure_user_persona_table_exists
 from MEMORY_SYSTEM.database.schema.pattern_logs import ensure_pattern_logs_table_exists
-from MEMORY_SYSTEM.main import bedrock_llm_call
+from MEMORY_SYSTEM.main import bedrock_llm_call, bedrock_llm_stream
+from MEMORY_SYSTEM.main import get_llm as get_main_llm
+from MEMORY_SYSTEM.persona.persona_agent_flow import get_llm as get_persona_llm
+from MEMORY_SYSTEM.llm.bedrock_structured import get_llm as get_structured_llm
+from MEMORY_SYSTEM.stm.stm_orchestrator import s3_client
+from MEMORY_SYSTEM.ltm.retriever import initialize_intent_embeddings
+from MEMORY_SYSTEM.ltm.ann_index import ann_index_manager
+from MEMORY_SYSTEM.ltm.user_vector_cache import user_vector_cache
+from MEMORY_SYSTEM.ltm.access_tracker import access_tracker
+from MEMORY_SYSTEM.ltm.event_sink import memory_event_sink
+from MEMORY_SYSTEM.ltm.event_partitions import event_partition_manager
+from MEMORY_SYSTEM.runtime.warmup import start_warmup, stop_warmup, warmup_status, is_ready
+from MEMORY_SYSTEM.runtime.tracing import start_trace, span
+from MEMORY_SYSTEM.embeddings.encoder import (
+    embedding_batcher_stats,
+    embedding_cache_stats,
+    close_embeddings,
+    warm_up_embeddings,
+)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     try:
         await ensure_memories_table_exists()
         await ensure_memory_events_table_exists()
+        await ensure_memory_signals_table_exists()
         await ensure_stm_entries_table_exists()
         await ensure_user_persona_table_exists()
         await ensure_pattern_logs_table_exists()
@@ -41,10 +62,41 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         raise
 
+    # Builds / rebuilds idx_memories_embedding as the table grows
+    ann_index_manager.start()
+
+    # Write-behind flush of retrieval accesses
+    access_tracker.start()
+
+    # Buffered COPY writer for memory_events
+    memory_event_sink.start()
+
+    # memory_events partitions ahead of time + retention
+    event_partition_manager.start()
+
+    # Heavy singletons load in the background; /ready gates traffic
+    start_warmup(
+        {
+            "embeddings": warm_up_embeddings,
+            "bedrock": lambda: asyncio.to_thread(
+                lambda: (get_main_llm(), get_persona_llm(), get_structured_llm())
+            ),
+            "s3": lambda: asyncio.to_thread(lambda: s3_client.s3),
+            "intent_centroids": initialize_intent_embeddings,
+        },
+        required={"embeddings", "bedrock"},
+    )
+
     yield 
 
 
     try:
+        await stop_warmup()
+        await ann_index_manager.stop()
+        await access_tracker.stop()   # flushes pending accesses
+        await memory_event_sink.stop()   # flushes queued events
+        await event_partition_manager.stop()
+        close_embeddings()
         print("Completed")
     except Exception as e:
         raise
@@ -81,31 +133,102 @@ def home():
     return "Hello, reniforcemnet learnings"
 
 
+@app.get('/ready')
+def ready():
+    status = warmup_status()
+    return JSONResponse(status_code=200 if is_ready() else 503, content=status)
+
+
+@app.get('/embeddings/stats')
+def embeddings_stats():
+    return {
+        "batcher": embedding_batcher_stats(),
+        "cache": embedding_cache_stats(),
+    }
+
+
+@app.get('/ann/health')
+async def ann_health():
+    return {
+        **(await ann_index_manager.health()),
+        "user_vector_cache": user_vector_cache.stats(),
+        "access_tracker": access_tracker.stats(),
+        "memory_event_sink": memory_event_sink.stats(),
+    }
+
+
+@app.get('/events/health')
+async def events_health():
+    return await event_partition_manager.health()
+
+
 @app.post('/model')
 async def newsreports(
     request: Request, 
+    response: Response,
     background_tasks: BackgroundTasks  # ← ADD THIS DEPENDENCY
 ):
+    # Request id links the request spans with its background task spans
+    with start_trace(request.headers.get("X-Request-ID")) as request_id:
+        response.headers["X-Request-ID"] = request_id
+        try:
+            data = await request.json()
+            user_id = data.get("user_id", None)
+            system_prompt = data.get("system_prompt", None)
+            user_prompt = data.get("user_prompt", None)  
+            
+            with span("http.model", user_id=user_id):
+                result = await bedrock_llm_call(
+                    user_id, 
+                    system_prompt, 
+                    user_prompt, 
+                    background_tasks=background_tasks  # ← PASS THE INJECTED INSTANCE
+                )
+            return result
+        except Exception as e:
+            tb = traceback.format_exc()
+            return JSONResponse(
+                status_code=500,
+                content={"error": str(e), "traceback": tb.splitlines()},
+                headers={"X-Request-ID": request_id},
+            )
+
+
+@app.post('/model/stream')
+async def newsreports_stream(
+    request: Request,
+    background_tasks: BackgroundTasks
+):
+    request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
     try:
         data = await request.json()
-        user_id = data.get("user_id", None)
-        system_prompt = data.get("system_prompt", None)
-        user_prompt = data.get("user_prompt", None)  
-        
-        result = await bedrock_llm_call(
-            user_id, 
-            system_prompt, 
-            user_prompt, 
-            background_tasks=background_tasks  # ← PASS THE INJECTED INSTANCE
-        )
-        return result
     except Exception as e:
         tb = traceback.format_exc()
         return JSONResponse(
-            status_code=500,
-            content={"error": str(e), "traceback": tb.splitlines()}
+            status_code=400,
+            content={"error": str(e), "traceback": tb.splitlines()},
+            headers={"X-Request-ID": request_id},
         )
 
+    # Background jobs are appended by the generator once the stream
+    # completes; Starlette runs them after the last frame is sent.
+    return StreamingResponse(
+        bedrock_llm_stream(
+            data.get("user_id", None),
+            data.get("system_prompt", None),
+            data.get("user_prompt", None),
+            background_tasks=background_tasks,
+            request_id=request_id,
+        ),
+        media_type="text/event-stream",
+        headers={
+            "X-Request-ID": request_id,
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+        background=background_tasks,
+    )
+
 
 if __name__ == "__main__":
     uvicorn.run("app:app", host="127.0.0.1", port=6929, reload=True)